@@ -3,8 +3,10 @@ logger = logging.getLogger(__name__)
 
 from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
-from .db import User, Tournament, Team, Player, UserRole, BlackList, TeamStatus
-from sqlalchemy import func
+from .db import User, Tournament, Team, Player, UserRole, BlackList, TeamStatus, TournamentStatus, ProgressStatus, TeamEventKind, TeamEventHourly
+from sqlalchemy import func, case, distinct
+from collections import Counter
+from datetime import datetime
 
 async def get_user(session: AsyncSession, tg_id: int) -> User | None:
     user = await session.scalar(select(User).where(User.telegram_id == tg_id))
@@ -78,23 +80,6 @@ async def add_player_to_team(session: AsyncSession, team_id: int, nickname: str,
         await session.rollback()
         raise
 
-async def get_statistics(session: AsyncSession) -> dict:
-    """Сбор статистики"""
-    users = await session.scalar(select(func.count(User.id)))
-    active_tournaments = await session.scalar(
-        select(func.count(Tournament.id))
-        .where(Tournament.is_active == True)
-    )
-    teams = await session.scalar(
-        select(func.count(Team.id)).where(Team.status == TeamStatus.APPROVED)
-    )
-    logger.debug(f"Statistics: users={users}, active_tournaments={active_tournaments}, teams={teams}")
-    return {
-        "users": users,
-        "active_tournaments": active_tournaments,
-        "teams": teams
-    }
-
 async def update_user_role(
     session: AsyncSession, 
     username: str,  # Используем юзернейм вместо ID
@@ -151,4 +136,80 @@ async def update_required_channels(session: AsyncSession, tournament_id: int, ch
         await session.commit()
         logger.info(f"Updated required_channels for tournament {tournament_id}: {channels}")
         return True
-    return False
\ No newline at end of file
+    return False
+
+# Списки для клавиатур: запросы только нужных колонок. Строки — лёгкие кортежи (Row) с доступом
+# по имени колонки; они не попадают в identity map сессии и не тянут Text-поля.
+# Постранично выполняются через app.keyboards.pagination.fetch_page.
+
+def tournament_list_query(created_by: int | None = None):
+    """(id, name, status) турниров; с created_by — только одобренные турниры этого админа"""
+    query = select(Tournament.id, Tournament.name, Tournament.status)
+    if created_by is not None:
+        query = query.where(Tournament.status == TournamentStatus.APPROVED, Tournament.created_by == created_by)
+    return query
+
+def pending_team_list_query(created_by: int | None = None):
+    """(id, team_name, tournament_id) команд на модерации; с created_by — только в турнирах этого админа"""
+    query = select(Team.id, Team.team_name, Team.tournament_id).where(Team.status == TeamStatus.PENDING)
+    if created_by is not None:
+        query = query.where(
+            Team.tournament_id.in_(select(Tournament.id).where(Tournament.created_by == created_by))
+        )
+    return query
+
+def approved_team_list_query(captain_tg_id: int | None = None):
+    """(id, team_name, captain_tg_id) одобренных команд; с captain_tg_id — только команды капитана"""
+    query = select(Team.id, Team.team_name, Team.captain_tg_id).where(Team.status == TeamStatus.APPROVED)
+    if captain_tg_id is not None:
+        query = query.where(Team.captain_tg_id == captain_tg_id)
+    return query
+
+def admin_list_query():
+    """(id, full_name, role) админов и супер-админов"""
+    return select(User.id, User.full_name, User.role).where(User.role.in_([UserRole.ADMIN, UserRole.SUPER_ADMIN]))
+
+async def tournament_dashboard(session: AsyncSession, tournament_id: int) -> dict:
+    """Итоги и игроки одобренных команд турнира одним GROUP BY. Заявки по статусам
+    берутся из счётчиков stats.by_tournament(), здесь их не считаем"""
+    rows = await session.execute(
+        select(
+            Team.progress_status,
+            func.count(distinct(Team.id)),
+            func.count(Player.id),
+            func.coalesce(func.sum(case((Player.is_substitute == True, 1), else_=0)), 0),
+        )
+        .outerjoin(Player, Player.team_id == Team.id)
+        .where(Team.tournament_id == tournament_id, Team.status == TeamStatus.APPROVED)
+        .group_by(Team.progress_status)
+    )
+    progress = Counter()
+    players = substitutes = 0
+    for progress_status, teams, team_players, team_substitutes in rows:
+        progress[progress_status] += teams
+        players += team_players
+        substitutes += team_substitutes
+    logger.debug(f"Dashboard for tournament {tournament_id}: {dict(progress)}")
+    return {
+        "progress": {status: progress[status] for status in ProgressStatus},
+        "players": players,
+        "substitutes": substitutes,
+    }
+
+async def team_event_curve(
+    session: AsyncSession, tournament_id: int, rollup=TeamEventHourly, kinds=tuple(TeamEventKind), limit: int | None = None
+) -> dict[datetime, dict[TeamEventKind, int]]:
+    """Кривая событий заявок турнира из сводки (TeamEventHourly или TeamEventDaily):
+    начало периода -> число событий по типам; с limit — только последние limit периодов"""
+    buckets = select(rollup.bucket).where(rollup.tournament_id == tournament_id, rollup.kind.in_(kinds)).distinct()
+    if limit is not None:
+        buckets = buckets.order_by(rollup.bucket.desc()).limit(limit)
+    rows = await session.execute(
+        select(rollup.bucket, rollup.kind, rollup.count)
+        .where(rollup.tournament_id == tournament_id, rollup.kind.in_(kinds), rollup.bucket.in_(buckets.scalar_subquery()))
+        .order_by(rollup.bucket)
+    )
+    curve = {}
+    for bucket, kind, count in rows:
+        curve.setdefault(bucket, dict.fromkeys(kinds, 0))[kind] = count
+    return curve
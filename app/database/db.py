@@ -1,6 +1,6 @@
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, String, Text , BigInteger, DateTime, Enum as SAEnum, Boolean, Index
+from sqlalchemy import ForeignKey, String, Text , BigInteger, DateTime, Enum as SAEnum, Boolean, Index, inspect, text
 from datetime import datetime
 from typing import Optional, List
 from enum import Enum
@@ -34,6 +34,13 @@ class ProgressStatus(str, Enum):
     WINNER = "winner"
     LOSER = "loser"
 
+# События заявок команд для аналитики (app/services/team_events.py)
+class TeamEventKind(str, Enum):
+    REGISTERED = "registered"
+    APPROVED = "approved"
+    REJECTED = "rejected"
+    DELETED = "deleted"
+
 class User(Base):
     __tablename__ = "users"
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -98,6 +105,8 @@ class Team(Base):
         default=ProgressStatus.IN_PROGRESS,
         nullable=False
     )
+    # Время подачи заявки; у команд, созданных до появления колонки, — NULL
+    created_at: Mapped[Optional[datetime]] = mapped_column(default=datetime.utcnow)
     tournament: Mapped["Tournament"] = relationship(back_populates="teams")
     players: Mapped[List["Player"]] = relationship(
         back_populates="team",
@@ -120,8 +129,53 @@ class Player(Base):
     __table_args__ = (
         Index('idx_team_captain', 'team_id', 'captain_id'),
     )
-    
+
+
+# Журнал событий заявок: только добавление; team_id без внешнего ключа — команда может быть удалена
+class TeamEvent(Base):
+    __tablename__ = "team_events"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[TeamEventKind]
+    team_id: Mapped[int] = mapped_column(index=True)
+    tournament_id: Mapped[int] = mapped_column(index=True)
+    actor_tg_id: Mapped[int] = mapped_column(BigInteger)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, index=True)
+
+# Число событий по турниру, типу и началу часа (дня) — из них строятся кривые регистраций
+class TeamEventHourly(Base):
+    __tablename__ = "team_events_hourly"
+    tournament_id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[TeamEventKind] = mapped_column(primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+class TeamEventDaily(Base):
+    __tablename__ = "team_events_daily"
+    tournament_id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[TeamEventKind] = mapped_column(primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+# Счётчики для экрана статистики (app/services/stats.py): "users", "game:3:approved_teams", ...
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int] = mapped_column(default=0)
+
+
+def add_missing_columns(connection) -> None:
+    """create_all не меняет существующие таблицы: новые nullable-колонки моделей добавляются ALTER TABLE"""
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(connection.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
 
 async def create_db():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
\ No newline at end of file
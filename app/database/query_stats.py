@@ -0,0 +1,95 @@
+"""Учёт SQL-запросов в рамках апдейта: количество, время в БД и повторы одного запроса (N+1).
+
+Статистика текущего апдейта живёт в ContextVar; SQLAlchemy выполняет запросы в greenlet
+той же задачи, поэтому события движка видят её без явной передачи.
+"""
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+QUERY_STATS = os.getenv("QUERY_STATS", "off")  # off | on | strict
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "20"))  # запросов на апдейт
+QUERY_REPEAT_LIMIT = int(os.getenv("QUERY_REPEAT_LIMIT", "5"))  # повторов одного запроса до подозрения на N+1
+# Свои бюджеты для тяжёлых обработчиков: "send_approved_teams=200,show_stats=5"
+QUERY_HANDLER_BUDGETS = {
+    name.strip(): int(budget)
+    for name, budget in (
+        item.split("=") for item in os.getenv("QUERY_HANDLER_BUDGETS", "").split(",") if "=" in item
+    )
+}
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryStats:
+    __slots__ = ("handler", "count", "db_time", "statements")
+
+    def __init__(self):
+        self.handler: str | None = None
+        self.count = 0
+        self.db_time = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.db_time += duration
+        self.statements[statement] += 1
+
+    def repeated(self, limit: int = QUERY_REPEAT_LIMIT) -> list[tuple[str, int]]:
+        """Запросы, выполненные больше limit раз — типичный цикл с запросом внутри"""
+        return [(statement, n) for statement, n in self.statements.most_common() if n > limit]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+# Итоги по обработчикам: handler -> [апдейтов, запросов, секунд в БД]
+handler_totals: dict[str, list] = {}
+
+
+def current_stats() -> QueryStats | None:
+    return _current.get()
+
+
+@contextmanager
+def count_queries():
+    """Считает запросы внутри блока. Удобно и в тестах: assert stats.count <= 3"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def add_totals(stats: QueryStats) -> None:
+    totals = handler_totals.setdefault(stats.handler or "unhandled", [0, 0, 0.0])
+    totals[0] += 1
+    totals[1] += stats.count
+    totals[2] += stats.db_time
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        # Соединение выполняет один запрос за раз, поэтому хватает одного значения
+        conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.pop("query_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def install(engine) -> None:
+    """Подключает учёт к движку (AsyncEngine или обычному)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,58 @@
+"""Сессия БД на апдейт: создаётся при первом обращении и, в режиме unit of work,
+фиксируется одним коммитом после успешного обработчика.
+
+В режиме unit of work session.commit() внутри обработчиков превращается во flush:
+изменения уходят в открытую транзакцию (id у новых объектов появляются как раньше),
+а настоящий COMMIT делает DatabaseMiddleware, когда обработчик завершился без ошибки.
+ErrorHandlerMiddleware при исключении откатывает сессию, поэтому частично выполненный
+обработчик ничего не сохраняет. Минус для SQLite: после первой записи блокировка на запись
+держится до конца обработчика, включая запросы к Telegram, — поэтому режим включается явно.
+"""
+import os
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+DB_UNIT_OF_WORK = os.getenv("DB_UNIT_OF_WORK", "0") == "1"
+
+
+class LazySession:
+    """Прокси AsyncSession: настоящая сессия создаётся при первом обращении к любому атрибуту"""
+
+    __slots__ = ("_session_maker", "_session", "unit_of_work")
+
+    def __init__(self, session_maker: async_sessionmaker, unit_of_work: bool = False):
+        self._session_maker = session_maker
+        self._session: AsyncSession | None = None
+        self.unit_of_work = unit_of_work
+
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+
+    def _get(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_maker()
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    async def commit(self) -> None:
+        if self.unit_of_work:
+            if self._session is not None:
+                await self._session.flush()
+            return
+        await self._get().commit()
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def complete(self) -> None:
+        """Фиксирует unit of work; без открытой сессии ничего не делает"""
+        if self._session is not None and self._session.in_transaction():
+            await self._session.commit()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
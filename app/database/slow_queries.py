@@ -0,0 +1,97 @@
+"""Лог медленных SQL-запросов: текст, параметры, длительность, обработчик и план запроса (SQLite).
+
+Записи ограничены по частоте, чтобы всплеск медленных запросов не забил logs/bot.log;
+пропущенные считаются и упоминаются в следующей записи.
+"""
+import logging
+import os
+import time
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event
+
+from app.database import query_stats
+from app.utils.rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))  # порог, 0 — выключено
+SLOW_QUERY_LOG_RATE = float(os.getenv("SLOW_QUERY_LOG_RATE", "0.2"))  # записей в секунду в среднем
+SLOW_QUERY_LOG_BURST = int(os.getenv("SLOW_QUERY_LOG_BURST", "5"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "1") == "1"
+MAX_PARAMS_LENGTH = 500
+
+# Движок -> подключённый лог: create_dispatcher() вызывается и из инструментов, второй лог дублировал бы записи
+_installed: WeakKeyDictionary = WeakKeyDictionary()
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_QUERY_MS,
+        rate: float = SLOW_QUERY_LOG_RATE,
+        burst: int = SLOW_QUERY_LOG_BURST,
+        explain: bool = SLOW_QUERY_EXPLAIN,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.limiter = RateLimiter(rate=rate, burst=burst)
+        self.explain = explain
+        self.suppressed = 0
+
+    def install(self, engine) -> None:
+        sync_engine = getattr(engine, "sync_engine", engine)
+        if sync_engine in _installed:
+            return
+        _installed[sync_engine] = self
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["slow_query_started"] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("slow_query_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        if duration < self.threshold:
+            return
+        if not self.limiter.allow(None):
+            self.suppressed += 1
+            return
+
+        stats = query_stats.current_stats()
+        params = repr(parameters)
+        if len(params) > MAX_PARAMS_LENGTH:
+            params = params[:MAX_PARAMS_LENGTH] + "…"
+        lines = [
+            f"Slow query {duration * 1000:.0f} ms (handler: {stats.handler if stats else None})",
+            f"  sql: {' '.join(statement.split())}",
+            f"  params: {params}",
+        ]
+        if self.explain and not executemany and conn.dialect.name == "sqlite":
+            lines.extend(f"  plan: {detail}" for detail in self._query_plan(conn, statement, parameters))
+        if self.suppressed:
+            lines.append(f"  ({self.suppressed} more slow queries were not logged)")
+            self.suppressed = 0
+        logger.warning("\n".join(lines))
+
+    @staticmethod
+    def _query_plan(conn, statement: str, parameters) -> list[str]:
+        # Через DBAPI-курсор напрямую, чтобы план не попал в события движка и учёт запросов
+        try:
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception as e:
+            return [f"unavailable ({e})"]
+        # Строки плана: (id, parent, notused, detail); вложенность показываем отступом
+        depth = {0: 0}
+        plan = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, 0) + 1
+            plan.append("  " * (depth[node_id] - 1) + detail)
+        return plan
@@ -0,0 +1,31 @@
+"""Прибавление к счётчикам в таблицах: INSERT ... ON CONFLICT DO UPDATE для SQLite и PostgreSQL,
+UPDATE + INSERT для остальных диалектов."""
+from sqlalchemy import Table, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+
+_INSERT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def add_to_counters(connection: Connection, table: Table, value_column: str, rows: list[dict]) -> None:
+    """rows — значения первичного ключа и прибавка в value_column; недостающие строки создаются"""
+    key_columns = [column.name for column in table.primary_key]
+    insert = _INSERT.get(connection.dialect.name)
+    if insert is not None:
+        statement = insert(table)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=key_columns,
+                set_={value_column: table.c[value_column] + statement.excluded[value_column]},
+            ),
+            rows,
+        )
+        return
+    for row in rows:
+        updated = connection.execute(
+            update(table)
+            .where(*(table.c[name] == row[name] for name in key_columns))
+            .values({value_column: table.c[value_column] + row[value_column]})
+        )
+        if not updated.rowcount:
+            connection.execute(table.insert(), row)
@@ -0,0 +1,78 @@
+from inspect import isclass
+
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters import BaseFilter, Command, StateFilter
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import Message
+
+_ANY = object()
+
+
+class HandlerIndexFilter(BaseFilter):
+    """Дешёвый фильтр роутера: пропускает сообщение, только если его может принять хотя бы
+    один обработчик — по команде или по состоянию FSM. Ставится перед фильтрами ролей,
+    чтобы те не ходили в БД ради сообщений, которые роутер всё равно не обработает.
+
+    Индекс строится по обработчикам при первом вызове. Если у какого-то обработчика нет
+    ни Command, ни состояния (например, F.text == ...), фильтр пропускает всё.
+    """
+
+    def __init__(self, observer: TelegramEventObserver):
+        self.observer = observer
+        self._index = None
+
+    def _build(self):
+        commands, states = {}, set()
+        for handler in self.observer.handlers:
+            indexed = False
+            for filter_object in handler.filters or ():
+                item = filter_object.callback
+                if isinstance(item, Command):
+                    if not all(isinstance(command, str) for command in item.commands):
+                        return _ANY
+                    for prefix in item.prefix:
+                        for command in item.commands:
+                            if item.ignore_case:
+                                command = command.casefold()
+                            key = prefix + command
+                            commands[key] = commands.get(key, False) or item.ignore_case
+                    indexed = True
+                elif isinstance(item, StateFilter):
+                    for state in item.states:
+                        if state == "*":
+                            return _ANY
+                        states.update(_state_names(state))
+                    indexed = True
+                elif isinstance(item, State) or (isclass(item) and issubclass(item, StatesGroup)):
+                    states.update(_state_names(item))
+                    indexed = True
+            if not indexed:
+                return _ANY
+        return commands, states
+
+    async def __call__(self, message: Message, raw_state: str | None = None) -> bool:
+        if self._index is None:
+            self._index = self._build()
+        if self._index is _ANY:
+            return True
+        commands, states = self._index
+        if raw_state in states:
+            return True
+        parts = (message.text or message.caption or "").split(maxsplit=1)
+        if not parts:
+            return False
+        # "/cmd@bot_name args" -> "/cmd"
+        command = parts[0].split("@", 1)[0]
+        if command in commands:
+            return True
+        # Команды с ignore_case хранятся в casefold и помечены True
+        return commands.get(command[:1] + command[1:].casefold(), False)
+
+
+def _state_names(state) -> set:
+    if state is None or isinstance(state, str):
+        return {state}
+    if isinstance(state, State):
+        return {state.state}
+    group = state if isclass(state) else type(state)
+    return set(group.__all_states_names__)
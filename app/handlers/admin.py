@@ -1,6 +1,5 @@
-from aiogram import Router, F, Bot
-from aiogram.types import Message, CallbackQuery, FSInputFile, InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram import F, Bot
+from aiogram.types import Message, CallbackQuery, FSInputFile, BufferedInputFile, InlineKeyboardMarkup
 from aiogram.fsm.context import FSMContext
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,82 +13,106 @@ from app.states import CreateTournament, Broadcast
 from app.services.file_handling import save_file
 from app.services.notifications import notify_super_admins
 from app.filters.message_type_filter import MessageTypeFilter
+from app.services.outbound import bulk_lane
+from app.services.catalog import catalog
+from app.services.render_cache import render_cache
+from app.services.stats import stats as stats_counters
+from app.keyboards.pagination import Page, fetch_page
+from app.utils.callbacks import (
+    ActionRouter,
+    ACTIVATE_TOURNAMENT, ADMIN_SELECT_FORMAT, ADMIN_SELECT_GAME, BACK_TO_ADMIN, BACK_TO_TOURNAMENTS,
+    CREATE_TOURNAMENT, DEACTIVATE_TOURNAMENT, DELETE_TOURNAMENT, EDIT_TOURNAMENT,
+    MANAGE_TOURNAMENTS, MODERATE_TEAM, MODERATE_TEAMS, NOTIFICATIONS_MENU, NOTIFY_ALL_USERS,
+    NOTIFY_IN_PROGRESS, NOTIFY_LOSERS, NOTIFY_WINNERS, PAGE, PREVIEW_TEAM, STATS, TEAM_REQUESTS,
+    TOURNAMENT_DASHBOARD, TOURNAMENT_REGISTRATIONS_CSV,
+)
 import logging
 import asyncio
+import csv
+import io
 import os
-from app.database.db import Tournament, Game, TournamentStatus, UserRole, User, Tournament, GameFormat, Team, User, Player, TeamStatus, ProgressStatus
+from app.database.db import Tournament, TournamentStatus, UserRole, User, Tournament, Team, User, Player, TeamStatus, ProgressStatus, TeamEventKind, TeamEventDaily, TeamEventHourly
 from app.keyboards.admin import (
     admin_main_menu,
     tournaments_management_kb,
+    pending_teams_kb,
     tournament_actions_kb,
     back_to_admin_kb,
     team_request_kb,
     tournament_status_kb,
+    tournament_dashboard_kb,
     team_request_preview_kb,
     notifications_menu_kb,
     group_invite_kb,
     tournaments_btn_kb
 )
 
-router = Router()
+router = ActionRouter()
 logger = logging.getLogger(__name__)
 
 # Главное админ-меню
 @router.message(F.text == "Админ-панель")
 async def admin_panel(message: Message):
     logger.info(f"User {message.from_user.id} opened admin panel")
-    await message.answer("⚙️ Админ-панель:", reply_markup=admin_main_menu())
+    return message.answer("⚙️ Админ-панель:", reply_markup=admin_main_menu())
     
-@router.callback_query(F.data == "stats")
+@router.callback_query(STATS.filter())
 async def show_stats(call: CallbackQuery, session: AsyncSession):
     logger.info(f"User {call.from_user.id} requested statistics")
-    stats = await crud.get_statistics(session)
+    await stats_counters.ensure_loaded(session)
+    stats = stats_counters.totals()
     text = (
         "📊 Статистика:\n"
         f"👥 Пользователей: {stats['users']}\n"
         f"🏆 Активных турниров: {stats['active_tournaments']}\n"
         f"👥 Зарегистрированных команд: {stats['teams']}"
     )
+    # Разбивка по играм — из тех же счётчиков, игры без турниров не показываем
+    snapshot = await catalog.get(session)
+    for game in snapshot.games:
+        by_game = stats_counters.by_game(game.id)
+        if by_game["tournaments"]:
+            text += (
+                f"\n\n🎮 {game.name}: турниров {by_game['tournaments']} "
+                f"(активных {by_game['active_tournaments']}), команд {by_game['approved_teams']}"
+            )
     await call.message.edit_text(text, reply_markup=back_to_admin_kb())
 
-@router.callback_query(F.data == "back_to_admin")
+@router.callback_query(BACK_TO_ADMIN.filter())
 async def back_to_admin(call: CallbackQuery):
     logger.info(f"User {call.from_user.id} returned to admin panel")
     await call.message.edit_text("⚙️ Админ-панель:", reply_markup=admin_main_menu())
 
-@router.callback_query(F.data == "manage_tournaments")
+async def tournaments_page(session: AsyncSession, tg_id: int, direction: str = "n", cursor: int | None = None) -> Page:
+    # Супер-админ видит все турниры, админ — только свои одобренные
+    user = await session.scalar(select(User).where(User.telegram_id == tg_id))
+    query = crud.tournament_list_query(created_by=None if user.role == UserRole.SUPER_ADMIN else user.id)
+    return await fetch_page(session, query, Tournament.id, direction, cursor)
+
+@router.callback_query(MANAGE_TOURNAMENTS.filter())
 async def manage_tournaments(call: CallbackQuery, session: AsyncSession):
     logger.info(f"User {call.from_user.id} opened tournament management")
-    user = await session.scalar(select(User).where(User.telegram_id == call.from_user.id))
-    if user.role == UserRole.SUPER_ADMIN:
-        tournaments = await session.scalars(select(Tournament))
-    else:
-        tournaments = await session.scalars(
-            select(Tournament)
-            .where(Tournament.status == TournamentStatus.APPROVED)
-            .where(Tournament.created_by == user.id)
-        )
+    page = await tournaments_page(session, call.from_user.id)
     await call.message.edit_text(
         "Управление турнирами:",
-        reply_markup=tournaments_management_kb(tournaments)
+        reply_markup=tournaments_management_kb(page)
     )
 
-@router.callback_query(F.data == "create_tournament")
+@router.callback_query(PAGE.filter(list_name="tm"))
+async def tournaments_navigate(call: CallbackQuery, session: AsyncSession, callback_data: PAGE.Args):
+    page = await tournaments_page(session, call.from_user.id, callback_data.direction, callback_data.cursor)
+    await call.message.edit_reply_markup(reply_markup=tournaments_management_kb(page))
+    await call.answer()
+
+@router.callback_query(CREATE_TOURNAMENT.filter())
 async def start_creation(call: CallbackQuery, state: FSMContext, session: AsyncSession):
     logger.info(f"User {call.from_user.id} started tournament creation")
     try:
-        games = await session.scalars(select(Game))
-        if not games:
+        snapshot = await catalog.get(session)
+        if not snapshot.games:
             await call.answer("❌ Нет доступных игр! Сначала добавьте игры.", show_alert=True)
             return
-        builder = InlineKeyboardBuilder()
-        for game in games:
-            builder.button(
-                text=game.name,
-                callback_data=f"admin_select_game_{game.id}"
-            )
-        builder.adjust(1)
-        await call.message.answer("🎮 Выберите игру:", reply_markup=builder.as_markup())
+        await call.message.answer("🎮 Выберите игру:", reply_markup=snapshot.admin_games_kb)
         await state.set_state(CreateTournament.SELECT_GAME)
     except Exception as e:
         logger.error(f"Error in start_creation: {e}", exc_info=True)
@@ -97,40 +120,33 @@ async def start_creation(call: CallbackQuery, state: FSMContext, session: AsyncS
 
 @router.callback_query(
     StateFilter(CreateTournament.SELECT_GAME),
-    F.data.startswith("admin_select_game_")
+    ADMIN_SELECT_GAME.filter()
 )
-async def select_game(call: CallbackQuery, state: FSMContext, session: AsyncSession):
-    game_id = int(call.data.split("_")[3])
+async def select_game(call: CallbackQuery, state: FSMContext, session: AsyncSession, callback_data: ADMIN_SELECT_GAME.Args):
+    game_id = callback_data.game_id
     logger.info(f"User {call.from_user.id} selected game {game_id} for tournament creation")
-    game = await session.get(Game, game_id)
+    snapshot = await catalog.get(session)
+    game = snapshot.games_by_id.get(game_id)
     if not game:
         await call.answer("❌ Игра не найдена!", show_alert=True)
         return
-    formats = await session.scalars(select(GameFormat).where(GameFormat.game_id == game_id))
-    formats = list(formats)
-    if not formats:
+    formats_kb = snapshot.admin_formats_kb.get(game_id)
+    if formats_kb is None:
         await call.answer("❌ Нет форматов для этой игры!", show_alert=True)
         return
-    builder = InlineKeyboardBuilder()
-    for fmt in formats:
-        builder.button(
-            text=f"{fmt.format_name} (до {fmt.max_players_per_team})",
-            callback_data=f"admin_select_format_{fmt.id}"
-        )
-    builder.adjust(1)
     await call.message.edit_text(
         f"🎮 Игра: <b>{game.name}</b>\nВыберите формат:",
         parse_mode="HTML",
-        reply_markup=builder.as_markup()
+        reply_markup=formats_kb
     )
     await state.update_data(game_id=game_id)
     await state.set_state(CreateTournament.SELECT_FORMAT)
 
-@router.callback_query(F.data.startswith("admin_select_format_"))
-async def select_format(call: CallbackQuery, state: FSMContext, session: AsyncSession):
-    format_id = int(call.data.split("_")[3])
+@router.callback_query(ADMIN_SELECT_FORMAT.filter())
+async def select_format(call: CallbackQuery, state: FSMContext, session: AsyncSession, callback_data: ADMIN_SELECT_FORMAT.Args):
+    format_id = callback_data.format_id
     logger.info(f"User {call.from_user.id} selected format {format_id} for tournament creation")
-    fmt = await session.get(GameFormat, format_id)
+    fmt = (await catalog.get(session)).formats_by_id.get(format_id)
     if not fmt:
         await call.answer("❌ Формат не найден!", show_alert=True)
         return
@@ -258,6 +274,7 @@ async def finish_creation(message: Message, state: FSMContext, bot: Bot, session
     )
     
     session.add(tournament)
+    render_cache.invalidate_on_commit(session, tournament)
     await session.commit()
     
     logger.info(f"Tournament '{data['name']}' created by user {message.from_user.id} (status: {status})")
@@ -278,10 +295,10 @@ async def finish_creation(message: Message, state: FSMContext, bot: Bot, session
     await state.clear()
 
     
-@router.callback_query(F.data.startswith("edit_tournament_"))
-async def show_tournament_details(call: CallbackQuery, session: AsyncSession):
+@router.callback_query(EDIT_TOURNAMENT.filter())
+async def show_tournament_details(call: CallbackQuery, session: AsyncSession, callback_data: EDIT_TOURNAMENT.Args):
     """Просмотр турнира (только если он одобрен или пользователь — супер-админ)"""
-    tournament_id = int(call.data.split("_")[2])
+    tournament_id = callback_data.tournament_id
     tournament = await session.get(Tournament, tournament_id)
     user = await session.scalar(
         select(User).where(User.telegram_id == call.from_user.id)
@@ -300,7 +317,7 @@ async def show_tournament_details(call: CallbackQuery, session: AsyncSession):
         return
 
     # Получаем связанную игру
-    game = await session.get(Game, tournament.game_id)
+    game = (await catalog.get(session)).games_by_id.get(tournament.game_id)
 
     # 1. Отправляем логотип, если есть
     if tournament.logo_path and os.path.exists(tournament.logo_path):
@@ -338,10 +355,10 @@ async def show_tournament_details(call: CallbackQuery, session: AsyncSession):
         reply_markup=tournament_actions_kb(tournament_id, tournament.is_active)
     )
     
-@router.callback_query(F.data.startswith("delete_tournament_"))
-async def delete_tournament(call: CallbackQuery, session: AsyncSession):
+@router.callback_query(DELETE_TOURNAMENT.filter())
+async def delete_tournament(call: CallbackQuery, session: AsyncSession, callback_data: DELETE_TOURNAMENT.Args):
     """Удаление турнира с файлами"""
-    tournament_id = int(call.data.split("_")[2])
+    tournament_id = callback_data.tournament_id
     tournament = await session.get(Tournament, tournament_id)
     
     if not tournament:
@@ -357,23 +374,24 @@ async def delete_tournament(call: CallbackQuery, session: AsyncSession):
     
     # Удаляем из БД
     await session.delete(tournament)
+    render_cache.invalidate_on_commit(session, tournament_id)
     await session.commit()
     
     await call.message.edit_text("✅ Турнир и все файлы удалены")
     
-@router.callback_query(F.data == "back_to_tournaments")
+@router.callback_query(BACK_TO_TOURNAMENTS.filter())
 async def back_to_tournaments_list(call: CallbackQuery, session: AsyncSession):
     try:
         # Удаляем сообщение с действиями
         await call.message.delete()
         
-        # Получаем обновленный список турниров
-        tournaments = await session.scalars(select(Tournament))
+        # Получаем первую страницу обновленного списка турниров
+        page = await tournaments_page(session, call.from_user.id)
         
         # Отправляем новый список
         await call.message.answer(
             "Управление турнирами:",
-            reply_markup=tournaments_management_kb(tournaments)
+            reply_markup=tournaments_management_kb(page)
         )
     except Exception as e:
         logging.error(f"Back error: {e}")
@@ -381,7 +399,7 @@ async def back_to_tournaments_list(call: CallbackQuery, session: AsyncSession):
 
 
 
-@router.callback_query(F.data == "team_requests")
+@router.callback_query(TEAM_REQUESTS.filter())
 async def show_team_requests(call: CallbackQuery, session: AsyncSession):
     """Показать заявки команд на участие в турнире"""
     user = await session.scalar(
@@ -419,46 +437,34 @@ async def show_team_requests(call: CallbackQuery, session: AsyncSession):
     
     await call.answer("📬 Уведомления отправлены создателям турниров.")
 
-@router.callback_query(F.data == "moderate_teams")
+async def pending_teams_page(session: AsyncSession, tg_id: int, direction: str = "n", cursor: int | None = None) -> Page:
+    # Для супер-админа — все команды, для админа — только свои турниры
+    user = await session.scalar(select(User).where(User.telegram_id == tg_id))
+    query = crud.pending_team_list_query(created_by=None if user.role == UserRole.SUPER_ADMIN else user.id)
+    return await fetch_page(session, query, Team.id, direction, cursor)
+
+@router.callback_query(MODERATE_TEAMS.filter())
 async def show_pending_teams(call: CallbackQuery, session: AsyncSession):
     """Список команд на модерации"""
-    # Для супер-админа — все команды, для админа — только свои турниры
-    user = await session.scalar(select(User).where(User.telegram_id == call.from_user.id))
-    if user.role == UserRole.SUPER_ADMIN:
-        teams = await session.scalars(
-            select(Team).where(Team.status == TeamStatus.PENDING)
-        )
-    else:
-        # Только команды в турнирах, созданных этим админом
-        tournaments = await session.scalars(
-            select(Tournament.id).where(Tournament.created_by == user.id)
-        )
-        teams = await session.scalars(
-            select(Team).where(
-                Team.status == TeamStatus.PENDING,
-                Team.tournament_id.in_(tournaments)
-            )
-        )
-    teams = list(teams)
-    if not teams:
+    page = await pending_teams_page(session, call.from_user.id)
+    if not page.rows:
         await call.message.edit_text("📭 Нет новых заявок на участие в турнирах.", reply_markup=back_to_admin_kb())
         return
 
-    builder = InlineKeyboardBuilder()
-    for team in teams:
-        builder.button(
-            text=f"{team.team_name} (турнир ID: {team.tournament_id})",
-            callback_data=f"moderate_team_{team.id}"
-        )
-    builder.row(InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_admin"))
     await call.message.edit_text(
         "📝 Заявки команд на модерации:",
-        reply_markup=builder.as_markup()
+        reply_markup=pending_teams_kb(page)
     )
 
-@router.callback_query(F.data.startswith("moderate_team_"))
-async def moderate_team(call: CallbackQuery, session: AsyncSession):
-    team_id = int(call.data.split("_")[2])
+@router.callback_query(PAGE.filter(list_name="mt"))
+async def pending_teams_navigate(call: CallbackQuery, session: AsyncSession, callback_data: PAGE.Args):
+    page = await pending_teams_page(session, call.from_user.id, callback_data.direction, callback_data.cursor)
+    await call.message.edit_reply_markup(reply_markup=pending_teams_kb(page))
+    await call.answer()
+
+@router.callback_query(MODERATE_TEAM.filter())
+async def moderate_team(call: CallbackQuery, session: AsyncSession, callback_data: MODERATE_TEAM.Args):
+    team_id = callback_data.team_id
     team = await session.get(Team, team_id)
     if not team:
         await call.answer("Команда не найдена", show_alert=True)
@@ -491,10 +497,13 @@ async def moderate_team(call: CallbackQuery, session: AsyncSession):
         reply_markup=team_request_kb(team.id)
     )
     
-@router.callback_query(F.data.regexp(r"^(de)?activate_tournament_\d+$"))
-async def toggle_tournament_status(call: CallbackQuery, session: AsyncSession):
-    data = call.data
-    tournament_id = int(data.split("_")[-1])
+@router.callback_query(ACTIVATE_TOURNAMENT.filter())
+@router.callback_query(DEACTIVATE_TOURNAMENT.filter())
+async def toggle_tournament_status(
+    call: CallbackQuery, session: AsyncSession,
+    callback_data: ACTIVATE_TOURNAMENT.Args | DEACTIVATE_TOURNAMENT.Args,
+):
+    tournament_id = callback_data.tournament_id
     tournament = await session.get(Tournament, tournament_id)
     user = await session.scalar(
         select(User).where(User.telegram_id == call.from_user.id)
@@ -506,12 +515,14 @@ async def toggle_tournament_status(call: CallbackQuery, session: AsyncSession):
         await call.answer("Нет прав для изменения статуса!", show_alert=True)
         return
 
-    if data.startswith("deactivate"):
+    if isinstance(callback_data, DEACTIVATE_TOURNAMENT.Args):
         tournament.is_active = False
+        render_cache.invalidate_on_commit(session, tournament_id)
         await session.commit()
         await call.answer("Турнир деактивирован!", show_alert=True)
     else:
         tournament.is_active = True
+        render_cache.invalidate_on_commit(session, tournament_id)
         await session.commit()
         await call.answer("Турнир активирован!", show_alert=True)
 
@@ -519,10 +530,84 @@ async def toggle_tournament_status(call: CallbackQuery, session: AsyncSession):
     await call.message.edit_reply_markup(
         reply_markup=tournament_status_kb(tournament_id, tournament.is_active)
     )
+
+DASHBOARD_HOURS = 12  # сколько последних часов с заявками показывать
+
+async def get_managed_tournament(call: CallbackQuery, session: AsyncSession, tournament_id: int) -> Tournament | None:
+    """Турнир для сводки и выгрузки: только супер-админу или создателю турнира"""
+    tournament = await session.get(Tournament, tournament_id)
+    user = await session.scalar(
+        select(User).where(User.telegram_id == call.from_user.id)
+    )
+    if not tournament or not (
+        user.role == UserRole.SUPER_ADMIN or tournament.created_by == user.id
+    ):
+        await call.answer("Нет прав для просмотра сводки!", show_alert=True)
+        return None
+    return tournament
+
+@router.callback_query(TOURNAMENT_DASHBOARD.filter())
+async def tournament_dashboard(call: CallbackQuery, session: AsyncSession, callback_data: TOURNAMENT_DASHBOARD.Args):
+    """Сводка по командам турнира для организатора"""
+    tournament_id = callback_data.tournament_id
+    tournament = await get_managed_tournament(call, session, tournament_id)
+    if not tournament:
+        return
+
+    logger.info(f"User {call.from_user.id} opened dashboard of tournament {tournament_id}")
+    # Заявки по статусам — из счётчиков в памяти, SQL только для итогов и игроков
+    await stats_counters.ensure_loaded(session)
+    statuses = stats_counters.by_tournament(tournament_id)
+    dashboard = await crud.tournament_dashboard(session, tournament_id)
+    progress = dashboard["progress"]
+    text = (
+        f"📈 <b>{tournament.name}</b>\n\n"
+        f"Заявки: ⏳ {statuses[TeamStatus.PENDING]} · ✅ {statuses[TeamStatus.APPROVED]} · "
+        f"❌ {statuses[TeamStatus.REJECTED]}\n"
+        f"Итоги одобренных: 🏆 {progress[ProgressStatus.WINNER]} · 💀 {progress[ProgressStatus.LOSER]} · "
+        f"🎮 в игре {progress[ProgressStatus.IN_PROGRESS]}\n"
+        f"👤 Игроков в одобренных командах: {dashboard['players']} (запасных {dashboard['substitutes']})"
+    )
+    # Кривая регистраций — из почасовой сводки событий, таблицу teams не сканируем
+    hourly = await crud.team_event_curve(
+        session, tournament_id, kinds=(TeamEventKind.REGISTERED,), limit=DASHBOARD_HOURS
+    )
+    if hourly:
+        counts = [(started, kinds[TeamEventKind.REGISTERED]) for started, kinds in hourly.items()]
+        peak = max(count for _, count in counts)
+        text += "\n\n🕒 Заявки по часам (UTC):\n" + "\n".join(
+            f"<code>{started:%d.%m %H:00}</code> {'▇' * max(1, round(count * 10 / peak))} {count}"
+            for started, count in counts
+        )
+    # Время обновления — чтобы «Обновить» без изменений не падал на «message is not modified»
+    text += f"\n\n<i>Обновлено {datetime.utcnow():%H:%M:%S} UTC</i>"
+    await call.message.edit_text(text, parse_mode="HTML", reply_markup=tournament_dashboard_kb(tournament_id))
+
+@router.callback_query(TOURNAMENT_REGISTRATIONS_CSV.filter())
+async def export_tournament_registrations(
+    call: CallbackQuery, session: AsyncSession, callback_data: TOURNAMENT_REGISTRATIONS_CSV.Args
+):
+    """CSV с событиями заявок турнира по дням и по часам — из сводок team_events"""
+    tournament_id = callback_data.tournament_id
+    if not await get_managed_tournament(call, session, tournament_id):
+        return
+
+    logger.info(f"User {call.from_user.id} exported registrations of tournament {tournament_id}")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["period", "bucket_utc", *(kind.value for kind in TeamEventKind)])
+    for period, rollup in (("day", TeamEventDaily), ("hour", TeamEventHourly)):
+        for bucket, counts in (await crud.team_event_curve(session, tournament_id, rollup)).items():
+            writer.writerow([period, f"{bucket:%Y-%m-%d %H:%M}", *counts.values()])
+    await call.message.answer_document(
+        BufferedInputFile(buffer.getvalue().encode("utf-8"), filename=f"registrations_{tournament_id}.csv"),
+        caption="📥 События заявок по дням и часам (UTC)"
+    )
+    await call.answer()
     
-@router.callback_query(F.data.startswith("preview_team_"))
-async def preview_team(call: CallbackQuery, session: AsyncSession):
-    team_id = int(call.data.split("_")[2])
+@router.callback_query(PREVIEW_TEAM.filter())
+async def preview_team(call: CallbackQuery, session: AsyncSession, callback_data: PREVIEW_TEAM.Args):
+    team_id = callback_data.team_id
     team = await session.get(Team, team_id)
     tournament = await session.get(Tournament, team.tournament_id)
     players = await session.scalars(select(Player).where(Player.team_id == team.id))
@@ -589,7 +674,7 @@ async def get_user_by_id(message: Message, session: AsyncSession):
 
 from app.filters.admin import SuperAdminFilter
 
-@router.message(SuperAdminFilter(), F.text.startswith("/ban"))
+@router.message(F.text.startswith("/ban"), SuperAdminFilter())
 async def ban_user(message: Message, session: AsyncSession):
     try:
         parts = message.text.split(maxsplit=2)
@@ -602,7 +687,17 @@ async def ban_user(message: Message, session: AsyncSession):
         logger.error(f"Failed to ban user. Message: {message.text}. Error: {e}", exc_info=True)
         await message.answer("Используйте: /ban <user_id> <причина>")
 
-@router.message(SuperAdminFilter(), F.text.startswith("/unban"))
+@router.message(F.text.startswith("/reload_catalog"), AdminFilter())
+async def reload_catalog(message: Message, session: AsyncSession):
+    """Перечитать игры и форматы после правки каталога в БД"""
+    snapshot = await catalog.reload(session)
+    logger.info(f"Admin {message.from_user.id} reloaded catalog (version {snapshot.version})")
+    await message.answer(
+        f"🔄 Каталог обновлён (версия {snapshot.version}): "
+        f"{len(snapshot.games)} игр, {len(snapshot.formats_by_id)} форматов."
+    )
+
+@router.message(F.text.startswith("/unban"), SuperAdminFilter())
 async def unban_user(message: Message, session: AsyncSession):
     try:
         user_id = int(message.text.split()[1])
@@ -613,7 +708,7 @@ async def unban_user(message: Message, session: AsyncSession):
         logger.error(f"Failed to unban user. Message: {message.text}. Error: {e}", exc_info=True)
         await message.answer("Используйте: /unban <user_id>")
 
-@router.message(AdminFilter(), F.text.startswith("/team_win"))
+@router.message(F.text.startswith("/team_win"), AdminFilter())
 async def set_team_winner(message: Message, session: AsyncSession, state: FSMContext):
     await state.clear()  # Очистка состояния перед выполнением команды
     parts = message.text.strip().split(maxsplit=1)
@@ -643,7 +738,7 @@ async def set_team_winner(message: Message, session: AsyncSession, state: FSMCon
     logger.info(f"User {message.from_user.id} set team '{team.team_name}' as WINNER")
     await message.answer(f"✅ Команда <b>{team.team_name}</b> отмечена как победитель.", parse_mode="HTML")
 
-@router.message(AdminFilter(), F.text.startswith("/team_lose"))
+@router.message(F.text.startswith("/team_lose"), AdminFilter())
 async def set_team_loser(message: Message, session: AsyncSession, state: FSMContext):
     await state.clear()
     parts = message.text.strip().split(maxsplit=1)
@@ -678,7 +773,7 @@ PLAY_OFF_GROUP_URL = "https://t.me/+DTMg_J80D2RhM2Ni"        # замените
 
 
 
-@router.callback_query(F.data == "notifications_menu")
+@router.callback_query(NOTIFICATIONS_MENU.filter())
 async def show_notifications_menu(call: CallbackQuery):
     await call.message.edit_text(
         "Меню рассылок:",
@@ -686,7 +781,7 @@ async def show_notifications_menu(call: CallbackQuery):
     )
 
 
-@router.callback_query(F.data == "notify_all_users")
+@router.callback_query(NOTIFY_ALL_USERS.filter())
 async def notify_all_users_start(call: CallbackQuery, state: FSMContext):
     await call.message.edit_text("Введите текст рассылки для всех пользователей:")
     await state.set_state(Broadcast.TEXT)
@@ -707,13 +802,14 @@ async def broadcast_get_photo(message: Message, state: FSMContext, session: Asyn
     failed = 0
     wait_msg = await message.answer("Рассылка начата, ожидайте...")
     photo_id = message.photo[-1].file_id
-    for user in users:
-        try:
-            await bot.send_photo(user.telegram_id, photo=photo_id, caption=text)
-            sent += 1
-        except Exception as e:
-            logger.warning(f"Не удалось отправить сообщение пользователю {user.telegram_id}: {e}")
-            failed += 1
+    with bulk_lane("broadcast", total=len(users)):
+        for user in users:
+            try:
+                await bot.send_photo(user.telegram_id, photo=photo_id, caption=text)
+                sent += 1
+            except Exception as e:
+                logger.warning(f"Не удалось отправить сообщение пользователю {user.telegram_id}: {e}")
+                failed += 1
     await wait_msg.delete()
     await message.answer(
         f"Рассылка завершена.\n✅ Успешно: {sent}\n❌ Не доставлено: {failed}",
@@ -731,13 +827,14 @@ async def broadcast_no_photo(message: Message, state: FSMContext, session: Async
         sent = 0
         failed = 0
         wait_msg = await message.answer("Рассылка начата, ожидайте...")
-        for user in users:
-            try:
-                await bot.send_message(user.telegram_id, text)
-                sent += 1
-            except Exception as e:
-                logger.warning(f"Не удалось отправить сообщение пользователю {user.telegram_id}: {e}")
-                failed += 1
+        with bulk_lane("broadcast", total=len(users)):
+            for user in users:
+                try:
+                    await bot.send_message(user.telegram_id, text)
+                    sent += 1
+                except Exception as e:
+                    logger.warning(f"Не удалось отправить сообщение пользователю {user.telegram_id}: {e}")
+                    failed += 1
         await wait_msg.delete()
         await message.answer(
             f"Рассылка завершена.\n✅ Успешно: {sent}\n❌ Не доставлено: {failed}",
@@ -747,7 +844,7 @@ async def broadcast_no_photo(message: Message, state: FSMContext, session: Async
     else:
         await message.answer("Пожалуйста, отправьте фото или напишите 'нет'.")
 
-@router.callback_query(F.data == "notify_winners")
+@router.callback_query(NOTIFY_WINNERS.filter())
 async def notify_winners_cb(call: CallbackQuery, session: AsyncSession, bot: Bot):
     wait_msg = await call.message.answer("Рассылка победителям начата, ожидайте...")
     await call.message.delete()
@@ -760,28 +857,29 @@ async def notify_winners_cb(call: CallbackQuery, session: AsyncSession, bot: Bot
     teams = list(teams)
     sent = 0
     failed = 0
-    for team in teams:
-        captain = await session.scalar(select(User).where(User.telegram_id == team.captain_tg_id))
-        if not captain:
-            failed += 1
-            continue
-        try:
-            await bot.send_message(
-                captain.telegram_id,
-                (
-                    "👍 | <b>Отличная игра!</b> Ваша команда успешно преодолела квалификацию турнира по Mobile Legends: Bang Bang от Donatov.net.\n\n"
-                    "Теперь вы официально приглашены в следующую стадию соревнования — <b>«Групповой этап»</b>.\n\n"
-                    "📅 <b>Дата и время начала группового этапа:</b> С 9 по 12 июня включительно.\n\n"
-                    "По ссылке ниже вы можете перейти в чат предназначенный для участников группового этапа турнира.\n\n"
-                    "Готовьтесь — дальше будет только жарче! 🔥👍"
-                ),
-                reply_markup=group_invite_kb(PLAY_OFF_GROUP_URL, "Группа следующего этапа"),
-                parse_mode="HTML"
-)
-            sent += 1
-        except Exception as e:
-            logger.warning(f"Не удалось отправить сообщение капитану {captain.telegram_id}: {e}")
-            failed += 1
+    with bulk_lane("notify_winners", total=len(teams)):
+        for team in teams:
+            captain = await session.scalar(select(User).where(User.telegram_id == team.captain_tg_id))
+            if not captain:
+                failed += 1
+                continue
+            try:
+                await bot.send_message(
+                    captain.telegram_id,
+                    (
+                        "👍 | <b>Отличная игра!</b> Ваша команда успешно преодолела квалификацию турнира по Mobile Legends: Bang Bang от Donatov.net.\n\n"
+                        "Теперь вы официально приглашены в следующую стадию соревнования — <b>«Групповой этап»</b>.\n\n"
+                        "📅 <b>Дата и время начала группового этапа:</b> С 9 по 12 июня включительно.\n\n"
+                        "По ссылке ниже вы можете перейти в чат предназначенный для участников группового этапа турнира.\n\n"
+                        "Готовьтесь — дальше будет только жарче! 🔥👍"
+                    ),
+                    reply_markup=group_invite_kb(PLAY_OFF_GROUP_URL, "Группа следующего этапа"),
+                    parse_mode="HTML"
+                )
+                sent += 1
+            except Exception as e:
+                logger.warning(f"Не удалось отправить сообщение капитану {captain.telegram_id}: {e}")
+                failed += 1
     await wait_msg.delete()
     await call.message.answer(
         f"Рассылка победителям завершена.\n"
@@ -791,7 +889,7 @@ async def notify_winners_cb(call: CallbackQuery, session: AsyncSession, bot: Bot
     )
 
 
-@router.callback_query(F.data == "notify_losers")
+@router.callback_query(NOTIFY_LOSERS.filter())
 async def notify_losers_cb(call: CallbackQuery, session: AsyncSession, bot: Bot):
     wait_msg = await call.message.answer("Рассылка проигравшим начата, ожидайте...")
     await call.message.delete()
@@ -805,29 +903,30 @@ async def notify_losers_cb(call: CallbackQuery, session: AsyncSession, bot: Bot)
     teams = list(teams)
     sent = 0
     failed = 0
-    for team in teams:
-        captain = await session.scalar(select(User).where(User.telegram_id == team.captain_tg_id))
-        if not captain:
-            failed += 1
-            continue
-        try:
-            await bot.send_message(
-                captain.telegram_id,
-                (
-                    "Вы не прошли квалификацию, но у вас есть ещё шанс!\n\n"
-                    "Спасибо за участие в сегодняшнем дне квалификаций турнира по Mobile Legends: Bang Bang от Donatov.net.\n"
-                    "К сожалению, ваша команда не прошла в следующий этап, но это ещё не конец.\n\n"
-                    "⏭ Приглашаем вас принять участие в четвертом дне квалификаций, который состоится 8 июня в 19:00 по времени Бишкека (GMT+6).\n\n"
-                    "🔥 Вы можете зарегистрироваться на четвертый квалификационный день и попробовать свои силы ещё раз!\n\n"
-                    "Покажите свой максимум и поборитесь за выход в следующий этап!"
-                ),
-                reply_markup=tournaments_btn_kb(),
-                parse_mode="HTML"
-            )
-            sent += 1
-        except Exception as e:
-            logger.warning(f"Не удалось отправить сообщение капитану {captain.telegram_id}: {e}")
-            failed += 1
+    with bulk_lane("notify_losers", total=len(teams)):
+        for team in teams:
+            captain = await session.scalar(select(User).where(User.telegram_id == team.captain_tg_id))
+            if not captain:
+                failed += 1
+                continue
+            try:
+                await bot.send_message(
+                    captain.telegram_id,
+                    (
+                        "Вы не прошли квалификацию, но у вас есть ещё шанс!\n\n"
+                        "Спасибо за участие в сегодняшнем дне квалификаций турнира по Mobile Legends: Bang Bang от Donatov.net.\n"
+                        "К сожалению, ваша команда не прошла в следующий этап, но это ещё не конец.\n\n"
+                        "⏭ Приглашаем вас принять участие в четвертом дне квалификаций, который состоится 8 июня в 19:00 по времени Бишкека (GMT+6).\n\n"
+                        "🔥 Вы можете зарегистрироваться на четвертый квалификационный день и попробовать свои силы ещё раз!\n\n"
+                        "Покажите свой максимум и поборитесь за выход в следующий этап!"
+                    ),
+                    reply_markup=tournaments_btn_kb(),
+                    parse_mode="HTML"
+                )
+                sent += 1
+            except Exception as e:
+                logger.warning(f"Не удалось отправить сообщение капитану {captain.telegram_id}: {e}")
+                failed += 1
     await wait_msg.delete()
     await call.message.answer(
         f"Рассылка проигравшим завершена.\n"
@@ -836,7 +935,7 @@ async def notify_losers_cb(call: CallbackQuery, session: AsyncSession, bot: Bot)
         reply_markup=back_to_admin_kb()
     )
 
-@router.callback_query(F.data == "notify_inprogress")
+@router.callback_query(NOTIFY_IN_PROGRESS.filter())
 async def notify_inprogress_cb(call: CallbackQuery, session: AsyncSession, bot: Bot):
     wait_msg = await call.message.answer("Рассылка командам 'в процессе' начата, ожидайте...")
     await call.message.delete()
@@ -849,29 +948,30 @@ async def notify_inprogress_cb(call: CallbackQuery, session: AsyncSession, bot:
     teams = list(teams)
     sent = 0
     failed = 0
-    for team in teams:
-        captain = await session.scalar(select(User).where(User.telegram_id == team.captain_tg_id))
-        if not captain:
-            failed += 1
-            continue
-        try:
-            await bot.send_message(
-                captain.telegram_id,
-                (
-                    "Вы пропустили первый день квалификации, но ещё не всё потеряно!\n\n"
-                    "Вы не участвовали в прошедшей квалификации, но у вас всё ещё есть шанс побороться за место в турнире по Mobile Legends: Bang Bang от Donatov.net.\n\n"
-                    "🕹 Следующий день квалификаций пройдёт 7 июня в 19:00 по времени Бишкека (GMT+6).\n"
-                    "Вы можете зарегистрироваться и присоединиться к игре.\n\n"
-                    "👇 Регистрация доступна по кнопке ниже\n\n"
-                    "🔥 Не упустите возможность опробовать свою силу!"
-                ),
-                reply_markup=tournaments_btn_kb(),
-                parse_mode="HTML"
-            )
-            sent += 1
-        except Exception as e:
-            logger.warning(f"Не удалось отправить сообщение капитану {captain.telegram_id}: {e}")
-            failed += 1
+    with bulk_lane("notify_inprogress", total=len(teams)):
+        for team in teams:
+            captain = await session.scalar(select(User).where(User.telegram_id == team.captain_tg_id))
+            if not captain:
+                failed += 1
+                continue
+            try:
+                await bot.send_message(
+                    captain.telegram_id,
+                    (
+                        "Вы пропустили первый день квалификации, но ещё не всё потеряно!\n\n"
+                        "Вы не участвовали в прошедшей квалификации, но у вас всё ещё есть шанс побороться за место в турнире по Mobile Legends: Bang Bang от Donatov.net.\n\n"
+                        "🕹 Следующий день квалификаций пройдёт 7 июня в 19:00 по времени Бишкека (GMT+6).\n"
+                        "Вы можете зарегистрироваться и присоединиться к игре.\n\n"
+                        "👇 Регистрация доступна по кнопке ниже\n\n"
+                        "🔥 Не упустите возможность опробовать свою силу!"
+                    ),
+                    reply_markup=tournaments_btn_kb(),
+                    parse_mode="HTML"
+                )
+                sent += 1
+            except Exception as e:
+                logger.warning(f"Не удалось отправить сообщение капитану {captain.telegram_id}: {e}")
+                failed += 1
     await wait_msg.delete()
     await call.message.answer(
         f"Рассылка командам 'в процессе' завершена.\n"
@@ -882,7 +982,7 @@ async def notify_inprogress_cb(call: CallbackQuery, session: AsyncSession, bot:
     
 
 
-@router.message(AdminFilter(), F.text.startswith("/send_teams"))
+@router.message(F.text.startswith("/send_teams"), AdminFilter())
 async def send_approved_teams(message: Message, session: AsyncSession, bot: Bot):
     parts = message.text.strip().split(maxsplit=1)
     if len(parts) != 2:
@@ -897,51 +997,51 @@ async def send_approved_teams(message: Message, session: AsyncSession, bot: Bot)
         await message.answer("Нет одобренных команд.")
         return
 
-    for idx, team in enumerate(teams, 1):
-        # Получаем турнир
-        tournament = await session.get(Tournament, team.tournament_id)
-        # Получаем капитана
-        captain = await session.scalar(select(User).where(User.telegram_id == team.captain_tg_id))
-        # Получаем участников
-        players = await session.scalars(select(Player).where(Player.team_id == team.id))
-        players = list(players)
-        # Формируем список участников
-        members = []
-        for player in players:
-            members.append(f"{player.nickname} (ID в игре: {player.game_id})")
-        members_text = ", ".join(members) if members else "—"
-
-        # Формируем текст сообщения
-        text = (
-            f"<b>{idx}. {team.team_name}</b>\n"
-            f"<b>Турнир:</b> {tournament.name if tournament else '-'}\n"
-            f"<b>Капитан:</b> @{captain.username if captain and captain.username else captain.telegram_id if captain else '-'}\n"
-            f"<b>Участники:</b> {members_text}"
-        )
+    with bulk_lane("send_teams", total=len(teams)):
+        for idx, team in enumerate(teams, 1):
+            # Получаем турнир
+            tournament = await session.get(Tournament, team.tournament_id)
+            # Получаем капитана
+            captain = await session.scalar(select(User).where(User.telegram_id == team.captain_tg_id))
+            # Получаем участников
+            players = await session.scalars(select(Player).where(Player.team_id == team.id))
+            players = list(players)
+            # Формируем список участников
+            members = []
+            for player in players:
+                members.append(f"{player.nickname} (ID в игре: {player.game_id})")
+            members_text = ", ".join(members) if members else "—"
+
+            # Формируем текст сообщения
+            text = (
+                f"<b>{idx}. {team.team_name}</b>\n"
+                f"<b>Турнир:</b> {tournament.name if tournament else '-'}\n"
+                f"<b>Капитан:</b> @{captain.username if captain and captain.username else captain.telegram_id if captain else '-'}\n"
+                f"<b>Участники:</b> {members_text}"
+            )
 
-        # Отправляем логотип, если есть
-        if team.logo_path and os.path.exists(team.logo_path):
-            try:
-                logo = FSInputFile(team.logo_path)
-                await bot.send_photo(
+            # Отправляем логотип, если есть
+            if team.logo_path and os.path.exists(team.logo_path):
+                try:
+                    logo = FSInputFile(team.logo_path)
+                    await bot.send_photo(
+                        group_chat_id,
+                        photo=logo,
+                        caption=text,
+                        parse_mode="HTML"
+                    )
+                except Exception as e:
+                    await message.answer(f"Ошибка отправки фото команды {team.team_name}: {e}")
+            else:
+                await bot.send_message(
                     group_chat_id,
-                    photo=logo,
-                    caption=text,
+                    text,
                     parse_mode="HTML"
                 )
-            except Exception as e:
-                await message.answer(f"Ошибка отправки фото команды {team.team_name}: {e}")
-        else:
-            await bot.send_message(
-                group_chat_id,
-                text,
-                parse_mode="HTML"
-            )
-        await asyncio.sleep(3.1)  # <-- задержка между отправками
 
     await message.answer("Данные о командах отправлены в группу.")
     
-@router.message(AdminFilter(), F.text.startswith("/teams_captains"))
+@router.message(F.text.startswith("/teams_captains"), AdminFilter())
 async def send_teams_captains(message: Message, session: AsyncSession, bot: Bot):
     parts = message.text.strip().split(maxsplit=1)
     if len(parts) != 2:
@@ -973,7 +1073,7 @@ async def send_teams_captains(message: Message, session: AsyncSession, bot: Bot)
     except Exception as e:
         await message.answer(f"Ошибка отправки: {e}")
         
-@router.message(AdminFilter(), F.text.startswith("/check_captains"))
+@router.message(F.text.startswith("/check_captains"), AdminFilter())
 async def check_captains_in_group(message: Message, session: AsyncSession, bot: Bot):
     parts = message.text.strip().split(maxsplit=1)
     if len(parts) != 2:
@@ -59,7 +59,8 @@ async def cmd_start(message: Message, session: AsyncSession):
 async def cancel_action(message: Message, state: FSMContext):
     logger.info(f"User {message.from_user.id} cancelled action")
     await state.clear()
-    await message.answer("❌ Действие отменено")
+    # Простые ответы возвращаем методом: в режиме вебхука они уходят в ответе на запрос Telegram
+    return message.answer("❌ Действие отменено")
 
 @router.message(Command("admin"))
 async def cmd_admin(message: Message, session: AsyncSession):
@@ -85,7 +86,7 @@ async def cmd_admin(message: Message, session: AsyncSession):
 @router.message(F.text == "ℹ️ Помощь")
 async def support_handler(message: Message):
     logger.info(f"User {message.from_user.id} requested support info")
-    await message.answer(
+    return message.answer(
         "📌 <b>Раздел помощи</b>\n\n"
         "Если у вас возникли вопросы или требуется помощь, пожалуйста, обратитесь:\n\n"
         "🔹<b>По общим вопросам о турнире:</b>\n"
@@ -97,4 +98,4 @@ async def support_handler(message: Message):
     
 @router.message()
 async def catch_all(message: Message):
-    await message.answer("Я тебя не понимаю. Пожалуйста, воспользуйтесь меню или командами.", reply_markup=main_menu_kb())
\ No newline at end of file
+    return message.answer("Я тебя не понимаю. Пожалуйста, воспользуйтесь меню или командами.", reply_markup=main_menu_kb())
\ No newline at end of file
@@ -1,37 +1,54 @@
 import logging
 logger = logging.getLogger(__name__)
 
-from aiogram import Router, F, Bot
+from aiogram import Bot
 from aiogram.types import Message, CallbackQuery, FSInputFile, InlineKeyboardButton
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.database.db import User, UserRole, Tournament, TournamentStatus, Game
-from app.database.crud import update_user_role
+from app.database.db import User, UserRole, Tournament, TournamentStatus
+from app.database.crud import admin_list_query, update_user_role
 from app.keyboards.admin import super_admin_menu, manage_admins_kb, admin_main_menu, moderation_actions_kb
 from app.filters.admin import SuperAdminFilter
+from app.filters.handler_index import HandlerIndexFilter
+from app.keyboards.pagination import fetch_page
+from app.utils.callbacks import (
+    ActionRouter,
+    ADD_ADMIN, APPROVE_TOURNAMENT, BACK_TO_SUPER_ADMIN, MANAGE_ADMINS, MODERATE_TOURNAMENTS, PAGE,
+    REJECT_TOURNAMENT, SWITCH_TO_ADMIN_MENU, TOGGLE_ADMIN, VIEW_PENDING_TOURNAMENT,
+)
+from app.services.catalog import catalog
+from app.services.render_cache import render_cache
+from app.services.memory import MemoryTracker
+from app.services.profiler import PROFILE_MAX_SECONDS, HandlerProfiler
 from app.states import AdminActions
 from aiogram.fsm.context import FSMContext
 
-router = Router()
-router.message.filter(SuperAdminFilter())
+router = ActionRouter()
+# Сначала дешёвая проверка команды/состояния, роль из БД — только для сообщений этого роутера
+router.message.filter(HandlerIndexFilter(router.message), SuperAdminFilter())
 
 @router.message(Command("admin"))
 async def super_admin_panel(message: Message, session: AsyncSession):
     logger.info(f"SuperAdmin {message.from_user.id} opened super-admin panel")
     await message.answer("⚡️ Супер-админ панель:", reply_markup=super_admin_menu())
 
-@router.callback_query(F.data == "manage_admins")
+@router.callback_query(MANAGE_ADMINS.filter())
 async def manage_admins(call: CallbackQuery, session: AsyncSession):
     logger.info(f"SuperAdmin {call.from_user.id} opened admin management")
-    admins = await session.scalars(
-        select(User).where(User.role.in_([UserRole.ADMIN, UserRole.SUPER_ADMIN])))
-    await call.message.edit_text("👥 Нажмите на Ник админа чтоб удалить его:", reply_markup=manage_admins_kb(admins))
+    page = await fetch_page(session, admin_list_query(), User.id)
+    await call.message.edit_text("👥 Нажмите на Ник админа чтоб удалить его:", reply_markup=manage_admins_kb(page))
 
-@router.callback_query(F.data.startswith("toggle_admin_"))
-async def toggle_admin(call: CallbackQuery, session: AsyncSession):
-    user_id = int(call.data.split("_")[2])
+@router.callback_query(PAGE.filter(list_name="adm"))
+async def admins_navigate(call: CallbackQuery, session: AsyncSession, callback_data: PAGE.Args):
+    page = await fetch_page(session, admin_list_query(), User.id, callback_data.direction, callback_data.cursor)
+    await call.message.edit_reply_markup(reply_markup=manage_admins_kb(page))
+    await call.answer()
+
+@router.callback_query(TOGGLE_ADMIN.filter())
+async def toggle_admin(call: CallbackQuery, session: AsyncSession, callback_data: TOGGLE_ADMIN.Args):
+    user_id = callback_data.user_id
     target_user = await session.get(User, user_id)
     logger.info(f"SuperAdmin {call.from_user.id} toggles admin status for user {user_id}")
     if target_user.role == UserRole.SUPER_ADMIN:
@@ -45,7 +62,7 @@ async def toggle_admin(call: CallbackQuery, session: AsyncSession):
     await call.answer(f"✅ Статус {target_user.full_name} изменен!")
     await manage_admins(call, session)
 
-@router.callback_query(F.data == "switch_to_admin_menu")
+@router.callback_query(SWITCH_TO_ADMIN_MENU.filter())
 async def switch_to_admin_menu(call: CallbackQuery):
     logger.info(f"SuperAdmin {call.from_user.id} switched to admin menu")
     await call.message.edit_text(
@@ -53,15 +70,13 @@ async def switch_to_admin_menu(call: CallbackQuery):
         reply_markup=admin_main_menu()
     )
 
-@router.callback_query(F.data == "manage_admins")
+@router.callback_query(MANAGE_ADMINS.filter())
 async def manage_admins(call: CallbackQuery, session: AsyncSession):
     logger.info(f"SuperAdmin {call.from_user.id} requested admin list")
-    admins = await session.scalars(
-        select(User).where(User.role.in_([UserRole.ADMIN, UserRole.SUPER_ADMIN]))
-    )
-    await call.message.edit_text("👥 Список администраторов:", reply_markup=manage_admins_kb(admins))
+    page = await fetch_page(session, admin_list_query(), User.id)
+    await call.message.edit_text("👥 Список администраторов:", reply_markup=manage_admins_kb(page))
 
-@router.callback_query(F.data == "add_admin")
+@router.callback_query(ADD_ADMIN.filter())
 async def start_add_admin(call: CallbackQuery, state: FSMContext):
     logger.info(f"SuperAdmin {call.from_user.id} starts adding admin")
     await call.message.answer("📝 Введите юзернейм пользователя (например, @username):")
@@ -96,7 +111,7 @@ async def process_admin_username(message: Message, session: AsyncSession, state:
             await message.answer("⚠️ Произошла ошибка!")
     await state.clear()
 
-@router.callback_query(F.data == "back_to_super_admin")
+@router.callback_query(BACK_TO_SUPER_ADMIN.filter())
 async def switch_to_admin_menu(call: CallbackQuery):
     logger.info(f"SuperAdmin {call.from_user.id} switched to super-admin menu")
     await call.message.edit_text(
@@ -104,7 +119,7 @@ async def switch_to_admin_menu(call: CallbackQuery):
         reply_markup=super_admin_menu()
     )
 
-@router.callback_query(F.data == "moderate_tournaments")
+@router.callback_query(MODERATE_TOURNAMENTS.filter())
 async def show_pending_tournaments(call: CallbackQuery, session: AsyncSession):
     logger.info(f"SuperAdmin {call.from_user.id} requested pending tournaments")
     tournaments = await session.scalars(
@@ -115,13 +130,13 @@ async def show_pending_tournaments(call: CallbackQuery, session: AsyncSession):
     for tournament in tournaments:
         builder.button(
             text=f"{tournament.name}",
-            callback_data=f"view_pending_tournament_{tournament.id}"
+            callback_data=VIEW_PENDING_TOURNAMENT.pack(tournament.id)
         )
     builder.adjust(1)
     builder.row(
         InlineKeyboardButton(
             text="◀️ Назад",
-            callback_data="back_to_super_admin"
+            callback_data=BACK_TO_SUPER_ADMIN.pack()
         )
     )
     await call.message.edit_text(
@@ -129,12 +144,12 @@ async def show_pending_tournaments(call: CallbackQuery, session: AsyncSession):
         reply_markup=builder.as_markup()
     )
 
-@router.callback_query(F.data.startswith("view_pending_tournament_"))
-async def view_pending_tournament(call: CallbackQuery, session: AsyncSession, bot: Bot):
-    tournament_id = int(call.data.split("_")[3])
+@router.callback_query(VIEW_PENDING_TOURNAMENT.filter())
+async def view_pending_tournament(call: CallbackQuery, session: AsyncSession, bot: Bot, callback_data: VIEW_PENDING_TOURNAMENT.Args):
+    tournament_id = callback_data.tournament_id
     logger.info(f"SuperAdmin {call.from_user.id} views pending tournament {tournament_id}")
     tournament = await session.get(Tournament, tournament_id)
-    game = await session.get(Game, tournament.game_id)
+    game = (await catalog.get(session)).games_by_id.get(tournament.game_id)
     text = (
         f"🏆 {tournament.name}\n\n"
         f"🎮 Игра: {game.name if game else 'Не указана'}\n"
@@ -164,12 +179,13 @@ async def view_pending_tournament(call: CallbackQuery, session: AsyncSession, bo
         logger.error(f"Failed to send regulations for tournament {tournament_id}: {e}")
         await call.message.answer("⚠️ Регламент не найден!")
 
-@router.callback_query(F.data.startswith("approve_tournament_"))
-async def approve_tournament(call: CallbackQuery, session: AsyncSession):
-    tournament_id = int(call.data.split("_")[2])
+@router.callback_query(APPROVE_TOURNAMENT.filter())
+async def approve_tournament(call: CallbackQuery, session: AsyncSession, callback_data: APPROVE_TOURNAMENT.Args):
+    tournament_id = callback_data.tournament_id
     logger.info(f"SuperAdmin {call.from_user.id} approves tournament {tournament_id}")
     tournament = await session.get(Tournament, tournament_id)
     tournament.status = TournamentStatus.APPROVED
+    render_cache.invalidate_on_commit(session, tournament_id)
     await session.commit()
     creator = await session.get(User, tournament.created_by)
     await call.message.bot.send_message(
@@ -179,12 +195,13 @@ async def approve_tournament(call: CallbackQuery, session: AsyncSession):
     await call.message.delete()
     await call.answer("✅ Турнир одобрен!", show_alert=True)
 
-@router.callback_query(F.data.startswith("reject_tournament_"))
-async def reject_tournament(call: CallbackQuery, session: AsyncSession):
-    tournament_id = int(call.data.split("_")[2])
+@router.callback_query(REJECT_TOURNAMENT.filter())
+async def reject_tournament(call: CallbackQuery, session: AsyncSession, callback_data: REJECT_TOURNAMENT.Args):
+    tournament_id = callback_data.tournament_id
     logger.info(f"SuperAdmin {call.from_user.id} rejects tournament {tournament_id}")
     tournament = await session.get(Tournament, tournament_id)
     tournament.status = TournamentStatus.REJECTED
+    render_cache.invalidate_on_commit(session, tournament_id)
     await session.commit()
     creator = await session.get(User, tournament.created_by)
     await call.message.bot.send_message(
@@ -192,4 +209,66 @@ async def reject_tournament(call: CallbackQuery, session: AsyncSession):
         f"❌ Ваш турнир «{tournament.name}» отклонен!"
     )
     await call.message.delete()
-    await call.answer("❌ Турнир отклонен!", show_alert=True)
\ No newline at end of file
+    await call.answer("❌ Турнир отклонен!", show_alert=True)
+
+@router.message(Command("profile"))
+async def profile_handler(message: Message, command: CommandObject, profiler: HandlerProfiler):
+    """/profile <обработчик|all> <N — вызовов | Ns — секунд>, /profile stop"""
+    args = (command.args or "").split()
+    if args == ["stop"]:
+        if profiler.session is None:
+            await message.answer("Профилирование не запущено.")
+        else:
+            await profiler.finish()
+        return
+    if len(args) != 2 or not args[1].rstrip("s").isdigit() or int(args[1].rstrip("s")) <= 0:
+        await message.answer(
+            "Использование:\n"
+            "/profile show_games 20 — следующие 20 вызовов обработчика\n"
+            "/profile all 30s — все обработчики в течение 30 секунд\n"
+            "/profile stop — остановить досрочно"
+        )
+        return
+
+    handler_name, amount = args
+    if handler_name != "all" and handler_name not in profiler.handler_names():
+        await message.answer(f"❌ Обработчик {handler_name} не найден.")
+        return
+    if profiler.session is not None:
+        await message.answer("❌ Профилирование уже запущено. Остановите его: /profile stop")
+        return
+
+    seconds = calls = None
+    if amount.endswith("s"):
+        seconds = min(int(amount[:-1]), PROFILE_MAX_SECONDS)
+    else:
+        calls = int(amount)
+    logger.info(f"SuperAdmin {message.from_user.id} started profiling {handler_name} ({amount})")
+    profiler.start(
+        message.bot, message.chat.id,
+        handler=None if handler_name == "all" else handler_name,
+        seconds=seconds, calls=calls
+    )
+    limit = f"{seconds} с" if seconds is not None else f"{calls} вызовов"
+    await message.answer(f"⏱ Профилирую {handler_name}: {limit}. Сводка придёт сюда.")
+
+@router.message(Command("memory"))
+async def memory_handler(message: Message, command: CommandObject, memory: MemoryTracker):
+    """/memory start [интервал, с], /memory stop, /memory — отчёт"""
+    args = (command.args or "").split()
+    if args[:1] == ["start"]:
+        interval = float(args[1]) if len(args) > 1 and args[1].isdigit() else None
+        memory.start(interval)
+        logger.info(f"SuperAdmin {message.from_user.id} started memory tracking")
+        await message.answer(f"🧠 Трекинг памяти включён, снимки каждые {memory.interval:.0f} с пишутся в лог.")
+        return
+    if args[:1] == ["stop"]:
+        memory.stop()
+        await message.answer("🧠 Трекинг памяти выключен.")
+        return
+
+    report = await memory.report()
+    await message.answer(
+        "<pre>" + report[:3900].replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;") + "</pre>",
+        parse_mode="HTML"
+    )
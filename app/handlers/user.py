@@ -1,4 +1,4 @@
-from aiogram import Router, F, Bot
+from aiogram import F, Bot
 from aiogram.types import Message, CallbackQuery, FSInputFile
 from aiogram.fsm.context import FSMContext
 from sqlalchemy import select, delete
@@ -6,10 +6,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.file_handling import save_file
 from app.database import crud
 from app.services.notifications import notify_super_admins
-from app.database.db import User, Player, Game, Team, TeamStatus, UserRole, Tournament, TournamentStatus, GameFormat, Team, Player
+from app.database.db import User, Player, Team, TeamStatus, UserRole, Tournament, Team, Player, TeamEventKind
 from app.states import EditTeam, RegisterTeam
 from app.filters.message_type_filter import MessageTypeFilter
 from app.utils.subscription import check_subscription
+from app.services.outbound import bulk_lane
+from app.services.catalog import catalog
+from app.services.render_cache import render_cache
+from app.services.team_events import team_events
+from app.keyboards.pagination import Page, fetch_page
+from app.utils.callbacks import (
+    ActionRouter,
+    APPROVE_TEAM, BACK_TO_GAMES, BACK_TO_MY_TEAMS, CANCEL_DELETE_TEAM, CHECK_SUBSCRIPTION,
+    CONFIRM_DELETE_TEAM, DELETE_TEAM, EDIT_PLAYER, EDIT_TEAM, EDIT_TEAM_LOGO, EDIT_TEAM_MENU,
+    EDIT_TEAM_NAME, EDIT_TEAM_PLAYERS, MY_TEAM, PAGE, REGISTER, REJECT_TEAM, USER_SELECT_FORMAT,
+    USER_SELECT_GAME, USER_VIEW_TOURNAMENT, VIEW_TOURNAMENT,
+)
 import os
 import re
 import logging
@@ -23,9 +35,8 @@ logger = logging.getLogger(__name__)
 TEAM_APPROVED_CHANNEL_ID = int(os.getenv("TEAM_APPROVED_CHANNEL_ID"))
 # Импорты клавиатур
 from app.keyboards.user import (
-    games_list_kb,
-    tournament_details_kb,
     my_team_actions_kb,
+    my_teams_kb,
     edit_team_menu_kb,
     main_menu_kb,
     captain_groups_url_kb,
@@ -37,66 +48,53 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 
 
-router = Router()
+router = ActionRouter()
 
 @router.message(F.text == "🔍 Активные турниры")
 async def show_games(message: Message, session: AsyncSession, state: FSMContext):
     await state.clear()
     logger.info(f"User {message.from_user.id} requested active games list")
-    games = await session.scalars(select(Game))
+    snapshot = await catalog.get(session)
     await message.answer(
         "🎮 Выберите игру:", 
-        reply_markup=games_list_kb(games)
+        reply_markup=snapshot.games_kb
     )
 
-@router.callback_query(F.data.startswith("view_tournament_"))
-async def show_tournament_info(call: CallbackQuery, session: AsyncSession):
+@router.callback_query(VIEW_TOURNAMENT.filter())
+async def show_tournament_info(call: CallbackQuery, session: AsyncSession, callback_data: VIEW_TOURNAMENT.Args):
 
     """Детали турнира"""
-    tournament_id = int(call.data.split("_")[2])
+    tournament_id = callback_data.tournament_id
     logger.info(f"User {call.from_user.id} requested info for tournament {tournament_id}")
-    tournament = await session.get(Tournament, tournament_id)
-    
-    text = (
-        f"🏅 {tournament.name}\n"
-        f"🕒 Дата начала: {tournament.start_date.strftime('%d.%m.%Y %H:%M')}\n"
-        f"📝 Описание: {tournament.description}"
-    )
-    
+    details = await render_cache.details(session, tournament_id)
+    if details is None:
+        await call.answer("❌ Турнир не найден!", show_alert=True)
+        return
+
     await call.message.edit_text(
-        text, 
-        reply_markup=tournament_details_kb(tournament_id)
+        details.text, 
+        reply_markup=details.markup
     )
     
-@router.callback_query(F.data.startswith("user_select_game_"))
-async def show_formats(call: CallbackQuery, session: AsyncSession, state: FSMContext):
+@router.callback_query(USER_SELECT_GAME.filter())
+async def show_formats(call: CallbackQuery, session: AsyncSession, state: FSMContext, callback_data: USER_SELECT_GAME.Args):
     await state.clear()
-    game_id = int(call.data.split("_")[3])
-    formats = await session.scalars(
-        select(GameFormat).where(GameFormat.game_id == game_id)
-    )
-    formats = list(formats)
-    if not formats:
+    game_id = callback_data.game_id
+    snapshot = await catalog.get(session)
+    formats_kb = snapshot.formats_kb.get(game_id)
+    if formats_kb is None:
         await call.answer("Нет форматов для этой игры!", show_alert=True)
         return
 
-    # Клавиатура с форматами
-    builder = InlineKeyboardBuilder()
-    for fmt in formats:
-        builder.button(
-            text=f"{fmt.format_name} (до {fmt.max_players_per_team})",
-            callback_data=f"user_select_format_{fmt.id}"
-        )
-    builder.adjust(1)
     await call.message.edit_text(
         "Выберите формат:",
-        reply_markup=builder.as_markup()
+        reply_markup=formats_kb
     )
     await state.update_data(game_id=game_id)
 
-@router.callback_query(F.data.startswith("register_"))
-async def start_team_registration(call: CallbackQuery, state: FSMContext, session: AsyncSession):
-    tournament_id = int(call.data.split("_")[1])
+@router.callback_query(REGISTER.filter())
+async def start_team_registration(call: CallbackQuery, state: FSMContext, session: AsyncSession, callback_data: REGISTER.Args):
+    tournament_id = callback_data.tournament_id
     logger.info(f"User {call.from_user.id} starts team registration for tournament {tournament_id}")
     tournament = await session.get(Tournament, tournament_id)
     
@@ -122,7 +120,7 @@ async def start_team_registration(call: CallbackQuery, state: FSMContext, sessio
     await state.set_state(RegisterTeam.TEAM_NAME)
 
 
-@router.callback_query(F.data == "check_subscription")
+@router.callback_query(CHECK_SUBSCRIPTION.filter())
 async def check_subscription_callback(call: CallbackQuery, state: FSMContext, session: AsyncSession):
     data = await state.get_data()
     tournament_id = data.get("tournament_id")
@@ -141,125 +139,91 @@ async def check_subscription_callback(call: CallbackQuery, state: FSMContext, se
     await call.message.answer("🏷 Введите название команды:")
     await state.set_state(RegisterTeam.TEAM_NAME)
         
-@router.callback_query(F.data.startswith("user_select_format_"))
-async def show_tournaments_by_format(call: CallbackQuery, session: AsyncSession, state: FSMContext):
-    format_id = int(call.data.split("_")[3])
-    tournaments = await session.scalars(
-        select(Tournament)
-        .where(Tournament.format_id == format_id)
-        .where(Tournament.is_active == True)
-        .where(Tournament.status == TournamentStatus.APPROVED)
-    )
-    tournaments = list(tournaments)
-    if not tournaments:
+@router.callback_query(USER_SELECT_FORMAT.filter())
+async def show_tournaments_by_format(call: CallbackQuery, session: AsyncSession, state: FSMContext, callback_data: USER_SELECT_FORMAT.Args):
+    format_id = callback_data.format_id
+    listing = await render_cache.format_listing(session, format_id)
+    if listing is None:
         await call.answer("Нет активных турниров для этого формата!", show_alert=True)
         return
 
-    # Клавиатура с турнирами
-    builder = InlineKeyboardBuilder()
-    for t in tournaments:
-        builder.button(
-            text=t.name,
-            callback_data=f"user_view_tournament_{t.id}"
-        )
-    builder.adjust(1)
     await call.message.edit_text(
-        "Выберите турнир:",
-        reply_markup=builder.as_markup()
+        listing.text,
+        reply_markup=listing.markup
     )
     await state.update_data(format_id=format_id)
 
-@router.callback_query(F.data.startswith("user_view_tournament_"))
-async def show_tournament_and_register(call: CallbackQuery, state: FSMContext, session: AsyncSession):
-    tournament_id = int(call.data.split("_")[3])
+@router.callback_query(USER_VIEW_TOURNAMENT.filter())
+async def show_tournament_and_register(call: CallbackQuery, state: FSMContext, session: AsyncSession, callback_data: USER_VIEW_TOURNAMENT.Args):
+    tournament_id = callback_data.tournament_id
     loading_msg = await call.message.answer("⏳ Загружаем данные о турнире...")
 
-    tournament = await session.get(Tournament, tournament_id)
-    if not tournament or not tournament.is_active:
+    card = await render_cache.card(session, tournament_id)
+    if not card or not card.is_active:
         await loading_msg.delete()
         await call.answer("Турнир недоступен для регистрации", show_alert=True)
         return
 
-    # 1. Отправляем фото, если есть
-    if tournament.logo_path and os.path.exists(tournament.logo_path):
+    # 1. Отправляем фото, если есть (после первой загрузки — по file_id)
+    if card.logo_path:
         try:
-            logo = FSInputFile(tournament.logo_path)
-            await call.message.answer_photo(
-                photo=logo,
-                caption=f"Логотип турнира: {tournament.name}"
+            sent = await call.message.answer_photo(
+                photo=render_cache.file(tournament_id, card.logo_path) or FSInputFile(card.logo_path),
+                caption=f"Логотип турнира: {card.name}"
             )
+            render_cache.remember_file(tournament_id, card.logo_path, sent.photo[-1].file_id)
         except Exception:
             pass
 
     # 2. Отправляем регламент, если есть
-    if tournament.regulations_path and os.path.exists(tournament.regulations_path):
+    if card.regulations_path:
         try:
-            regulations = FSInputFile(tournament.regulations_path)
-            await call.message.answer_document(
-                document=regulations,
+            sent = await call.message.answer_document(
+                document=render_cache.file(tournament_id, card.regulations_path) or FSInputFile(card.regulations_path),
                 caption="📄 Регламент турнира"
             )
+            render_cache.remember_file(tournament_id, card.regulations_path, sent.document.file_id)
         except Exception:
             pass
 
     # 3. Описание и кнопки — последним сообщением (кнопки будут внизу)
-    text = (
-        f"🏅 <b>{tournament.name}</b>\n"
-        f"🕒 Дата начала: {tournament.start_date.strftime('%d.%m.%Y %H:%M')}\n"
-        f"📝 Описание: {tournament.description}\n"
-    )
-
-    builder = InlineKeyboardBuilder()
-    builder.button(text="✅ Начать регистрацию", callback_data=f"register_{tournament_id}")
-    builder.button(text="❌ Отмена", callback_data="back_to_games")
-    builder.adjust(1)
-
     await call.message.answer(
-        text,
+        card.text,
         parse_mode="HTML",
-        reply_markup=builder.as_markup()
+        reply_markup=card.markup
     )
     await state.update_data(tournament_id=tournament_id)
     await loading_msg.delete()
     
+async def my_teams_page(session: AsyncSession, tg_id: int, direction: str = "n", cursor: int | None = None) -> Page:
+    user = await session.scalar(select(User).where(User.telegram_id == tg_id))
+    # Супер-админ видит все одобренные команды, обычный пользователь — только свои
+    query = crud.approved_team_list_query(
+        captain_tg_id=None if user and user.role == UserRole.SUPER_ADMIN else tg_id
+    )
+    return await fetch_page(session, query, Team.id, direction, cursor)
+
 @router.message(F.text == "👥 Мои команды")
 async def my_teams(message: Message, session: AsyncSession, state: FSMContext):
     await state.clear()
     logger.info(f"User {message.from_user.id} requested their teams")
-    user = await session.scalar(select(User).where(User.telegram_id == message.from_user.id))
-    if user and user.role == UserRole.SUPER_ADMIN:
-        # Супер-админ видит все одобренные команды
-        teams = await session.scalars(
-            select(Team).where(Team.status == TeamStatus.APPROVED)
-        )
-    else:
-        # Обычный пользователь — только свои одобренные команды
-        teams = await session.scalars(
-            select(Team)
-            .where(
-                (Team.captain_tg_id == message.from_user.id) &
-                (Team.status == TeamStatus.APPROVED)
-            )
-        )
-    teams = list(teams)
-    if not teams:
+    page = await my_teams_page(session, message.from_user.id)
+    if not page.rows:
         await message.answer("У вас нет команд.")
         return
 
     text = "Ваши команды:\n"
-    builder = InlineKeyboardBuilder()
-    for team in teams:
-        is_captain = team.captain_tg_id == message.from_user.id
-        builder.button(
-            text=f"{team.team_name} {'(капитан)' if is_captain else ''}",
-            callback_data=f"my_team_{team.id}"
-        )
-    builder.adjust(2)
     await message.answer(
         text + "\nВыберите команду для подробностей:",
-        reply_markup=builder.as_markup()
+        reply_markup=my_teams_kb(page, message.from_user.id)
     )
 
+@router.callback_query(PAGE.filter(list_name="myt"))
+async def my_teams_navigate(call: CallbackQuery, session: AsyncSession, callback_data: PAGE.Args):
+    page = await my_teams_page(session, call.from_user.id, callback_data.direction, callback_data.cursor)
+    await call.message.edit_reply_markup(reply_markup=my_teams_kb(page, call.from_user.id))
+    await call.answer()
+
 
 @router.message(RegisterTeam.TEAM_NAME, MessageTypeFilter())
 async def process_team_name(message: Message, state: FSMContext, session: AsyncSession):
@@ -317,7 +281,15 @@ async def process_player_count(message: Message, state: FSMContext, session: Asy
         player_count = int(message.text)
         data = await state.get_data()
         tournament = await session.get(Tournament, data['tournament_id'])
-        format = await session.get(GameFormat, tournament.format_id)
+        format = (await catalog.get(session)).formats_by_id.get(tournament.format_id)
+        if format is None:
+            # Формат добавили после загрузки каталога — перечитываем его один раз
+            format = (await catalog.reload(session)).formats_by_id.get(tournament.format_id)
+        if format is None:
+            logger.warning(f"Format {tournament.format_id} of tournament {tournament.id} not found in catalog")
+            await message.answer("❌ Формат турнира не найден. Обратитесь к организатору.")
+            await state.clear()
+            return
         if player_count < format.min_players_per_team or player_count > format.max_players_per_team:
             await message.answer(f"❌ Количество игроков должно быть от {format.min_players_per_team} до {format.max_players_per_team}.")
             return
@@ -487,6 +459,7 @@ async def finish_team_registration(message: Message, state: FSMContext, session:
             captain_id  # <-- тоже Telegram ID капитана
         )
 
+    team_events.record_on_commit(session, TeamEventKind.REGISTERED, team, captain_id)
     await session.commit()  # Важно: сохраняем изменения в базе данных
 
     await notify_admins_about_new_team(bot, session, team.id)
@@ -505,23 +478,24 @@ async def notify_admins_about_new_team(bot: Bot, session: AsyncSession, team_id:
         f"Капитан: {team.captain_tg_id}"
     )
     
-    for admin in admins:
-        try:
-            await bot.send_message(
-                admin.telegram_id,
-                notification_text,
-                reply_markup=team_request_preview_kb(team_id)
-            )
-        except Exception as e:
-            logger.error(f"Failed to notify admin {admin.telegram_id}: {e}")
+    with bulk_lane("new_team_notice"):
+        for admin in admins:
+            try:
+                await bot.send_message(
+                    admin.telegram_id,
+                    notification_text,
+                    reply_markup=team_request_preview_kb(team_id)
+                )
+            except Exception as e:
+                logger.error(f"Failed to notify admin {admin.telegram_id}: {e}")
 
 
 
 
-@router.callback_query(F.data.startswith("my_team_"))
-async def show_my_team(call: CallbackQuery, session: AsyncSession):
-    logger.info(f"User {call.from_user.id} requested details for team {call.data}")
-    team_id = int(call.data.split("_")[2])
+@router.callback_query(MY_TEAM.filter())
+async def show_my_team(call: CallbackQuery, session: AsyncSession, callback_data: MY_TEAM.Args):
+    logger.info(f"User {call.from_user.id} requested details for team {callback_data.team_id}")
+    team_id = callback_data.team_id
     team = await session.get(Team, team_id)
     if not team:
         await call.answer("Команда не найдена", show_alert=True)
@@ -588,21 +562,21 @@ async def show_my_team(call: CallbackQuery, session: AsyncSession):
         reply_markup=my_team_actions_kb(team.id, is_captain)
     )
 
-@router.callback_query(F.data == "back_to_games")
+@router.callback_query(BACK_TO_GAMES.filter())
 async def back_to_games(call: CallbackQuery, session: AsyncSession, state: FSMContext):
     await state.clear()
-    games = await session.scalars(select(Game))
+    snapshot = await catalog.get(session)
     await call.message.edit_text(
         "🎮 Выберите игру:",
-        reply_markup=games_list_kb(games)
+        reply_markup=snapshot.games_kb
     )
 
 from aiogram.exceptions import TelegramAPIError
 
-@router.callback_query(F.data.startswith("approve_team_"))
-async def approve_team(call: CallbackQuery, session: AsyncSession, bot: Bot):
-    logger.info(f"Admin {call.from_user.id} approves team {call.data}")
-    team_id = int(call.data.split("_")[2])
+@router.callback_query(APPROVE_TEAM.filter())
+async def approve_team(call: CallbackQuery, session: AsyncSession, bot: Bot, callback_data: APPROVE_TEAM.Args):
+    logger.info(f"Admin {call.from_user.id} approves team {callback_data.team_id}")
+    team_id = callback_data.team_id
     team = await session.get(Team, team_id)
     if not team:
         await call.answer("Команда не найдена", show_alert=True)
@@ -612,6 +586,7 @@ async def approve_team(call: CallbackQuery, session: AsyncSession, bot: Bot):
         await call.message.delete()
         return
     team.status = TeamStatus.APPROVED
+    team_events.record_on_commit(session, TeamEventKind.APPROVED, team, call.from_user.id)
     await session.commit()
     await call.answer("Команда одобрена!")
     await call.message.delete()
@@ -660,10 +635,10 @@ async def approve_team(call: CallbackQuery, session: AsyncSession, bot: Bot):
     except Exception as e:
         logger.error(f"Failed to send approved team info to channel: {e}", exc_info=True)
 
-@router.callback_query(F.data.startswith("reject_team_"))
-async def reject_team(call: CallbackQuery, session: AsyncSession, bot: Bot):
-    logger.info(f"Admin {call.from_user.id} rejects team {call.data}")
-    team_id = int(call.data.split("_")[2])
+@router.callback_query(REJECT_TEAM.filter())
+async def reject_team(call: CallbackQuery, session: AsyncSession, bot: Bot, callback_data: REJECT_TEAM.Args):
+    logger.info(f"Admin {call.from_user.id} rejects team {callback_data.team_id}")
+    team_id = callback_data.team_id
     team = await session.get(Team, team_id)
     if not team:
         await call.answer("Команда не найдена", show_alert=True)
@@ -674,6 +649,7 @@ async def reject_team(call: CallbackQuery, session: AsyncSession, bot: Bot):
         await call.message.delete()
         return
     team.status = TeamStatus.REJECTED
+    team_events.record_on_commit(session, TeamEventKind.REJECTED, team, call.from_user.id)
     await session.commit()
     await call.answer("Команда отклонена.")
     await call.message.delete()
@@ -683,10 +659,10 @@ async def reject_team(call: CallbackQuery, session: AsyncSession, bot: Bot):
         f"❌ Ваша команда '{team.team_name}' отклонена организатором турнира."
     )
 
-@router.callback_query(F.data.startswith("delete_team_"))
-async def delete_team(call: CallbackQuery, session: AsyncSession):
-    logger.info(f"User {call.from_user.id} wants to delete team {call.data}")
-    team_id = int(call.data.split("_")[2])
+@router.callback_query(DELETE_TEAM.filter())
+async def delete_team(call: CallbackQuery, session: AsyncSession, callback_data: DELETE_TEAM.Args):
+    logger.info(f"User {call.from_user.id} wants to delete team {callback_data.team_id}")
+    team_id = callback_data.team_id
     team = await session.get(Team, team_id)
     if not team:
         await call.answer("Команда не найдена", show_alert=True)
@@ -701,9 +677,9 @@ async def delete_team(call: CallbackQuery, session: AsyncSession):
         reply_markup=confirm_delete_team_kb(team_id)
     )
     
-@router.callback_query(F.data.startswith("confirm_delete_team_"))
-async def confirm_delete_team(call: CallbackQuery, session: AsyncSession):
-    team_id = int(call.data.split("_")[3])
+@router.callback_query(CONFIRM_DELETE_TEAM.filter())
+async def confirm_delete_team(call: CallbackQuery, session: AsyncSession, callback_data: CONFIRM_DELETE_TEAM.Args):
+    team_id = callback_data.team_id
     team = await session.get(Team, team_id)
     if not team or team.captain_tg_id != call.from_user.id:
         await call.answer("Ошибка при удалении команды", show_alert=True)
@@ -716,6 +692,7 @@ async def confirm_delete_team(call: CallbackQuery, session: AsyncSession):
         os.remove(logo_path)
         logger.info(f"Логотип команды удалён: {logo_path}")
     await session.delete(team)
+    team_events.record_on_commit(session, TeamEventKind.DELETED, team, call.from_user.id)
     await session.commit()
 
     await call.answer("Команда успешно удалена", show_alert=True)
@@ -723,13 +700,13 @@ async def confirm_delete_team(call: CallbackQuery, session: AsyncSession):
     # Можно отправить новое сообщение или обновить список команд
     # await my_teams(call.message, session, call.bot.get('state'))
 
-@router.callback_query(F.data == "cancel_delete_team")
+@router.callback_query(CANCEL_DELETE_TEAM.filter())
 async def cancel_delete_team(call: CallbackQuery, session: AsyncSession, state: FSMContext):
     await call.answer("Удаление команды отменено")
     await call.message.delete()  # Удаляем сообщение с подтверждением
     await my_teams(call.message, session, state)
 
-@router.callback_query(F.data == "back_to_my_teams")
+@router.callback_query(BACK_TO_MY_TEAMS.filter())
 async def back_to_my_teams(call: CallbackQuery, session: AsyncSession):
     teams = await session.scalars(
         select(Team)
@@ -748,7 +725,7 @@ async def back_to_my_teams(call: CallbackQuery, session: AsyncSession):
         is_captain = team.captain_tg_id == call.from_user.id
         builder.button(
             text=f"{team.team_name} {'(капитан)' if is_captain else ''}",
-            callback_data=f"my_team_{team.id}"
+            callback_data=MY_TEAM.pack(team.id)
         )
     await call.message.edit_text(
         text + "\nВыберите команду для подробностей:",
@@ -756,10 +733,10 @@ async def back_to_my_teams(call: CallbackQuery, session: AsyncSession):
     )
 
 
-@router.callback_query(F.data.regexp(r"^edit_team_\d+$"))
-async def edit_team_menu(call: CallbackQuery, state: FSMContext, session: AsyncSession):
-    logger.info(f"User {call.from_user.id} opens edit menu for team {call.data}")
-    team_id = int(call.data.split("_")[2])
+@router.callback_query(EDIT_TEAM.filter())
+async def edit_team_menu(call: CallbackQuery, state: FSMContext, session: AsyncSession, callback_data: EDIT_TEAM.Args):
+    logger.info(f"User {call.from_user.id} opens edit menu for team {callback_data.team_id}")
+    team_id = callback_data.team_id
     team = await session.get(Team, team_id)
     if not team or team.captain_tg_id != call.from_user.id:
         await call.answer("Только капитан может редактировать команду!", show_alert=True)
@@ -771,10 +748,10 @@ async def edit_team_menu(call: CallbackQuery, state: FSMContext, session: AsyncS
     )
     await state.set_state(EditTeam.CHOICE)
 
-@router.callback_query(F.data.regexp(r"^edit_team_name_\d+$"))
-async def edit_team_name(call: CallbackQuery, state: FSMContext):
-    logger.info(f"User {call.from_user.id} wants to edit team name for {call.data}")
-    team_id = int(call.data.split("_")[3])
+@router.callback_query(EDIT_TEAM_NAME.filter())
+async def edit_team_name(call: CallbackQuery, state: FSMContext, callback_data: EDIT_TEAM_NAME.Args):
+    logger.info(f"User {call.from_user.id} wants to edit team name for {callback_data.team_id}")
+    team_id = callback_data.team_id
     await state.update_data(team_id=team_id)
     await call.message.answer("Введите новое название команды:")
     await state.set_state(EditTeam.NAME)
@@ -823,10 +800,10 @@ async def process_edit_team_name(message: Message, state: FSMContext, session: A
     await message.answer("Название команды успешно изменено!")
     await state.clear()
     
-@router.callback_query(F.data.regexp(r"^edit_team_logo_\d+$"))
-async def edit_team_logo(call: CallbackQuery, state: FSMContext):
-    logger.info(f"User {call.from_user.id} wants to edit team logo for {call.data}")
-    team_id = int(call.data.split("_")[3])
+@router.callback_query(EDIT_TEAM_LOGO.filter())
+async def edit_team_logo(call: CallbackQuery, state: FSMContext, callback_data: EDIT_TEAM_LOGO.Args):
+    logger.info(f"User {call.from_user.id} wants to edit team logo for {callback_data.team_id}")
+    team_id = callback_data.team_id
     await state.update_data(team_id=team_id)
     await call.message.answer("Загрузите новый логотип команды (фото):")
     await state.set_state(EditTeam.LOGO)
@@ -855,9 +832,9 @@ async def process_edit_team_logo(message: Message, state: FSMContext, session: A
     await message.answer("Логотип команды обновлён!")
     await state.clear()
     
-@router.callback_query(F.data.regexp(r"^edit_team_players_\d+$"))
-async def edit_team_players(call: CallbackQuery, state: FSMContext, session: AsyncSession):
-    team_id = int(call.data.split("_")[3])
+@router.callback_query(EDIT_TEAM_PLAYERS.filter())
+async def edit_team_players(call: CallbackQuery, state: FSMContext, session: AsyncSession, callback_data: EDIT_TEAM_PLAYERS.Args):
+    team_id = callback_data.team_id
     team = await session.get(Team, team_id)
     if not team or team.captain_tg_id != call.from_user.id:
         await call.answer("Только капитан может редактировать команду!", show_alert=True)
@@ -871,9 +848,9 @@ async def edit_team_players(call: CallbackQuery, state: FSMContext, session: Asy
     )
     await state.set_state(EditTeam.PLAYERS)
 
-@router.callback_query(F.data.startswith("edit_player_"))
-async def edit_player_start(call: CallbackQuery, state: FSMContext, session: AsyncSession):
-    player_id = int(call.data.split("_")[2])
+@router.callback_query(EDIT_PLAYER.filter())
+async def edit_player_start(call: CallbackQuery, state: FSMContext, session: AsyncSession, callback_data: EDIT_PLAYER.Args):
+    player_id = callback_data.player_id
     player = await session.get(Player, player_id)
     if not player:
         await call.answer("Игрок не найден.", show_alert=True)
@@ -944,7 +921,7 @@ async def process_edit_player(message: Message, state: FSMContext, session: Asyn
     )
     await state.set_state(EditTeam.PLAYERS)
 
-@router.callback_query(F.data == "edit_team_menu")
+@router.callback_query(EDIT_TEAM_MENU.filter())
 async def back_to_edit_team_menu(call: CallbackQuery, state: FSMContext, session: AsyncSession):
     data = await state.get_data()
     team_id = data.get("team_id")
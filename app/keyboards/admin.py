@@ -1,15 +1,26 @@
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from app.database.db import UserRole, TournamentStatus
+from app.keyboards.pagination import Page, paginated_kb
+from app.utils.callbacks import (
+    ACTIVATE_TOURNAMENT, ADD_ADMIN, ADMIN_SELECT_FORMAT, ADMIN_SELECT_GAME, ADMIN_TOURNAMENT,
+    APPROVE_TEAM, APPROVE_TOURNAMENT, BACK_TO_ADMIN, BACK_TO_SUPER_ADMIN, BACK_TO_TOURNAMENTS,
+    CANCEL_ACTION, CONFIRM_DELETE_TOURNAMENT, CREATE_TOURNAMENT, DEACTIVATE_TOURNAMENT,
+    DELETE_TOURNAMENT, EDIT_TOURNAMENT, MANAGE_ADMINS, MANAGE_TOURNAMENTS, MODERATE_TEAM,
+    MODERATE_TEAMS, MODERATE_TOURNAMENTS, NOTIFICATIONS_MENU, NOTIFY_ALL_USERS, NOTIFY_IN_PROGRESS,
+    NOTIFY_LOSERS, NOTIFY_WINNERS, PREVIEW_TEAM, REJECT_TEAM, REJECT_TOURNAMENT, SHOW_TOURNAMENTS,
+    STATS, SWITCH_TO_ADMIN_MENU, TOGGLE_ADMIN, TOURNAMENT_DASHBOARD,
+    TOURNAMENT_REGISTRATIONS_CSV,
+)
 
 
 def admin_main_menu() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.row(
-        InlineKeyboardButton(text="🏆 Управление турнирами", callback_data="manage_tournaments"),
-        InlineKeyboardButton(text="📊 Статистика", callback_data="stats"),
-        InlineKeyboardButton(text="📝 Модерация команд", callback_data="moderate_teams"),
-        InlineKeyboardButton(text="📢 Рассылки", callback_data="notifications_menu"),  # Новая кнопка
+        InlineKeyboardButton(text="🏆 Управление турнирами", callback_data=MANAGE_TOURNAMENTS.pack()),
+        InlineKeyboardButton(text="📊 Статистика", callback_data=STATS.pack()),
+        InlineKeyboardButton(text="📝 Модерация команд", callback_data=MODERATE_TEAMS.pack()),
+        InlineKeyboardButton(text="📢 Рассылки", callback_data=NOTIFICATIONS_MENU.pack()),  # Новая кнопка
         width=1
     )
     return builder.as_markup()
@@ -22,47 +33,57 @@ def admin_tournaments_kb(tournaments: list) -> InlineKeyboardMarkup:
         status = "✅" if tournament.is_active else "❌"
         builder.button(
             text=f"{tournament.name} {status}",
-            callback_data=f"admin_tournament_{tournament.id}"
+            callback_data=ADMIN_TOURNAMENT.pack(tournament.id)
         )
     
     builder.adjust(1)
     builder.row(
-        InlineKeyboardButton(text="➕ Создать турнир", callback_data="create_tournament"),
-        InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_admin"),
+        InlineKeyboardButton(text="➕ Создать турнир", callback_data=CREATE_TOURNAMENT.pack()),
+        InlineKeyboardButton(text="◀️ Назад", callback_data=BACK_TO_ADMIN.pack()),
         width=2
     )
     return builder.as_markup()
 
 def tournament_actions_kb(tournament_id: int, is_active: bool) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    builder.button(text="🗑 Удалить", callback_data=f"delete_tournament_{tournament_id}")
-    builder.button(text="◀️ Назад к списку", callback_data="back_to_tournaments")
+    builder.button(text="🗑 Удалить", callback_data=DELETE_TOURNAMENT.pack(tournament_id))
+    builder.button(text="◀️ Назад к списку", callback_data=BACK_TO_TOURNAMENTS.pack())
     if is_active:
-        builder.button(text="🔴 Сделать неактивным", callback_data=f"deactivate_tournament_{tournament_id}")
+        builder.button(text="🔴 Сделать неактивным", callback_data=DEACTIVATE_TOURNAMENT.pack(tournament_id))
     else:
-        builder.button(text="🟢 Сделать активным", callback_data=f"activate_tournament_{tournament_id}")
+        builder.button(text="🟢 Сделать активным", callback_data=ACTIVATE_TOURNAMENT.pack(tournament_id))
+    builder.button(text="📈 Сводка по командам", callback_data=TOURNAMENT_DASHBOARD.pack(tournament_id))
     builder.adjust(2)
     return builder.as_markup()
 
-def tournaments_management_kb(tournaments) -> InlineKeyboardMarkup:
+def tournament_dashboard_kb(tournament_id: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    for t in tournaments:
-        status = "🔄" if t.status == TournamentStatus.PENDING else "✅"
-        builder.button(
-            text=f"{t.name} {status}",
-            callback_data=f"edit_tournament_{t.id}"
-        )
-    builder.row(
-        InlineKeyboardButton(text="➕ Создать", callback_data="create_tournament"),
-        InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_admin"),
-        width=2
-    )
-    builder.adjust(1)
+    builder.button(text="🔄 Обновить", callback_data=TOURNAMENT_DASHBOARD.pack(tournament_id))
+    builder.button(text="📥 Выгрузка CSV", callback_data=TOURNAMENT_REGISTRATIONS_CSV.pack(tournament_id))
+    builder.button(text="◀️ Назад к списку", callback_data=BACK_TO_TOURNAMENTS.pack())
+    builder.adjust(2)
     return builder.as_markup()
 
+def tournaments_management_kb(page: Page) -> InlineKeyboardMarkup:
+    return paginated_kb(
+        page, "tm",
+        lambda t: (f"{t.name} {'🔄' if t.status == TournamentStatus.PENDING else '✅'}", EDIT_TOURNAMENT.pack(t.id)),
+        footer=(
+            InlineKeyboardButton(text="➕ Создать", callback_data=CREATE_TOURNAMENT.pack()),
+            InlineKeyboardButton(text="◀️ Назад", callback_data=BACK_TO_ADMIN.pack()),
+        ),
+    )
+
+def pending_teams_kb(page: Page) -> InlineKeyboardMarkup:
+    return paginated_kb(
+        page, "mt",
+        lambda team: (f"{team.team_name} (турнир ID: {team.tournament_id})", MODERATE_TEAM.pack(team.id)),
+        footer=(InlineKeyboardButton(text="◀️ Назад", callback_data=BACK_TO_ADMIN.pack()),),
+    )
+
 def back_to_admin_kb() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    builder.button(text="◀️ В админ-панель", callback_data="back_to_admin")
+    builder.button(text="◀️ В админ-панель", callback_data=BACK_TO_ADMIN.pack())
     return builder.as_markup()
 
 def games_select_kb(games):
@@ -70,8 +91,20 @@ def games_select_kb(games):
     for game in games:
         builder.button(
             text=game.name, 
-            callback_data=f"admin_select_game_{game.id}"  # Новый префикс
+            callback_data=ADMIN_SELECT_GAME.pack(game.id)
         )
+    builder.adjust(1)
+    return builder.as_markup()
+
+def formats_select_kb(formats) -> InlineKeyboardMarkup:
+    """Выбор формата при создании турнира"""
+    builder = InlineKeyboardBuilder()
+    for fmt in formats:
+        builder.button(
+            text=f"{fmt.format_name} (до {fmt.max_players_per_team})",
+            callback_data=ADMIN_SELECT_FORMAT.pack(fmt.id)
+        )
+    builder.adjust(1)
     return builder.as_markup()
 
 def confirm_action_kb(tournament_id: int) -> InlineKeyboardMarkup:
@@ -80,11 +113,11 @@ def confirm_action_kb(tournament_id: int) -> InlineKeyboardMarkup:
     builder.row(
         InlineKeyboardButton(
             text="✅ Подтвердить", 
-            callback_data=f"confirm_delete_{tournament_id}"
+            callback_data=CONFIRM_DELETE_TOURNAMENT.pack(tournament_id)
         ),
         InlineKeyboardButton(
             text="❌ Отменить", 
-            callback_data="cancel_action"
+            callback_data=CANCEL_ACTION.pack()
         ),
         width=2
     )
@@ -96,29 +129,28 @@ from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 def super_admin_menu() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.row(
-        InlineKeyboardButton(text="👥 Управление админами", callback_data="manage_admins"),
-        InlineKeyboardButton(text="📋 Модерация турниров", callback_data="moderate_tournaments"),  # Новая кнопка
-        InlineKeyboardButton(text="🔧 Обычное админ-меню", callback_data="switch_to_admin_menu"),
+        InlineKeyboardButton(text="👥 Управление админами", callback_data=MANAGE_ADMINS.pack()),
+        InlineKeyboardButton(text="📋 Модерация турниров", callback_data=MODERATE_TOURNAMENTS.pack()),  # Новая кнопка
+        InlineKeyboardButton(text="🔧 Обычное админ-меню", callback_data=SWITCH_TO_ADMIN_MENU.pack()),
         width=1
     )
     return builder.as_markup()
 
-def manage_admins_kb(admins):
-    builder = InlineKeyboardBuilder()
-    for admin in admins:
-        status = "👑" if admin.role == UserRole.SUPER_ADMIN else "🛡️"
-        builder.button(
-            text=f"{admin.full_name} {status}",
-            callback_data=f"toggle_admin_{admin.id}"
-        )
-    builder.button(text="➕ Добавить админа", callback_data="add_admin")
-    builder.button(text="◀️ Назад", callback_data="back_to_super_admin")
-    builder.adjust(1)
-    return builder.as_markup()
+def manage_admins_kb(page: Page) -> InlineKeyboardMarkup:
+    return paginated_kb(
+        page, "adm",
+        lambda admin: (
+            f"{admin.full_name} {'👑' if admin.role == UserRole.SUPER_ADMIN else '🛡️'}", TOGGLE_ADMIN.pack(admin.id)
+        ),
+        footer=(
+            InlineKeyboardButton(text="➕ Добавить админа", callback_data=ADD_ADMIN.pack()),
+            InlineKeyboardButton(text="◀️ Назад", callback_data=BACK_TO_SUPER_ADMIN.pack()),
+        ),
+    )
 
 def back_to_super_admin_kb():
     builder = InlineKeyboardBuilder()
-    builder.button(text="◀️ Назад", callback_data="back_to_super_admin")
+    builder.button(text="◀️ Назад", callback_data=BACK_TO_SUPER_ADMIN.pack())
     return builder.as_markup()
 
 def moderation_actions_kb(tournament_id: int) -> InlineKeyboardMarkup:
@@ -126,11 +158,11 @@ def moderation_actions_kb(tournament_id: int) -> InlineKeyboardMarkup:
     builder.row(
         InlineKeyboardButton(
             text="✅ Одобрить", 
-            callback_data=f"approve_tournament_{tournament_id}"
+            callback_data=APPROVE_TOURNAMENT.pack(tournament_id)
         ),
         InlineKeyboardButton(
             text="❌ Отклонить", 
-            callback_data=f"reject_tournament_{tournament_id}"
+            callback_data=REJECT_TOURNAMENT.pack(tournament_id)
         ),
         width=2
     )
@@ -138,41 +170,42 @@ def moderation_actions_kb(tournament_id: int) -> InlineKeyboardMarkup:
 
 def team_request_kb(team_id: int):
     builder = InlineKeyboardBuilder()
-    builder.button(text="✅ Одобрить", callback_data=f"approve_team_{team_id}")
-    builder.button(text="❌ Отклонить", callback_data=f"reject_team_{team_id}")
+    builder.button(text="✅ Одобрить", callback_data=APPROVE_TEAM.pack(team_id))
+    builder.button(text="❌ Отклонить", callback_data=REJECT_TEAM.pack(team_id))
     builder.adjust(2)
     return builder.as_markup()
 
 def tournament_status_kb(tournament_id: int, is_active: bool) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     if is_active:
-        builder.button(text="🔴 Сделать неактивным", callback_data=f"deactivate_tournament_{tournament_id}")
+        builder.button(text="🔴 Сделать неактивным", callback_data=DEACTIVATE_TOURNAMENT.pack(tournament_id))
     else:
-        builder.button(text="🟢 Сделать активным", callback_data=f"activate_tournament_{tournament_id}")
-    builder.button(text="◀️ Назад", callback_data="back_to_tournaments")
+        builder.button(text="🟢 Сделать активным", callback_data=ACTIVATE_TOURNAMENT.pack(tournament_id))
+    builder.button(text="📈 Сводка по командам", callback_data=TOURNAMENT_DASHBOARD.pack(tournament_id))
+    builder.button(text="◀️ Назад", callback_data=BACK_TO_TOURNAMENTS.pack())
     builder.adjust(1)
     return builder.as_markup()
 
 def team_request_preview_kb(team_id: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    builder.button(text="👁 Посмотреть команду", callback_data=f"preview_team_{team_id}")
+    builder.button(text="👁 Посмотреть команду", callback_data=PREVIEW_TEAM.pack(team_id))
     builder.adjust(1)
     return builder.as_markup()
 
 def team_request_preview_kb(team_id: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    builder.button(text="👁 Посмотреть команду", callback_data=f"preview_team_{team_id}")
+    builder.button(text="👁 Посмотреть команду", callback_data=PREVIEW_TEAM.pack(team_id))
     builder.adjust(1)
     return builder.as_markup()
 
 def notifications_menu_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="Сделать рассылку всем", callback_data="notify_all_users")],
-            [InlineKeyboardButton(text="Победителям", callback_data="notify_winners")],
-            [InlineKeyboardButton(text="Проигравшим", callback_data="notify_losers")],
-            [InlineKeyboardButton(text="Командам в процессе", callback_data="notify_inprogress")],
-            [InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_admin")]
+            [InlineKeyboardButton(text="Сделать рассылку всем", callback_data=NOTIFY_ALL_USERS.pack())],
+            [InlineKeyboardButton(text="Победителям", callback_data=NOTIFY_WINNERS.pack())],
+            [InlineKeyboardButton(text="Проигравшим", callback_data=NOTIFY_LOSERS.pack())],
+            [InlineKeyboardButton(text="Командам в процессе", callback_data=NOTIFY_IN_PROGRESS.pack())],
+            [InlineKeyboardButton(text="◀️ Назад", callback_data=BACK_TO_ADMIN.pack())]
         ]
     )
     
@@ -187,6 +220,6 @@ def group_invite_kb(url: str, text: str = "Перейти в группу") -> I
 def tournaments_btn_kb():
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="Турниры", callback_data="show_tournaments")]
+            [InlineKeyboardButton(text="Турниры", callback_data=SHOW_TOURNAMENTS.pack())]
         ]
     )
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""Постраничные inline-клавиатуры для больших списков (keyset-пагинация).
+
+Страница выбирается не через OFFSET, а по последнему показанному id: «вперёд» —
+id > курсора, «назад» — id < курсора в обратном порядке. Каждая страница — один
+запрос с LIMIT, время не растёт с номером страницы. Курсор живёт в callback_data
+действия PAGE (app/utils/callbacks.py):
+
+    pg:<список>:n:<id>   следующая страница после id
+    pg:<список>:p:<id>   предыдущая страница перед id
+
+    @router.callback_query(PAGE.filter(list_name="mt"))
+    async def navigate(call: CallbackQuery, session: AsyncSession, callback_data: PAGE.Args):
+        page = await fetch_page(session, crud.pending_team_list_query(), Team.id,
+                                callback_data.direction, callback_data.cursor)
+        markup = paginated_kb(page, "mt", lambda team: (team.team_name, MODERATE_TEAM.pack(team.id)))
+"""
+from dataclasses import dataclass
+from typing import Callable, Sequence
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from app.utils.callbacks import PAGE
+
+PAGE_SIZE = 20
+
+
+@dataclass(frozen=True, slots=True)
+class Page:
+    rows: Sequence
+    has_prev: bool
+    has_next: bool
+    first: int | None  # ключи крайних строк — курсоры для навигации
+    last: int | None
+
+
+async def fetch_page(session, query, key, direction: str = "n", cursor: int | None = None,
+                     size: int = PAGE_SIZE) -> Page:
+    """Одна страница запроса query, упорядоченного по уникальной колонке key (обычно id)"""
+    if direction == "p":
+        page_query = query.where(key < cursor).order_by(key.desc())
+    else:
+        page_query = query.where(key > cursor) if cursor is not None else query
+        page_query = page_query.order_by(key)
+    # Лишняя строка показывает, есть ли что-то дальше в этом направлении
+    rows = (await session.execute(page_query.limit(size + 1))).all()
+    if direction == "p" and not rows:
+        # Строки перед курсором удалили — показываем первую страницу, а не пустую без навигации
+        return await fetch_page(session, query, key, "n", None, size)
+    more = len(rows) > size
+    rows = rows[:size]
+    if direction == "p":
+        rows.reverse()
+        has_prev, has_next = more, True
+    else:
+        has_prev, has_next = cursor is not None, more
+    name = key.key
+    return Page(
+        rows=rows,
+        has_prev=has_prev and bool(rows),
+        has_next=has_next and bool(rows),
+        first=getattr(rows[0], name) if rows else None,
+        last=getattr(rows[-1], name) if rows else None,
+    )
+
+
+def paginated_kb(
+    page: Page,
+    list_name: str,
+    button: Callable[[object], tuple[str, str]],
+    footer: Sequence[InlineKeyboardButton] = (),
+    columns: int = 1,
+) -> InlineKeyboardMarkup:
+    """Кнопки строк страницы (button(row) -> (текст, callback_data)), навигация и нижний ряд"""
+    builder = InlineKeyboardBuilder()
+    for row in page.rows:
+        text, callback_data = button(row)
+        builder.button(text=text, callback_data=callback_data)
+    builder.adjust(columns)
+    navigation = []
+    if page.has_prev:
+        navigation.append(InlineKeyboardButton(text="◀️", callback_data=PAGE.pack(list_name, "p", page.first)))
+    if page.has_next:
+        navigation.append(InlineKeyboardButton(text="▶️", callback_data=PAGE.pack(list_name, "n", page.last)))
+    if navigation:
+        builder.row(*navigation)
+    if footer:
+        builder.row(*footer, width=len(footer))
+    return builder.as_markup()
@@ -5,6 +5,13 @@ from aiogram.types import (
     ReplyKeyboardMarkup, 
     KeyboardButton
 )
+from app.keyboards.pagination import Page, paginated_kb
+from app.utils.callbacks import (
+    BACK_TO_GAMES, BACK_TO_MY_TEAMS, BACK_TO_TOURNAMENTS, CANCEL_DELETE_TEAM, CANCEL_REGISTRATION,
+    CHECK_SUBSCRIPTION, CONFIRM_DELETE_TEAM, DELETE_TEAM, EDIT_PLAYER, EDIT_TEAM, EDIT_TEAM_LOGO,
+    EDIT_TEAM_MENU, EDIT_TEAM_NAME, EDIT_TEAM_PLAYERS, MY_TEAM, REGISTER, RULES, USER_SELECT_FORMAT,
+    USER_SELECT_GAME, USER_VIEW_TOURNAMENT, VIEW_TOURNAMENT,
+)
 import os
 from dotenv import load_dotenv
 load_dotenv()
@@ -26,8 +33,19 @@ def games_list_kb(games):
     for game in games:
         builder.button(
             text=game.name,
-            callback_data=f"user_select_game_{game.id}"  # Новый префикс
+            callback_data=USER_SELECT_GAME.pack(game.id)
+        )
+    return builder.as_markup()
+
+def formats_list_kb(formats) -> InlineKeyboardMarkup:
+    """Форматы выбранной игры"""
+    builder = InlineKeyboardBuilder()
+    for fmt in formats:
+        builder.button(
+            text=f"{fmt.format_name} (до {fmt.max_players_per_team})",
+            callback_data=USER_SELECT_FORMAT.pack(fmt.id)
         )
+    builder.adjust(1)
     return builder.as_markup()
 
 def tournaments_list_kb(tournaments: list) -> InlineKeyboardMarkup:
@@ -36,45 +54,73 @@ def tournaments_list_kb(tournaments: list) -> InlineKeyboardMarkup:
     for tournament in tournaments:
         builder.button(
             text=f"{tournament.name} 🏆",
-            callback_data=f"view_tournament_{tournament.id}"
+            callback_data=VIEW_TOURNAMENT.pack(tournament.id)
         )
     builder.row(
-        InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_games"),
+        InlineKeyboardButton(text="◀️ Назад", callback_data=BACK_TO_GAMES.pack()),
         width=1
     )
     return builder.as_markup()
 
+def format_tournaments_kb(tournaments) -> InlineKeyboardMarkup:
+    """Активные турниры выбранного формата"""
+    builder = InlineKeyboardBuilder()
+    for tournament in tournaments:
+        builder.button(
+            text=tournament.name,
+            callback_data=USER_VIEW_TOURNAMENT.pack(tournament.id)
+        )
+    builder.adjust(1)
+    return builder.as_markup()
+
+def tournament_register_kb(tournament_id: int) -> InlineKeyboardMarkup:
+    """Кнопки под карточкой турнира"""
+    builder = InlineKeyboardBuilder()
+    builder.button(text="✅ Начать регистрацию", callback_data=REGISTER.pack(tournament_id))
+    builder.button(text="❌ Отмена", callback_data=BACK_TO_GAMES.pack())
+    builder.adjust(1)
+    return builder.as_markup()
+
 def tournament_details_kb(tournament_id: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.row(
-        InlineKeyboardButton(text="📜 Регламент", callback_data=f"rules_{tournament_id}"),
-        InlineKeyboardButton(text="✅ Зарегистрироваться", callback_data=f"register_{tournament_id}"),  # Добавлено
+        InlineKeyboardButton(text="📜 Регламент", callback_data=RULES.pack(tournament_id)),
+        InlineKeyboardButton(text="✅ Зарегистрироваться", callback_data=REGISTER.pack(tournament_id)),  # Добавлено
         width=1
     )
-    builder.row(InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_tournaments"))
+    builder.row(InlineKeyboardButton(text="◀️ Назад", callback_data=BACK_TO_TOURNAMENTS.pack()))
     return builder.as_markup()
 
 def cancel_registration_kb() -> InlineKeyboardMarkup:
     """Кнопка отмены регистрации"""
     builder = InlineKeyboardBuilder()
-    builder.button(text="❌ Отменить регистрацию", callback_data="cancel_registration")
+    builder.button(text="❌ Отменить регистрацию", callback_data=CANCEL_REGISTRATION.pack())
     return builder.as_markup()
 
+def my_teams_kb(page: Page, viewer_tg_id: int) -> InlineKeyboardMarkup:
+    return paginated_kb(
+        page, "myt",
+        lambda team: (
+            f"{team.team_name} {'(капитан)' if team.captain_tg_id == viewer_tg_id else ''}", MY_TEAM.pack(team.id)
+        ),
+        columns=2,
+    )
+
 def my_team_actions_kb(team_id: int, is_captain: bool):
     builder = InlineKeyboardBuilder()
     if is_captain:
-        builder.button(text="✏️ Редактировать", callback_data=f"edit_team_{team_id}")
-        builder.button(text="🗑 Удалить", callback_data=f"delete_team_{team_id}")
-    builder.button(text="◀️ Назад", callback_data="back_to_my_teams")
+        builder.button(text="✏️ Редактировать", callback_data=EDIT_TEAM.pack(team_id))
+        builder.button(text="🗑 Удалить", callback_data=DELETE_TEAM.pack(team_id))
+    builder.button(text="◀️ Назад", callback_data=BACK_TO_MY_TEAMS.pack())
     builder.adjust(2)
     return builder.as_markup()
 
 def edit_team_menu_kb(team_id: int):
     builder = InlineKeyboardBuilder()
-    builder.button(text="✏️ Название", callback_data=f"edit_team_name_{team_id}")
-    builder.button(text="🖼 Логотип", callback_data=f"edit_team_logo_{team_id}")
-    builder.button(text="👥 Участники", callback_data=f"edit_team_players_{team_id}")
-    builder.button(text="◀️ Назад", callback_data=f"my_team_{team_id}")
+    builder.button(text="✏️ Название", callback_data=EDIT_TEAM_NAME.pack(team_id))
+    builder.button(text="🖼 Логотип", callback_data=EDIT_TEAM_LOGO.pack(team_id))
+    builder.button(text="👥 Участники", callback_data=EDIT_TEAM_PLAYERS.pack(team_id))
+    builder.button(text="◀️ Назад", callback_data=MY_TEAM.pack(team_id))
     builder.adjust(2)
     return builder.as_markup()
 
@@ -83,9 +129,9 @@ def edit_players_kb(players):
     for idx, player in enumerate(players, 1):
         builder.button(
             text=f"{idx}. {player.nickname} (ID: {player.game_id})",
-            callback_data=f"edit_player_{player.id}"
+            callback_data=EDIT_PLAYER.pack(player.id)
         )
-    builder.button(text="⬅️ Назад", callback_data="edit_team_menu")
+    builder.button(text="⬅️ Назад", callback_data=EDIT_TEAM_MENU.pack())
     builder.adjust(1)
     return builder.as_markup()
 
@@ -94,7 +140,7 @@ def subscription_kb():
     for ch in REQUIRED_CHANNELS:
         url = f"https://t.me/{ch.lstrip('@')}"
         builder.button(text=f"{ch}", url=url)
-    builder.button(text="🔄 Проверить подписку", callback_data="check_subscription")
+    builder.button(text="🔄 Проверить подписку", callback_data=CHECK_SUBSCRIPTION.pack())
     builder.adjust(1)
     return builder.as_markup()
 
@@ -109,6 +155,6 @@ def captain_groups_url_kb():
 
 def confirm_delete_team_kb(team_id: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="Да, удалить", callback_data=f"confirm_delete_team_{team_id}")],
-        [InlineKeyboardButton(text="Отмена", callback_data="cancel_delete_team")]
+        [InlineKeyboardButton(text="Да, удалить", callback_data=CONFIRM_DELETE_TEAM.pack(team_id))],
+        [InlineKeyboardButton(text="Отмена", callback_data=CANCEL_DELETE_TEAM.pack())]
     ])
\ No newline at end of file
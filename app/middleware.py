@@ -1,19 +1,266 @@
 from aiogram import BaseMiddleware
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, Update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database.db import User, UserRole, Tournament
 from typing import Callable, Awaitable, Dict, Any
+import asyncio
 import logging
+import time
 from app.keyboards.user import subscription_kb
 from app.database.crud import get_blacklist_entry
+from app.database import query_stats
+from app.database.session import DB_UNIT_OF_WORK, LazySession
+from app.services.access import access
+from app.services import metrics
+from app.utils.rate_limit import RateLimiter
+from app.utils.logging_setup import log_context
 
 logger = logging.getLogger(__name__)
 
 
+class ThrottlingMiddleware(BaseMiddleware):
+    """Анти-флуд: per-user token bucket отдельно для текста/команд, колбэков и загрузок файлов.
+
+    Регистрируется outer-middleware на dp.update сразу после LogContextMiddleware и
+    MetricsMiddleware (чтобы отброшенные апдейты попадали в логи и метрики), но раньше
+    ChatOrderMiddleware и сессии БД — лишние апдейты отбрасываются до запросов в БД
+    и get_chat_member.
+    """
+
+    def __init__(self, message: RateLimiter, callback: RateLimiter, upload: RateLimiter):
+        self.limiters = {"message": message, "callback": callback, "upload": upload}
+
+    @staticmethod
+    def event_class(event: Update) -> str | None:
+        if event.callback_query:
+            return "callback"
+        if event.message:
+            message = event.message
+            if message.photo or message.document or message.video or message.animation:
+                return "upload"
+            return "message"
+        return None
+
+    async def __call__(self, handler, event: Update, data):
+        user = data.get("event_from_user")
+        event_class = self.event_class(event)
+        if user is None or event_class is None:
+            return await handler(event, data)
+
+        if self.limiters[event_class].allow(user.id):
+            return await handler(event, data)
+
+        logger.debug("Throttled %s from user %s", event_class, user.id)
+        metrics.DROPPED_UPDATES.inc("throttled")
+        if event.callback_query:
+            # Убираем "часики" на кнопке, сам хендлер не запускаем
+            await event.callback_query.answer()
+        return
+
+
+class ChatOrderMiddleware(BaseMiddleware):
+    """Апдейты одного пользователя в чате обрабатываются строго по очереди, разных — параллельно.
+
+    Регистрируется как outer-middleware на dp.update. Очередь каждого ключа ограничена
+    max_queue_depth, повторное нажатие той же кнопки, пока первое ещё в очереди, отбрасывается.
+    """
+
+    def __init__(self, max_queue_depth: int = 5):
+        self.max_queue_depth = max_queue_depth
+        self._locks: Dict[tuple, asyncio.Lock] = {}
+        self._depth: Dict[tuple, int] = {}
+        self._pending_callbacks: set = set()
+
+    async def __call__(self, handler, event: Update, data):
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+        chat = data.get("event_chat")
+        # Ключ совпадает со стратегией FSM по умолчанию (USER_IN_CHAT)
+        key = (chat.id if chat else user.id, user.id)
+
+        callback = event.callback_query
+        callback_key = None
+        if callback:
+            message_id = callback.message.message_id if callback.message else callback.inline_message_id
+            callback_key = (user.id, message_id, callback.data)
+            if callback_key in self._pending_callbacks:
+                logger.info(f"Dropped duplicate callback '{callback.data}' from user {user.id}")
+                metrics.DROPPED_UPDATES.inc("duplicate_callback")
+                await callback.answer()
+                return
+
+        depth = self._depth.get(key, 0)
+        if depth >= self.max_queue_depth:
+            logger.warning(f"Update queue for {key} is full ({depth}), dropping update {event.update_id}")
+            metrics.DROPPED_UPDATES.inc("queue_full")
+            if callback:
+                await callback.answer("⏳ Подождите, предыдущее действие ещё выполняется")
+            return
+
+        self._depth[key] = depth + 1
+        if callback_key:
+            self._pending_callbacks.add(callback_key)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        try:
+            async with lock:
+                return await handler(event, data)
+        finally:
+            if callback_key:
+                self._pending_callbacks.discard(callback_key)
+            self._depth[key] -= 1
+            if not self._depth[key]:
+                del self._depth[key]
+                del self._locks[key]
+
+
+class LogContextMiddleware(BaseMiddleware):
+    """Кладёт update_id и имя обработчика в контекст логов (поля JSON-формата).
+
+    Outer-middleware на dp.update заводит контекст апдейта, inner на dp.message / dp.callback_query
+    дописывает обработчик — как у MetricsMiddleware.
+    """
+
+    async def __call__(self, handler, event, data):
+        if not isinstance(event, Update):
+            context = log_context.get()
+            if context is not None and "handler" in data:
+                context["handler"] = data["handler"].callback.__name__
+            return await handler(event, data)
+
+        token = log_context.set({"update_id": event.update_id, "handler": None})
+        try:
+            return await handler(event, data)
+        finally:
+            log_context.reset(token)
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """Число апдейтов и время обработки по обработчикам.
+
+    Как и QueryStatsMiddleware, регистрируется outer-middleware на dp.update (полное время апдейта)
+    и inner-middleware на dp.message / dp.callback_query (имя и время обработчика).
+    """
+
+    async def __call__(self, handler, event, data):
+        if not isinstance(event, Update):
+            info = data.get("metrics_update", {})
+            name = info["handler"] = data["handler"].callback.__name__ if "handler" in data else "unknown"
+            started = time.perf_counter()
+            try:
+                return await handler(event, data)
+            except Exception:
+                info["result"] = "error"
+                raise
+            finally:
+                metrics.HANDLER_SECONDS.observe(time.perf_counter() - started, name)
+
+        # Словарь общий для всей цепочки: inner-middleware дописывает в него обработчик
+        info = data["metrics_update"] = {"handler": "unhandled", "result": "ok"}
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            info["result"] = "error"
+            raise
+        finally:
+            metrics.UPDATES.inc(info["handler"], info["result"])
+            metrics.UPDATE_SECONDS.observe(time.perf_counter() - started, info["handler"])
+
+
+class TimedMiddleware(BaseMiddleware):
+    """Обёртка: пишет в метрики собственное время middleware без учёта остальной цепочки"""
+
+    def __init__(self, middleware: BaseMiddleware, layer: str):
+        self.middleware = middleware
+        self.layer = layer
+
+    async def __call__(self, handler, event, data):
+        downstream = 0.0
+
+        async def timed_handler(event, data):
+            nonlocal downstream
+            started = time.perf_counter()
+            try:
+                return await handler(event, data)
+            finally:
+                downstream += time.perf_counter() - started
+
+        started = time.perf_counter()
+        try:
+            return await self.middleware(timed_handler, event, data)
+        finally:
+            metrics.MIDDLEWARE_SECONDS.observe(time.perf_counter() - started - downstream, self.layer)
+
+
+class QueryStatsMiddleware(BaseMiddleware):
+    """Считает SQL-запросы каждого апдейта и ловит обработчики, которые выходят за бюджет или повторяют запрос в цикле.
+
+    Один экземпляр регистрируется как outer-middleware на dp.update (заводит счётчик апдейта)
+    и как inner-middleware на dp.message / dp.callback_query (подписывает счётчик именем обработчика).
+    В строгом режиме нарушение бюджета выбрасывает QueryBudgetExceeded — для тестов.
+    С enforce=False только подписывает апдейт обработчиком (нужно логу медленных запросов).
+    """
+
+    def __init__(
+        self,
+        budget: int = query_stats.QUERY_BUDGET,
+        repeat_limit: int = query_stats.QUERY_REPEAT_LIMIT,
+        handler_budgets: Dict[str, int] | None = None,
+        strict: bool = query_stats.QUERY_STATS == "strict",
+        enforce: bool = True,
+    ):
+        self.budget = budget
+        self.repeat_limit = repeat_limit
+        self.handler_budgets = query_stats.QUERY_HANDLER_BUDGETS if handler_budgets is None else handler_budgets
+        self.strict = strict
+        self.enforce = enforce
+
+    async def __call__(self, handler, event, data):
+        if not isinstance(event, Update):
+            stats = query_stats.current_stats()
+            if stats is not None and "handler" in data:
+                stats.handler = data["handler"].callback.__name__
+            return await handler(event, data)
+
+        with query_stats.count_queries() as stats:
+            result = await handler(event, data)
+        if self.enforce:
+            self.check(event.update_id, stats)
+        return result
+
+    def check(self, update_id: int, stats: query_stats.QueryStats) -> None:
+        query_stats.add_totals(stats)
+        logger.debug(
+            f"Update {update_id} ({stats.handler}): {stats.count} queries, {stats.db_time * 1000:.1f} ms in DB"
+        )
+        problems = []
+        budget = self.handler_budgets.get(stats.handler, self.budget)
+        if stats.count > budget:
+            problems.append(f"{stats.count} queries (budget {budget})")
+        for statement, n in stats.repeated(self.repeat_limit):
+            problems.append(f"same statement x{n}: {' '.join(statement.split())[:200]}")
+        if not problems:
+            return
+        message = f"Update {update_id} ({stats.handler}): " + "; ".join(problems)
+        if self.strict:
+            raise query_stats.QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
 class DatabaseMiddleware(BaseMiddleware):
-    def __init__(self, session_maker):
+    """Сессия на апдейт. LazySession не берёт соединение, пока обработчик не обратится к БД.
+
+    С unit_of_work коммиты обработчиков становятся flush, а фиксирует всё один COMMIT
+    после успешного обработчика (подробности — app/database/session.py).
+    """
+
+    def __init__(self, session_maker, unit_of_work: bool = DB_UNIT_OF_WORK):
         self.session_maker = session_maker
+        self.unit_of_work = unit_of_work
 
     async def __call__(
             self,
@@ -21,10 +268,15 @@ class DatabaseMiddleware(BaseMiddleware):
             event: Any,
             data: Dict[str, Any]
     ) -> Any:
-        async with self.session_maker() as session:
-            data["session"] = session
-            logger.debug(f"Session started for event: {event}")
-            return await handler(event, data)
+        session = LazySession(self.session_maker, unit_of_work=self.unit_of_work)
+        data["session"] = session
+        try:
+            result = await handler(event, data)
+            if self.unit_of_work:
+                await session.complete()
+            return result
+        finally:
+            await session.close()
 
 
 class ErrorHandlerMiddleware(BaseMiddleware):
@@ -33,6 +285,10 @@ class ErrorHandlerMiddleware(BaseMiddleware):
             return await handler(event, data)
         except Exception as e:
             logger.error(f"Error: {e}", exc_info=True)
+            session = data.get("session")
+            if session is not None:
+                # Незавершённый unit of work не должен зафиксироваться после проглоченной ошибки
+                await session.rollback()
             bot = data.get("bot")
             if isinstance(event, (Message, CallbackQuery)):
                 await bot.send_message(event.from_user.id, "⚠️ Произошла ошибка!")
@@ -56,7 +312,7 @@ class SubscriptionMiddleware(BaseMiddleware):
             user_id = event.from_user.id
 
         # --- Проверка блек-листа ---
-        if user_id and session:
+        if user_id and session and await access.is_banned(session, user_id):
             entry = await get_blacklist_entry(session, user_id)
             if entry:
                 admin = await session.scalar(select(User).where(User.telegram_id == entry.banned_by))
@@ -75,14 +331,6 @@ class SubscriptionMiddleware(BaseMiddleware):
                 return  # Не пропускаем дальше
         # --- Конец проверки блек-листа ---
 
-        # --- Проверка роли пользователя ---
-        if user_id and session:
-            user = await session.scalar(select(User).where(User.telegram_id == user_id))
-            if user and user.role in (UserRole.ADMIN, UserRole.SUPER_ADMIN):
-                logger.info(f"User {user_id} is admin/superadmin, skipping subscription check.")
-                return await handler(event, data)
-        # --- Конец проверки роли ---
-
         # --- Получаем список каналов для турнира ---
         required_channels = []
         tournament_id = None
@@ -102,6 +350,14 @@ class SubscriptionMiddleware(BaseMiddleware):
         if not required_channels:
             return await handler(event, data)
 
+        # --- Проверка роли пользователя: нужна, только когда есть что проверять ---
+        if user_id and session:
+            role = await session.scalar(select(User.role).where(User.telegram_id == user_id))
+            if role in (UserRole.ADMIN, UserRole.SUPER_ADMIN):
+                logger.info(f"User {user_id} is admin/superadmin, skipping subscription check.")
+                return await handler(event, data)
+        # --- Конец проверки роли ---
+
         # --- Проверка подписки ---
         if user_id:
             not_subscribed = []
@@ -146,8 +402,7 @@ class UserAutoUpdateMiddleware(BaseMiddleware):
             return await handler(event, data)
 
         if user_id and session:
-            user = await session.scalar(select(User).where(User.telegram_id == user_id))
-            if not user:
+            if not await access.is_registered(session, user_id):
                 text = "Пожалуйста, напишите /start, чтобы зарегистрироваться в системе."
                 if isinstance(event, Message):
                     await event.answer(text)
@@ -0,0 +1,92 @@
+"""Кэш проверок доступа, которые middleware делают на каждом апдейте.
+
+SubscriptionMiddleware проверяет блек-лист, UserAutoUpdateMiddleware — что пользователь
+прошёл /start. Обе проверки раньше стоили SQL-запроса на каждое сообщение и нажатие,
+включая текст, который не подходит ни одному обработчику.
+
+Блек-лист маленький и меняется редко: держим в памяти множество забаненных telegram_id.
+Оно сбрасывается после COMMIT сессии, которая добавила или удалила записи BlackList
+(через ORM или DML-запросом), и перечитывается при следующей проверке; раз в
+BLACKLIST_CACHE_TTL секунд перечитывается в любом случае — на случай правок мимо бота.
+
+Зарегистрированные пользователи из бота не удаляются, поэтому кэшируется только
+положительный ответ «пользователь есть» (последние USER_CACHE_SIZE пользователей).
+"""
+import os
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.database.db import BlackList, User
+from app.services import metrics
+
+BLACKLIST_CACHE_TTL = float(os.getenv("BLACKLIST_CACHE_TTL", "300"))  # секунд
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "50000"))
+
+_CHANGED = "blacklist_changed"
+
+
+class AccessCache:
+    def __init__(self, ttl: float = BLACKLIST_CACHE_TTL, maxsize: int = USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._banned: frozenset[int] | None = None
+        self._loaded_at = 0.0
+        self._known: OrderedDict[int, None] = OrderedDict()
+
+    async def is_banned(self, session, telegram_id: int) -> bool:
+        if self._banned is None or time.monotonic() - self._loaded_at > self.ttl:
+            metrics.CACHE_REQUESTS.inc("blacklist", "miss")
+            loaded_at = time.monotonic()
+            banned = frozenset(await session.scalars(select(BlackList.user_id)))
+            self._banned, self._loaded_at = banned, loaded_at
+        else:
+            metrics.CACHE_REQUESTS.inc("blacklist", "hit")
+        return telegram_id in self._banned
+
+    def invalidate_blacklist(self) -> None:
+        self._banned = None
+
+    async def is_registered(self, session, telegram_id: int) -> bool:
+        if telegram_id in self._known:
+            metrics.CACHE_REQUESTS.inc("users", "hit")
+            self._known.move_to_end(telegram_id)
+            return True
+        metrics.CACHE_REQUESTS.inc("users", "miss")
+        user_id = await session.scalar(select(User.id).where(User.telegram_id == telegram_id))
+        if user_id is None:
+            return False
+        self._known[telegram_id] = None
+        while len(self._known) > self.maxsize:
+            self._known.popitem(last=False)
+        return True
+
+
+access = AccessCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    if any(isinstance(obj, BlackList) for obj in (*session.new, *session.deleted)):
+        session.info[_CHANGED] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml(state) -> None:
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    if getattr(state.statement, "table", None) is BlackList.__table__:
+        state.session.info[_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    if session.info.pop(_CHANGED, False):
+        access.invalidate_blacklist()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_CHANGED, None)
@@ -0,0 +1,79 @@
+"""Фабрика HTTP-сессии бота: пул соединений, keep-alive, DNS-кэш, таймауты по методам и быстрый JSON."""
+import json
+import logging
+import os
+
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+try:
+    import orjson
+except ImportError:  # orjson — необязательная зависимость
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+BOT_HTTP_POOL_LIMIT = int(os.getenv("BOT_HTTP_POOL_LIMIT", "100"))  # всего соединений
+BOT_HTTP_KEEPALIVE = float(os.getenv("BOT_HTTP_KEEPALIVE", "60"))  # секунд держим простаивающее соединение
+BOT_HTTP_DNS_TTL = int(os.getenv("BOT_HTTP_DNS_TTL", "600"))  # секунд кэшируем DNS
+BOT_HTTP_TIMEOUT = float(os.getenv("BOT_HTTP_TIMEOUT", "30"))  # таймаут по умолчанию
+BOT_JSON = os.getenv("BOT_JSON", "auto")  # auto | orjson | json
+BOT_API_BASE_URL = os.getenv("BOT_API_BASE_URL")  # свой сервер Bot API, например tools/fake_bot_api.py
+
+# Таймауты (секунды) для методов, которым нужно больше или меньше времени, чем по умолчанию
+METHOD_TIMEOUTS = {
+    "answerCallbackQuery": 10,
+    "getChatMember": 10,
+    "getFile": 15,
+    "sendPhoto": 60,
+    "sendDocument": 120,
+}
+
+
+def _orjson_dumps(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+
+def resolve_json(name: str = BOT_JSON):
+    """Возвращает пару (loads, dumps) для выбранного JSON-бэкенда"""
+    if name == "orjson" or (name == "auto" and orjson is not None):
+        if orjson is None:
+            raise RuntimeError("BOT_JSON=orjson, but orjson is not installed")
+        return orjson.loads, _orjson_dumps
+    return json.loads, json.dumps
+
+
+class TunedAiohttpSession(AiohttpSession):
+    def __init__(
+        self,
+        pool_limit: int = BOT_HTTP_POOL_LIMIT,
+        keepalive_timeout: float = BOT_HTTP_KEEPALIVE,
+        dns_ttl: int = BOT_HTTP_DNS_TTL,
+        method_timeouts: dict | None = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        # Все запросы идут на один хост Bot API, поэтому лимит на хост равен общему
+        self._connector_init.update(
+            limit=pool_limit,
+            limit_per_host=pool_limit,
+            keepalive_timeout=keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=dns_ttl,
+        )
+        self.method_timeouts = METHOD_TIMEOUTS if method_timeouts is None else method_timeouts
+
+    async def make_request(self, bot, method, timeout=None):
+        if timeout is None:
+            timeout = self.method_timeouts.get(method.__api_method__)
+        return await super().make_request(bot, method, timeout)
+
+
+def create_bot_session(**kwargs) -> TunedAiohttpSession:
+    json_loads, json_dumps = resolve_json()
+    kwargs.setdefault("timeout", BOT_HTTP_TIMEOUT)
+    if BOT_API_BASE_URL and "api" not in kwargs:
+        kwargs["api"] = TelegramAPIServer.from_base(BOT_API_BASE_URL)
+    session = TunedAiohttpSession(json_loads=json_loads, json_dumps=json_dumps, **kwargs)
+    logger.info(f"Bot session created (json: {json_loads.__module__}, api: {session.api.base.split('/bot')[0]})")
+    return session
@@ -0,0 +1,117 @@
+"""Каталог игр и форматов в памяти процесса.
+
+Каталог меняется раз в сезон, а читается на каждом шаге выбора турнира, поэтому
+держим неизменяемый снимок: игры, форматы по играм и готовые клавиатуры к ним.
+Снимок загружается при старте (или при первом обращении) и целиком заменяется
+при перезагрузке: командой /reload_catalog или вызовом invalidate() из кода,
+который меняет игры и форматы. Каждая загрузка увеличивает version.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import select
+
+from app.database.db import Game, GameFormat
+from app.keyboards.admin import formats_select_kb, games_select_kb
+from app.keyboards.user import formats_list_kb, games_list_kb
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class GameInfo:
+    id: int
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class FormatInfo:
+    id: int
+    game_id: int
+    format_name: str
+    min_players_per_team: int
+    max_players_per_team: int
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    games: tuple[GameInfo, ...]
+    games_by_id: Mapping[int, GameInfo]
+    formats_by_id: Mapping[int, FormatInfo]
+    formats_by_game: Mapping[int, tuple[FormatInfo, ...]]
+    # Клавиатуры собираются один раз на снимок
+    games_kb: InlineKeyboardMarkup
+    formats_kb: Mapping[int, InlineKeyboardMarkup]
+    admin_games_kb: InlineKeyboardMarkup
+    admin_formats_kb: Mapping[int, InlineKeyboardMarkup]
+
+    @classmethod
+    def build(cls, version: int, games: list[GameInfo], formats: list[FormatInfo]) -> "CatalogSnapshot":
+        by_game: dict[int, list[FormatInfo]] = {game.id: [] for game in games}
+        for fmt in formats:
+            by_game.setdefault(fmt.game_id, []).append(fmt)
+        formats_by_game = {game_id: tuple(items) for game_id, items in by_game.items()}
+        return cls(
+            version=version,
+            games=tuple(games),
+            games_by_id=MappingProxyType({game.id: game for game in games}),
+            formats_by_id=MappingProxyType({fmt.id: fmt for fmt in formats}),
+            formats_by_game=MappingProxyType(formats_by_game),
+            games_kb=games_list_kb(games),
+            formats_kb=MappingProxyType({
+                game_id: formats_list_kb(items) for game_id, items in formats_by_game.items() if items
+            }),
+            admin_games_kb=games_select_kb(games),
+            admin_formats_kb=MappingProxyType({
+                game_id: formats_select_kb(items) for game_id, items in formats_by_game.items() if items
+            }),
+        )
+
+
+class CatalogCache:
+    def __init__(self):
+        self.snapshot: CatalogSnapshot | None = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    async def get(self, session) -> CatalogSnapshot:
+        """Текущий снимок; при первом обращении загружается через сессию обработчика"""
+        snapshot = self.snapshot
+        if snapshot is not None:
+            metrics.CACHE_REQUESTS.inc("catalog", "hit")
+            return snapshot
+        metrics.CACHE_REQUESTS.inc("catalog", "miss")
+        async with self._lock:
+            if self.snapshot is None:
+                await self.reload(session)
+            return self.snapshot
+
+    async def reload(self, session) -> CatalogSnapshot:
+        games = [
+            GameInfo(id=game.id, name=game.name)
+            for game in await session.scalars(select(Game).order_by(Game.id))
+        ]
+        formats = [
+            FormatInfo(
+                id=fmt.id, game_id=fmt.game_id, format_name=fmt.format_name,
+                min_players_per_team=fmt.min_players_per_team, max_players_per_team=fmt.max_players_per_team,
+            )
+            for fmt in await session.scalars(select(GameFormat).order_by(GameFormat.game_id, GameFormat.id))
+        ]
+        self._version += 1
+        self.snapshot = CatalogSnapshot.build(self._version, games, formats)
+        logger.info(f"Catalog loaded (version {self._version}): {len(games)} games, {len(formats)} formats")
+        return self.snapshot
+
+    def invalidate(self) -> None:
+        """Следующее обращение перечитает каталог из БД"""
+        self.snapshot = None
+
+
+catalog = CatalogCache()
@@ -0,0 +1,111 @@
+"""Мониторинг задержки event loop и поиск блокирующих вызовов.
+
+Задача в loop каждые interval секунд отмечается и измеряет, насколько позже запланированного
+проснулась (это и есть lag). Отдельный поток следит за отметками: если loop молчит дольше
+порога, поток снимает стек главного потока — в нём видно, какая корутина заблокировала loop.
+Когда loop оживает, задача пишет lag в метрики и логирует стек.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from app.services import metrics
+from app.utils.rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))  # 0 — мониторинг выключен
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.05"))  # секунд между отметками
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LOOP_LAG_SECONDS = metrics.REGISTRY.histogram(
+    "bot_loop_lag_seconds", "Event loop scheduling lag",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_STALLS = metrics.REGISTRY.counter("bot_loop_stalls_total", "Event loop stalls above threshold", ("site",))
+LOOP_MAX_LAG = metrics.REGISTRY.gauge("bot_loop_max_lag_seconds", "Longest event loop stall since start")
+
+
+def _coroutine_frames(stack: traceback.StackSummary) -> traceback.StackSummary:
+    """Отрезает кадры самого event loop (run_forever, _run_once, Handle._run) — остаётся цепочка корутины"""
+    for index in range(len(stack) - 1, -1, -1):
+        if stack[index].filename.endswith(os.path.join("asyncio", "events.py")):
+            return traceback.StackSummary.from_list(stack[index + 1:])
+    return stack
+
+
+def _blocking_site(stack: traceback.StackSummary) -> str:
+    """Самый глубокий кадр из кода проекта — вероятный виновник блокировки"""
+    for frame in reversed(stack):
+        if frame.filename.startswith(PROJECT_ROOT) and "site-packages" not in frame.filename:
+            return f"{os.path.relpath(frame.filename, PROJECT_ROOT)}:{frame.lineno} {frame.name}"
+    frame = stack[-1]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+
+
+class LoopLagMonitor:
+    def __init__(self, threshold_ms: float = LOOP_LAG_THRESHOLD_MS, interval: float = LOOP_LAG_INTERVAL):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.log_limiter = RateLimiter(rate=0.2, burst=5)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._stall_stack: traceback.StackSummary | None = None
+        self._stop = threading.Event()
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._measure(), name="loop-lag-monitor")
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Loop lag monitor started (threshold {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _measure(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - started - self.interval)
+            LOOP_LAG_SECONDS.observe(lag)
+            if lag >= self.threshold:
+                self._report(lag)
+
+    def _report(self, lag: float) -> None:
+        stack, self._stall_stack = self._stall_stack, None
+        site = _blocking_site(stack) if stack else "unknown"
+        LOOP_STALLS.inc(site)
+        if lag > LOOP_MAX_LAG.value():
+            LOOP_MAX_LAG.set(lag)
+        if not self.log_limiter.allow(None):
+            return
+        details = "".join(stack.format()) if stack else "  (stack was not captured)\n"
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms at {site}\n{details.rstrip()}")
+
+    def _watch(self) -> None:
+        """Поток-сторож: снимает стек loop, пока тот заблокирован (один раз на каждую остановку)"""
+        captured_for = None
+        while not self._stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            if time.monotonic() - heartbeat < self.threshold + self.interval or captured_for == heartbeat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._stall_stack = _coroutine_frames(traceback.extract_stack(frame))
+                captured_for = heartbeat
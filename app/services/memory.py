@@ -0,0 +1,180 @@
+"""Диагностика роста памяти: снимки tracemalloc и число живых ORM-объектов.
+
+Включается командой /memory start или сигналом SIGUSR2 (повторный сигнал пишет отчёт в лог
+и выключает трекинг). Пока трекинг включён, каждые interval секунд в лог пишутся места
+с наибольшим приростом памяти относительно предыдущего снимка.
+"""
+import asyncio
+import gc
+import logging
+import os
+import signal
+import sysconfig
+import time
+import tracemalloc
+from collections import Counter
+
+from sqlalchemy.orm import Session
+
+from app.database.db import Base
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+MEMORY_FRAMES = 10  # глубина трейсбека для каждой аллокации
+MEMORY_INTERVAL = 300.0
+MEMORY_TOP = 10
+STDLIB = sysconfig.get_paths()["stdlib"]
+# Аллокации самих инструментов диагностики в отчёт не попадают
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+TRACED_MEMORY = metrics.REGISTRY.gauge(
+    "bot_traced_memory_bytes", "Memory traced by tracemalloc (0 when tracking is off)",
+    collect=lambda: tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+)
+
+
+def _format_size(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def _short_path(filename: str) -> str:
+    if "site-packages" in filename:
+        return filename.split("site-packages", 1)[1].lstrip("/\\")
+    for root in (STDLIB, os.getcwd()):
+        if filename.startswith(root):
+            return os.path.relpath(filename, root)
+    return filename
+
+
+def live_orm_objects() -> Counter:
+    """Число живых экземпляров каждой модели и ORM-сессий (полный обход gc — только для диагностики)"""
+    models = {mapper.class_ for mapper in Base.registry.mappers}
+    counts = Counter()
+    for obj in gc.get_objects():
+        cls = type(obj)
+        if cls in models:
+            counts[cls.__name__] += 1
+        elif isinstance(obj, Session):
+            counts["Session"] += 1
+            counts["Session.identity_map"] += len(obj.identity_map)
+    return counts
+
+
+def growth_report(current: tracemalloc.Snapshot, previous: tracemalloc.Snapshot, limit: int = MEMORY_TOP) -> list[str]:
+    lines = []
+    for stat in current.compare_to(previous, "lineno")[:limit]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        lines.append(
+            f"{_format_size(stat.size_diff):>10} (+{stat.count_diff} blocks)  {_short_path(frame.filename)}:{frame.lineno}"
+        )
+    return lines
+
+
+class MemoryTracker:
+    def __init__(self, interval: float = MEMORY_INTERVAL):
+        self.interval = interval
+        self.baseline: tracemalloc.Snapshot | None = None
+        self.previous: tracemalloc.Snapshot | None = None
+        self.started: float | None = None
+        self._task: asyncio.Task | None = None
+        self._toggle_task: asyncio.Task | None = None  # переключение по сигналу — ссылка, чтобы задачу не собрал GC
+
+    @property
+    def running(self) -> bool:
+        return self.started is not None
+
+    def start(self, interval: float | None = None) -> None:
+        if self.running:
+            return
+        if interval:
+            self.interval = interval
+        tracemalloc.start(MEMORY_FRAMES)
+        self.baseline = self.previous = self._snapshot()
+        self.started = time.monotonic()
+        self._task = asyncio.create_task(self._periodic(), name="memory-snapshots")
+        logger.info(f"Memory tracking started (snapshot every {self.interval:.0f} s)")
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        if self._task:
+            self._task.cancel()
+        tracemalloc.stop()
+        self.baseline = self.previous = self.started = self._task = None
+        logger.info("Memory tracking stopped")
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    async def _periodic(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            snapshot = self._snapshot()
+            # Сравнение снимков — долгий проход по всем трассам, уносим его из event loop
+            lines = await asyncio.to_thread(growth_report, snapshot, self.previous)
+            self.previous = snapshot
+            current, _ = tracemalloc.get_traced_memory()
+            logger.info(
+                f"Memory snapshot: {_format_size(current)} traced, top growth since previous:\n"
+                + "\n".join(f"  {line}" for line in lines or ["(no growth)"])
+            )
+
+    async def report(self, limit: int = MEMORY_TOP) -> str:
+        """Текстовый отчёт: объём, рост с начала трекинга и с прошлого снимка, живые ORM-объекты"""
+        lines = []
+        if self.running:
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(
+                f"Traced: {_format_size(current)} (peak {_format_size(peak)}), "
+                f"tracking for {time.monotonic() - self.started:.0f} s"
+            )
+            snapshot = self._snapshot()
+            since_start = await asyncio.to_thread(growth_report, snapshot, self.baseline, limit)
+            since_previous = await asyncio.to_thread(growth_report, snapshot, self.previous, limit)
+            lines.append("Top growth since start:")
+            lines.extend(f"  {line}" for line in since_start or ["(no growth)"])
+            lines.append("Top growth since last snapshot:")
+            lines.extend(f"  {line}" for line in since_previous or ["(no growth)"])
+        else:
+            lines.append("tracemalloc is off (/memory start)")
+        lines.append("Live ORM objects:")
+        # Полный обход gc занимает заметное время — тоже не в event loop
+        counts = await asyncio.to_thread(live_orm_objects)
+        lines.extend(f"  {name}: {count}" for name, count in counts.most_common())
+        if not counts:
+            lines.append("  none")
+        return "\n".join(lines)
+
+    def install_signal_handler(self) -> None:
+        """SIGUSR2: включить трекинг, повторно — записать отчёт в лог и выключить"""
+        if not hasattr(signal, "SIGUSR2"):
+            return
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGUSR2, self._toggle_on_signal
+        )
+
+    def _toggle_on_signal(self) -> None:
+        if self._toggle_task is not None and not self._toggle_task.done():
+            logger.info("Memory report is still being written, SIGUSR2 ignored")
+            return
+        self._toggle_task = asyncio.create_task(self._toggle())
+
+    async def _toggle(self) -> None:
+        if not self.running:
+            self.start()
+            return
+        logger.info(f"Memory report:\n{await self.report()}")
+        self.stop()
@@ -0,0 +1,223 @@
+"""Метрики бота в формате Prometheus и HTTP-эндпоинт /metrics.
+
+Счётчики — обычные словари в памяти процесса: всё обновляется из одного event loop,
+поэтому блокировки не нужны. Значения с метками хранятся по кортежу значений меток.
+
+    UPDATES.inc("show_games", "ok")
+    HANDLER_SECONDS.observe(0.012, "show_games")
+"""
+import bisect
+import logging
+import os
+import time
+
+from aiohttp import web
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))  # 0 — метрики выключены
+METRICS_ENABLED = METRICS_PORT > 0
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self):
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class Gauge(Counter):
+    """Текущее значение. Если задан collect, значение без меток вычисляется при каждом запросе /metrics."""
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), collect=None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def samples(self):
+        if self.collect is not None:
+            self._values[()] = self.collect()
+        yield from super().samples()
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [счётчики по корзинам (последняя — +Inf), сумма]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def count(self, *labels) -> int:
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def samples(self):
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, f'le="{le}"'), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, labels), cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = (), collect=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+# Апдейты и обработчики
+UPDATES = REGISTRY.counter("bot_updates_total", "Processed updates", ("handler", "result"))
+UPDATE_SECONDS = REGISTRY.histogram("bot_update_duration_seconds", "Full update processing time", ("handler",))
+HANDLER_SECONDS = REGISTRY.histogram("bot_handler_duration_seconds", "Handler time including inner middlewares", ("handler",))
+MIDDLEWARE_SECONDS = REGISTRY.histogram("bot_middleware_duration_seconds", "Own time of each middleware", ("layer",))
+DROPPED_UPDATES = REGISTRY.counter("bot_dropped_updates_total", "Updates dropped before handlers", ("reason",))
+
+# База данных
+DB_QUERIES = REGISTRY.counter("bot_db_queries_total", "Executed SQL statements", ("operation",))
+DB_QUERY_SECONDS = REGISTRY.histogram("bot_db_query_duration_seconds", "SQL statement time", ("operation",))
+
+# Исходящие запросы к Bot API
+API_REQUESTS = REGISTRY.counter("bot_api_requests_total", "Bot API requests", ("method", "status"))
+API_REQUEST_SECONDS = REGISTRY.histogram("bot_api_request_duration_seconds", "Bot API request time", ("method",))
+API_QUEUE_SECONDS = REGISTRY.histogram("bot_api_queue_seconds", "Time spent waiting for outbound rate limits", ("lane",))
+API_RETRIES = REGISTRY.counter("bot_api_retries_total", "Requests retried after flood control", ("method",))
+
+# Рассылки
+BROADCAST_MESSAGES = REGISTRY.counter("bot_broadcast_messages_total", "Bulk requests by campaign", ("campaign", "status"))
+BROADCAST_TARGET = REGISTRY.gauge("bot_broadcast_target", "Recipients of the running campaign", ("campaign",))
+BROADCASTS_ACTIVE = REGISTRY.gauge("bot_broadcasts_active", "Running bulk campaigns", ("campaign",))
+
+# Кэши: результат hit или miss
+CACHE_REQUESTS = REGISTRY.counter("bot_cache_requests_total", "Cache lookups", ("cache", "result"))
+
+START_TIME = REGISTRY.gauge("bot_start_time_seconds", "Process start time (unix)")
+START_TIME.set(time.time())
+
+
+def fsm_sessions_gauge(storage) -> Gauge:
+    """Число активных FSM-сессий в MemoryStorage, считается при запросе /metrics"""
+    def collect():
+        return sum(1 for record in getattr(storage, "storage", {}).values() if record.state is not None)
+
+    return REGISTRY.gauge("bot_fsm_sessions", "Users with an active FSM state", collect=collect)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["metrics_query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("metrics_query_started", None)
+    if started is None:
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper()
+    DB_QUERIES.inc(operation)
+    DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation)
+
+
+def instrument_engine(engine) -> None:
+    """Счётчики и гистограммы SQL-запросов по типу операции"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    # create_dispatcher() может вызываться несколько раз (инструменты) — слушатели ставим один раз
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+async def _metrics_handler(request: web.Request) -> web.Response:
+    return web.Response(
+        body=REGISTRY.render().encode(),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+    )
+
+
+async def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return runner
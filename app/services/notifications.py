@@ -2,11 +2,13 @@ from aiogram import Bot
 from app.database.db import async_session_maker, User, UserRole
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from app.services.outbound import bulk_lane
 
 async def notify_super_admins(bot: Bot, text: str, session: AsyncSession, reply_markup=None):
     """Уведомление супер-админов"""
     super_admins = await session.scalars(
         select(User).where(User.role == UserRole.SUPER_ADMIN)
     )
-    for admin in super_admins:
-        await bot.send_message(admin.telegram_id, text, reply_markup=reply_markup)
\ No newline at end of file
+    with bulk_lane("super_admin_notice"):
+        for admin in super_admins:
+            await bot.send_message(admin.telegram_id, text, reply_markup=reply_markup)
\ No newline at end of file
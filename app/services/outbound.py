@@ -0,0 +1,155 @@
+"""Планировщик исходящих запросов к Bot API.
+
+Все запросы бота проходят через OutboundScheduler (request-middleware сессии).
+Запросы делятся на две полосы: интерактивные ответы пользователям и массовые
+рассылки. Пока есть ожидающие интерактивные запросы, массовые не отправляются.
+Поверх этого действуют общий лимит на бота и лимиты на каждый чат.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import GetUpdates
+
+from app.services import metrics
+from app.utils.rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "30"))  # запросов в секунду на бота
+OUTBOUND_PRIVATE_RATE = float(os.getenv("OUTBOUND_PRIVATE_RATE", "1"))  # сообщений в секунду в личный чат
+OUTBOUND_PRIVATE_BURST = int(os.getenv("OUTBOUND_PRIVATE_BURST", "3"))
+OUTBOUND_GROUP_PER_MINUTE = float(os.getenv("OUTBOUND_GROUP_PER_MINUTE", "20"))  # сообщений в минуту в группу
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))  # повторов после retry_after
+
+_lane: ContextVar[str] = ContextVar("outbound_lane", default=INTERACTIVE)
+_campaign: ContextVar[str | None] = ContextVar("outbound_campaign", default=None)
+
+
+@contextmanager
+def bulk_lane(campaign: str = "bulk", total: int | None = None):
+    """Все запросы внутри блока идут в полосу массовых рассылок.
+
+    campaign и total (число получателей) попадают в метрики прогресса рассылки.
+    """
+    token = _lane.set(BULK)
+    campaign_token = _campaign.set(campaign)
+    metrics.BROADCASTS_ACTIVE.inc(campaign)
+    if total is not None:
+        metrics.BROADCAST_TARGET.set(total, campaign)
+    try:
+        yield
+    finally:
+        metrics.BROADCASTS_ACTIVE.dec(campaign)
+        _campaign.reset(campaign_token)
+        _lane.reset(token)
+
+
+def is_message_method(api_method: str) -> bool:
+    """Методы, на которые распространяются лимиты Telegram на сообщения в чат"""
+    return (
+        api_method.startswith("send") and api_method != "sendChatAction"
+    ) or api_method in ("copyMessage", "forwardMessage")
+
+
+class OutboundScheduler(BaseRequestMiddleware):
+    def __init__(
+        self,
+        global_rate: float = OUTBOUND_GLOBAL_RATE,
+        private_rate: float = OUTBOUND_PRIVATE_RATE,
+        private_burst: int = OUTBOUND_PRIVATE_BURST,
+        group_per_minute: float = OUTBOUND_GROUP_PER_MINUTE,
+        max_retries: int = OUTBOUND_MAX_RETRIES,
+    ):
+        self.global_limiter = RateLimiter(rate=global_rate, burst=max(1, int(global_rate)))
+        self.private_limiter = RateLimiter(rate=private_rate, burst=private_burst)
+        self.group_limiter = RateLimiter(rate=group_per_minute / 60)
+        self.max_retries = max_retries
+        self._interactive_waiting = 0
+        self._interactive_idle = asyncio.Event()
+        self._interactive_idle.set()
+
+    def _chat_limiter(self, chat_id) -> RateLimiter:
+        # Отрицательные id и @username — группы и каналы
+        if isinstance(chat_id, int) and chat_id > 0:
+            return self.private_limiter
+        return self.group_limiter
+
+    async def _acquire(self, lane: str, chat_id) -> None:
+        interactive = lane == INTERACTIVE
+        if chat_id is not None:
+            limiter = self._chat_limiter(chat_id)
+            while (wait := limiter.delay(chat_id)) > 0:
+                await asyncio.sleep(wait)
+        # Интерактивный запрос придерживает массовые только на время ожидания общего лимита:
+        # ожидание лимита своего чата не должно останавливать рассылку в другие чаты
+        if interactive:
+            self._interactive_waiting += 1
+            self._interactive_idle.clear()
+        try:
+            while True:
+                if not interactive:
+                    # Массовые запросы уступают место любым ожидающим интерактивным
+                    await self._interactive_idle.wait()
+                wait = self.global_limiter.delay(None)
+                if not wait:
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            if interactive:
+                self._interactive_waiting -= 1
+                if not self._interactive_waiting:
+                    self._interactive_idle.set()
+
+    async def __call__(self, make_request, bot, method):
+        if isinstance(method, GetUpdates):
+            return await make_request(bot, method)
+
+        lane = _lane.get()
+        chat_id = getattr(method, "chat_id", None) if is_message_method(method.__api_method__) else None
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            await self._acquire(lane, chat_id)
+            metrics.API_QUEUE_SECONDS.observe(time.perf_counter() - started, lane)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                metrics.API_RETRIES.inc(method.__api_method__)
+                logger.warning(
+                    f"Flood control on {method.__api_method__} (chat {chat_id}, {lane}), "
+                    f"retry {attempt} in {e.retry_after}s"
+                )
+                await asyncio.sleep(e.retry_after)
+
+
+class OutboundMetrics(BaseRequestMiddleware):
+    """Метрики каждой попытки запроса к Bot API; регистрируется после OutboundScheduler"""
+
+    async def __call__(self, make_request, bot, method):
+        api_method = method.__api_method__
+        status = "ok"
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            metrics.API_REQUESTS.inc(api_method, status)
+            if not isinstance(method, GetUpdates):
+                metrics.API_REQUEST_SECONDS.observe(time.perf_counter() - started, api_method)
+            campaign = _campaign.get()
+            if campaign is not None:
+                metrics.BROADCAST_MESSAGES.inc(campaign, status)
@@ -0,0 +1,157 @@
+"""Профилирование обработчиков по команде супер-админа (/profile).
+
+Пока сеанс не запущен, ProfilingMiddleware не зарегистрирован в диспетчере — накладных
+расходов нет. Сеанс длится N секунд или N вызовов обработчика, затем профиль cProfile
+сохраняется в logs/ (.pstats для snakeviz/pstats и .txt с топом функций), а сводка уходит в чат.
+
+Профиль включается на время выполнения обработчика, поэтому в него попадает и то,
+что event loop успел выполнить за время его await — это видно по кадрам asyncio в отчёте.
+"""
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+from dataclasses import dataclass, field
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = "logs"
+PROFILE_MAX_SECONDS = 600
+PROFILE_TOP = 30
+
+
+@dataclass
+class ProfileSession:
+    handler: str | None  # None — все обработчики
+    chat_id: int
+    bot: Bot
+    seconds: float | None = None
+    calls: int | None = None
+    profile: cProfile.Profile = field(default_factory=cProfile.Profile)
+    started: float = field(default_factory=time.monotonic)
+    invocations: int = 0
+    active: int = 0  # обработчики, выполняющиеся прямо сейчас (профиль включён, пока > 0)
+    timer: asyncio.TimerHandle | None = None
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """Inner-middleware на dp.message / dp.callback_query; существует только во время сеанса"""
+
+    def __init__(self, profiler: "HandlerProfiler"):
+        self.profiler = profiler
+
+    async def __call__(self, handler, event, data):
+        session = self.profiler.session
+        name = data["handler"].callback.__name__ if "handler" in data else None
+        if session is None or (session.handler is not None and name != session.handler):
+            return await handler(event, data)
+
+        if not session.active:
+            session.profile.enable()
+        session.active += 1
+        try:
+            return await handler(event, data)
+        finally:
+            session.active -= 1
+            if not session.active:
+                session.profile.disable()
+            session.invocations += 1
+            if session.calls is not None and session.invocations >= session.calls and self.profiler.session is session:
+                await self.profiler.finish()
+
+
+class HandlerProfiler:
+    def __init__(self, dispatcher: Dispatcher):
+        self.dispatcher = dispatcher
+        self.middleware = ProfilingMiddleware(self)
+        self.session: ProfileSession | None = None
+        self._finish_task: asyncio.Task | None = None  # finish() по таймеру — ссылка, чтобы задачу не собрал GC
+
+    def handler_names(self) -> set[str]:
+        names = set()
+        for router in self.dispatcher.chain_tail:
+            for observer in (router.message, router.callback_query):
+                names.update(handler.callback.__name__ for handler in observer.handlers)
+        return names
+
+    def start(self, bot: Bot, chat_id: int, handler: str | None,
+              seconds: float | None = None, calls: int | None = None) -> None:
+        if self.session is not None:
+            raise RuntimeError("Profiling session is already running")
+        self.session = ProfileSession(handler=handler, chat_id=chat_id, bot=bot, seconds=seconds, calls=calls)
+        if seconds is not None:
+            self.session.timer = asyncio.get_running_loop().call_later(seconds, self._finish_on_timer)
+        self.dispatcher.message.middleware(self.middleware)
+        self.dispatcher.callback_query.middleware(self.middleware)
+        logger.info(f"Profiling started: handler={handler or 'all'}, seconds={seconds}, calls={calls}")
+
+    def _finish_on_timer(self) -> None:
+        self._finish_task = asyncio.create_task(self.finish())
+
+    async def finish(self) -> str | None:
+        """Останавливает сеанс, сохраняет профиль и отправляет сводку. Возвращает путь к .txt"""
+        session, self.session = self.session, None
+        if session is None:
+            return None
+        if session.timer:
+            session.timer.cancel()
+        # Сеанс завершён раньше (/profile stop или лимит вызовов) — задача таймера больше не нужна
+        task = self._finish_task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            self._finish_task = None
+        self.dispatcher.message.middleware.unregister(self.middleware)
+        self.dispatcher.callback_query.middleware.unregister(self.middleware)
+        if session.active:
+            session.profile.disable()
+
+        elapsed = time.monotonic() - session.started
+        header = (
+            f"Профиль {session.handler or 'всех обработчиков'}: "
+            f"{session.invocations} вызовов за {elapsed:.0f} с"
+        )
+        if not session.invocations:
+            await session.bot.send_message(session.chat_id, f"⏱ {header} — профилировать нечего.")
+            return None
+
+        path = await asyncio.to_thread(self._save, session, header)
+        logger.info(f"Profiling finished: {header}, saved to {path}")
+        await session.bot.send_message(
+            session.chat_id,
+            f"⏱ {header}\nФайл: {path}\n\n<pre>{self._summary(session.profile)}</pre>",
+            parse_mode="HTML"
+        )
+        return path
+
+    @staticmethod
+    def _save(session: ProfileSession, header: str) -> str:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, f"profile_{time.strftime('%Y%m%d_%H%M%S')}_{session.handler or 'all'}")
+        session.profile.dump_stats(f"{base}.pstats")
+        stream = io.StringIO()
+        stream.write(header + "\n\n")
+        pstats.Stats(session.profile, stream=stream).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        with open(f"{base}.txt", "w", encoding="utf-8") as file:
+            file.write(stream.getvalue())
+        return f"{base}.txt"
+
+    @staticmethod
+    def _summary(profile: cProfile.Profile, limit: int = 10) -> str:
+        """Топ функций проекта по собственному и суммарному времени — для сообщения в чат"""
+        stats = pstats.Stats(profile).stats
+        rows = []
+        for (filename, lineno, name), (_, calls, tottime, cumtime, _) in stats.items():
+            if filename in ("~", __file__) or filename.startswith("<") or "site-packages" in filename or "/lib/python" in filename:
+                continue
+            rows.append((cumtime, tottime, calls, f"{os.path.basename(filename)}:{lineno} {name}"))
+        rows.sort(reverse=True)
+        lines = [f"{'cum, ms':>8} {'own, ms':>8} {'calls':>6}  function"]
+        for cumtime, tottime, calls, label in rows[:limit]:
+            lines.append(f"{cumtime * 1000:8.1f} {tottime * 1000:8.1f} {calls:6d}  {label[:60]}")
+        text = "\n".join(lines)
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
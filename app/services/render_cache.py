@@ -0,0 +1,169 @@
+"""Кэш готовых текстов и клавиатур для просмотра турниров.
+
+Списки турниров по формату и карточки турниров одинаковы для всех зрителей, поэтому
+хранятся уже отрендеренными. Ключ записи включает версию турнира (для списков — общую
+версию списков): обработчики, меняющие турнир, до session.commit() вызывают
+invalidate_on_commit(), и после COMMIT версия растёт — старые записи больше не находятся.
+Инвалидация именно после COMMIT, а не после flush (в режиме unit of work commit() обработчика
+— только flush): иначе параллельный читатель успел бы закэшировать ещё не зафиксированные
+данные под новым ключом. Рендер, начатый до инвалидации, ляжет под старый ключ.
+
+Заодно кэшируются file_id загруженных в Telegram логотипов и регламентов — повторная
+отправка идёт по file_id без загрузки файла с диска.
+"""
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.database.db import Tournament, TournamentStatus
+from app.keyboards.user import format_tournaments_kb, tournament_details_kb, tournament_register_kb
+from app.services import metrics
+
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "2000"))
+
+
+@dataclass(frozen=True, slots=True)
+class Rendered:
+    text: str
+    markup: InlineKeyboardMarkup | None
+
+
+@dataclass(frozen=True, slots=True)
+class TournamentCard:
+    is_active: bool
+    text: str
+    markup: InlineKeyboardMarkup
+    logo_path: str | None  # только существующие на диске файлы
+    regulations_path: str | None
+    name: str
+
+
+_MISSING = object()
+_PENDING = "render_cache_invalidate"
+
+
+class TournamentRenderCache:
+    def __init__(self, maxsize: int = RENDER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._versions: dict[int, int] = {}
+        self._listing_version = 0
+        self.file_ids: dict[str, str] = {}
+
+    def _get(self, cache: str, key):
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            metrics.CACHE_REQUESTS.inc(cache, "miss")
+        else:
+            metrics.CACHE_REQUESTS.inc(cache, "hit")
+            self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, tournament_id: int) -> None:
+        """Турнир создан, изменён или удалён: сбрасываем его карточки и все списки"""
+        self._versions[tournament_id] = self._versions.get(tournament_id, 0) + 1
+        self._listing_version += 1
+        # Старые версии и так недостижимы, удаляем их сразу, чтобы не занимали место до вытеснения
+        for key in [key for key in self._entries if key[0] == "listing" or key[1] == tournament_id]:
+            del self._entries[key]
+        for key in [key for key in self.file_ids if key.startswith(f"{tournament_id}:")]:
+            del self.file_ids[key]
+
+    def invalidate_on_commit(self, session, tournament: Tournament | int) -> None:
+        """invalidate() после COMMIT этой сессии (при откате — ничего); вызывать до session.commit().
+        Новый турнир передаётся объектом — его id появится только при flush"""
+        session.info.setdefault(_PENDING, []).append(tournament)
+
+    async def format_listing(self, session, format_id: int) -> Rendered | None:
+        """Список активных одобренных турниров формата; None — турниров нет"""
+        key = ("listing", format_id, self._listing_version)
+        listing = self._get("tournament_listing", key)
+        if listing is not _MISSING:
+            return listing
+        rows = (await session.execute(
+            select(Tournament.id, Tournament.name)
+            .where(Tournament.format_id == format_id)
+            .where(Tournament.is_active == True)
+            .where(Tournament.status == TournamentStatus.APPROVED)
+        )).all()
+        listing = Rendered("Выберите турнир:", format_tournaments_kb(rows)) if rows else None
+        self._put(key, listing)
+        return listing
+
+    async def card(self, session, tournament_id: int) -> TournamentCard | None:
+        """Карточка турнира для регистрации (описание, кнопки и файлы)"""
+        key = ("card", tournament_id, self._versions.get(tournament_id, 0))
+        card = self._get("tournament_card", key)
+        if card is not _MISSING:
+            return card
+        tournament = await session.get(Tournament, tournament_id)
+        card = None
+        if tournament:
+            card = TournamentCard(
+                is_active=tournament.is_active,
+                text=(
+                    f"🏅 <b>{tournament.name}</b>\n"
+                    f"🕒 Дата начала: {tournament.start_date.strftime('%d.%m.%Y %H:%M')}\n"
+                    f"📝 Описание: {tournament.description}\n"
+                ),
+                markup=tournament_register_kb(tournament_id),
+                logo_path=tournament.logo_path if tournament.logo_path and os.path.exists(tournament.logo_path) else None,
+                regulations_path=(
+                    tournament.regulations_path
+                    if tournament.regulations_path and os.path.exists(tournament.regulations_path) else None
+                ),
+                name=tournament.name,
+            )
+        self._put(key, card)
+        return card
+
+    async def details(self, session, tournament_id: int) -> Rendered | None:
+        """Краткие детали турнира (экран «view_tournament_»)"""
+        key = ("details", tournament_id, self._versions.get(tournament_id, 0))
+        details = self._get("tournament_card", key)
+        if details is not _MISSING:
+            return details
+        tournament = await session.get(Tournament, tournament_id)
+        details = None
+        if tournament:
+            details = Rendered(
+                (
+                    f"🏅 {tournament.name}\n"
+                    f"🕒 Дата начала: {tournament.start_date.strftime('%d.%m.%Y %H:%M')}\n"
+                    f"📝 Описание: {tournament.description}"
+                ),
+                tournament_details_kb(tournament_id),
+            )
+        self._put(key, details)
+        return details
+
+    def file(self, tournament_id: int, path: str):
+        """file_id, если файл уже загружался в Telegram, иначе None"""
+        return self.file_ids.get(f"{tournament_id}:{path}")
+
+    def remember_file(self, tournament_id: int, path: str, file_id: str) -> None:
+        self.file_ids[f"{tournament_id}:{path}"] = file_id
+
+
+render_cache = TournamentRenderCache()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for tournament in session.info.pop(_PENDING, ()):
+        render_cache.invalidate(tournament if isinstance(tournament, int) else tournament.id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
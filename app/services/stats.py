@@ -0,0 +1,373 @@
+"""Счётчики статистики в памяти процесса.
+
+Экран «📊 Статистика» и разбивки по играм и турнирам читаются из словаря в памяти,
+без COUNT(*) по таблицам. Счётчики меняются событиями сессий SQLAlchemy: after_flush
+считает разницу по новым, изменённым и удалённым User / Tournament / Team, а в память
+она попадает только после COMMIT (при откате отбрасывается). Транзакции обработчиков
+stat_counters не трогают — иначе каждая регистрация брала бы блокировку общих строк
+вроде «users» до своего COMMIT. Закоммиченная разница копится в памяти, и фоновая
+задача раз в STATS_FLUSH_INTERVAL секунд прибавляет её к таблице одной транзакцией;
+при старте счётчики читаются из таблицы, а не пересчитываются.
+
+Разница, не успевшая записаться до падения процесса, теряется, как и массовые
+insert/update/delete по этим моделям (и правки мимо бота), которые событиями не
+видны: такой коммит будит фоновую сверку, а раз в STATS_RECONCILE_INTERVAL секунд
+сверка и так пересчитывает всё GROUP BY-запросами, пишет расхождения в лог и
+перезаписывает таблицу.
+
+Ключи счётчиков:
+    users, active_tournaments, approved_teams — итоги для экрана статистики;
+    game:<id>:tournaments, game:<id>:active_tournaments, game:<id>:approved_teams;
+    tournament:<id>:<статус команды> — команды турнира по статусам заявки.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.database.db import StatCounter, Team, TeamStatus, Tournament, User
+from app.database.upsert import add_to_counters
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))  # 0 — без фоновой сверки
+STATS_FLUSH_INTERVAL = float(os.getenv("STATS_FLUSH_INTERVAL", "5"))  # секунд между записями в stat_counters
+
+USERS = "users"
+ACTIVE_TOURNAMENTS = "active_tournaments"
+APPROVED_TEAMS = "approved_teams"
+
+# Атрибуты, от которых зависят счётчики модели
+_TRACKED = {User: (), Tournament: ("is_active", "game_id"), Team: ("status", "tournament_id")}
+_DELTA = "stats_delta"
+_STALE = "stats_stale"
+
+
+def game_key(game_id: int, name: str) -> str:
+    return f"game:{game_id}:{name}"
+
+
+def tournament_key(tournament_id: int, status: TeamStatus) -> str:
+    return f"tournament:{tournament_id}:{TeamStatus(status).value}"
+
+
+class StatsCounters:
+    def __init__(self, interval: float = STATS_RECONCILE_INTERVAL, flush_interval: float = STATS_FLUSH_INTERVAL):
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.counters: dict[str, int] = {}
+        self.loaded = False
+        self._commits = 0  # применённые коммиты — чтобы заметить изменения во время сверки
+        self._unsaved = Counter()  # закоммиченная разница, ещё не записанная в stat_counters
+        self._tournament_games: dict[int, int] = {}
+        self._sync_engine = None
+        self._lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()  # запись разницы и сверка не пересекаются
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._session_maker = None
+
+    # Чтение
+
+    async def ensure_loaded(self, session) -> None:
+        """При первом обращении счётчики читаются из stat_counters через сессию обработчика"""
+        if self.loaded:
+            metrics.CACHE_REQUESTS.inc("stats", "hit")
+            return
+        metrics.CACHE_REQUESTS.inc("stats", "miss")
+        async with self._lock:
+            if not self.loaded:
+                await self.load(session)
+
+    def get(self, key: str) -> int:
+        return self.counters.get(key, 0)
+
+    def totals(self) -> dict:
+        return {
+            "users": self.get(USERS),
+            "active_tournaments": self.get(ACTIVE_TOURNAMENTS),
+            "teams": self.get(APPROVED_TEAMS),
+        }
+
+    def by_game(self, game_id: int) -> dict:
+        return {
+            name: self.get(game_key(game_id, name))
+            for name in ("tournaments", "active_tournaments", "approved_teams")
+        }
+
+    def by_tournament(self, tournament_id: int) -> dict[TeamStatus, int]:
+        """Команды турнира по статусам заявки"""
+        return {status: self.get(tournament_key(tournament_id, status)) for status in TeamStatus}
+
+    # Загрузка и сверка
+
+    async def load(self, session) -> None:
+        """Счётчики из stat_counters плюс ещё не записанная разница; пустая таблица
+        (первый запуск) заполняется пересчётом"""
+        async with self._write_lock:
+            rows = (await session.execute(select(StatCounter.key, StatCounter.value))).all()
+            counters = Counter(dict(rows))
+            counters.update(self._unsaved)
+        if not rows:
+            await self.reconcile(session)
+            return
+        self.counters = {key: value for key, value in counters.items() if value}
+        self.loaded = True
+        logger.info(f"Stats counters loaded: {len(self.counters)} keys, {self.totals()}")
+
+    async def count(self, session) -> dict[str, int]:
+        """Полный пересчёт всех счётчиков"""
+        counters = Counter()
+        counters[USERS] = await session.scalar(select(func.count(User.id)))
+        tournaments = await session.execute(
+            select(Tournament.game_id, Tournament.is_active, func.count())
+            .group_by(Tournament.game_id, Tournament.is_active)
+        )
+        for game_id, is_active, n in tournaments:
+            counters[game_key(game_id, "tournaments")] += n
+            if is_active:
+                counters[ACTIVE_TOURNAMENTS] += n
+                counters[game_key(game_id, "active_tournaments")] += n
+        teams = await session.execute(
+            select(Team.tournament_id, Tournament.game_id, Team.status, func.count())
+            .join(Tournament, Tournament.id == Team.tournament_id)
+            .group_by(Team.tournament_id, Tournament.game_id, Team.status)
+        )
+        for tournament_id, game_id, status, n in teams:
+            self._tournament_games[tournament_id] = game_id
+            counters[tournament_key(tournament_id, status)] += n
+            if status == TeamStatus.APPROVED:
+                counters[APPROVED_TEAMS] += n
+                counters[game_key(game_id, "approved_teams")] += n
+        return {key: value for key, value in counters.items() if value}
+
+    async def reconcile(self, session) -> bool:
+        """Пересчитывает счётчики и перезаписывает таблицу. Если за время пересчёта что-то
+        закоммитили, результат может быть неполным — сверка откладывается до следующего раза.
+        """
+        async with self._write_lock:
+            commits = self._commits
+            fresh = await self.count(session)
+            await session.execute(delete(StatCounter))
+            if fresh:
+                await session.execute(
+                    StatCounter.__table__.insert(), [{"key": key, "value": value} for key, value in fresh.items()]
+                )
+            if commits != self._commits:
+                await session.rollback()
+                logger.info("Stats reconcile skipped: counters changed during recount")
+                return False
+            # Всё закоммиченное до этого момента вошло в пересчёт
+            unsaved, self._unsaved = self._unsaved, Counter()
+            try:
+                await session.commit()
+            except Exception:
+                self._unsaved = unsaved + self._unsaved
+                raise
+            # Коммиты, прошедшие во время COMMIT сверки, в пересчёт не попали
+            fresh = Counter(fresh)
+            fresh.update(self._unsaved)
+            fresh = {key: value for key, value in fresh.items() if value}
+
+        if self.loaded:
+            drift = {
+                key: (self.counters.get(key, 0), fresh.get(key, 0))
+                for key in self.counters.keys() | fresh.keys()
+                if self.counters.get(key, 0) != fresh.get(key, 0)
+            }
+            if drift:
+                sample = dict(sorted(drift.items())[:10])
+                logger.warning(f"Stats counters drifted on {len(drift)} keys (memory, actual): {sample}")
+        self.counters = fresh
+        self.loaded = True
+        logger.info(f"Stats counters reconciled: {len(fresh)} keys, {self.totals()}")
+        return True
+
+    async def flush(self, session_maker) -> bool:
+        """Прибавляет накопленную разницу к stat_counters; False — запись не удалась, разница осталась в памяти"""
+        async with self._write_lock:
+            delta = {key: value for key, value in self._unsaved.items() if value}
+            self._unsaved = Counter()
+            if not delta:
+                return True
+            try:
+                async with session_maker() as session:
+                    connection = await session.connection()
+                    await connection.run_sync(_persist, delta)
+                    await session.commit()
+            except Exception:
+                self._unsaved.update(delta)
+                logger.exception(f"Failed to write {len(delta)} stats counters")
+                return False
+            logger.debug(f"Wrote {len(delta)} stats counters")
+            return True
+
+    def start(self, session_maker) -> None:
+        """Фоновая запись разницы раз в flush_interval секунд и сверка раз в interval секунд
+        (и после массовых изменений)"""
+        self._session_maker = session_maker
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._background_loop(session_maker), name="stats-counters")
+
+    async def stop(self) -> None:
+        """Останавливает фоновую задачу и записывает оставшуюся разницу"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session_maker is not None:
+            await self.flush(self._session_maker)
+
+    async def _background_loop(self, session_maker) -> None:
+        reconcile_at = time.monotonic() + self.interval
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            stale = self._wake.is_set()
+            self._wake.clear()
+            await self.flush(session_maker)
+            if self.interval <= 0 or not (stale or time.monotonic() >= reconcile_at):
+                continue
+            reconcile_at = time.monotonic() + self.interval
+            try:
+                async with session_maker() as session:
+                    await self.reconcile(session)
+            except Exception:
+                logger.exception("Stats reconcile failed")
+
+    # События сессий
+
+    def install(self, engine) -> None:
+        """Подписывается на события сессий, работающих с этим движком"""
+        if self._sync_engine is not None:
+            return
+        self._sync_engine = engine.sync_engine
+        event.listen(Session, "after_flush", self._after_flush)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+        event.listen(Session, "do_orm_execute", self._on_orm_execute)
+
+    def _tracked(self, session: Session) -> bool:
+        return session.bind is self._sync_engine
+
+    def _on_orm_execute(self, state) -> None:
+        if not (state.is_insert or state.is_update or state.is_delete) or not self._tracked(state.session):
+            return
+        mapper = state.bind_mapper
+        if mapper is not None and mapper.class_ in _TRACKED:
+            state.session.info[_STALE] = True
+
+    def _after_flush(self, session: Session, flush_context) -> None:
+        if not self._tracked(session):
+            return
+        delta = Counter()
+        for obj in session.new:
+            if type(obj) in _TRACKED:
+                self._contribute(session, delta, obj, _values(obj, "current"), 1)
+        for obj in session.dirty:
+            if type(obj) not in _TRACKED:
+                continue
+            changed = _changed(obj)
+            if changed is None:
+                session.info[_STALE] = True
+            elif changed:
+                self._contribute(session, delta, obj, _values(obj, "old"), -1)
+                self._contribute(session, delta, obj, _values(obj, "current"), 1)
+        for obj in session.deleted:
+            if type(obj) in _TRACKED:
+                self._contribute(session, delta, obj, _values(obj, "old"), -1)
+        for obj in session.deleted:
+            if isinstance(obj, Tournament):
+                self._tournament_games.pop(obj.id, None)
+
+        delta = {key: value for key, value in delta.items() if value}
+        if delta:
+            session.info.setdefault(_DELTA, Counter()).update(delta)
+
+    def _contribute(self, session: Session, delta: Counter, obj, values: dict, sign: int) -> None:
+        if isinstance(obj, User):
+            delta[USERS] += sign
+        elif isinstance(obj, Tournament):
+            self._tournament_games[obj.id] = values["game_id"]
+            delta[game_key(values["game_id"], "tournaments")] += sign
+            if values["is_active"] is not False:  # None — ещё не применённый default=True
+                delta[ACTIVE_TOURNAMENTS] += sign
+                delta[game_key(values["game_id"], "active_tournaments")] += sign
+        else:
+            status = values["status"] or TeamStatus.PENDING
+            delta[tournament_key(values["tournament_id"], status)] += sign
+            if status == TeamStatus.APPROVED:
+                delta[APPROVED_TEAMS] += sign
+                game_id = self._game_of(session, values["tournament_id"])
+                if game_id is not None:
+                    delta[game_key(game_id, "approved_teams")] += sign
+
+    def _game_of(self, session: Session, tournament_id: int) -> int | None:
+        game_id = self._tournament_games.get(tournament_id)
+        if game_id is None:
+            game_id = session.connection().scalar(
+                select(Tournament.game_id).where(Tournament.id == tournament_id)
+            )
+            if game_id is not None:
+                self._tournament_games[tournament_id] = game_id
+        return game_id
+
+    def _after_commit(self, session: Session) -> None:
+        delta = session.info.pop(_DELTA, None)
+        if delta:
+            self._commits += 1
+            self._unsaved.update(delta)
+            if self.loaded:
+                for key, value in delta.items():
+                    value += self.counters.get(key, 0)
+                    if value:
+                        self.counters[key] = value
+                    else:
+                        self.counters.pop(key, None)
+        if session.info.pop(_STALE, False) and self._wake is not None:
+            self._wake.set()
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_DELTA, None)
+        session.info.pop(_STALE, None)
+
+
+def _changed(obj) -> bool | None:
+    """Изменились ли отслеживаемые атрибуты; None — изменились, но прежнее значение не загружалось"""
+    attrs = inspect(obj).attrs
+    histories = [attrs[name].history for name in _TRACKED[type(obj)]]
+    if any(history.added and not history.deleted for history in histories):
+        return None
+    return any(history.has_changes() for history in histories)
+
+
+def _values(obj, which: str) -> dict:
+    """Значения отслеживаемых атрибутов до изменения (old) или сейчас (current)"""
+    attrs = inspect(obj).attrs
+    values = {}
+    for name in _TRACKED[type(obj)]:
+        history = attrs[name].history
+        values[name] = history.deleted[0] if which == "old" and history.deleted else getattr(obj, name)
+    return values
+
+
+def _persist(connection, delta: dict[str, int]) -> None:
+    """Прибавляет разницу к stat_counters в транзакции соединения"""
+    add_to_counters(
+        connection, StatCounter.__table__, "value", [{"key": key, "value": value} for key, value in delta.items()]
+    )
+    if any(value < 0 for value in delta.values()):
+        connection.execute(delete(StatCounter).where(StatCounter.key.in_(delta.keys()), StatCounter.value == 0))
+
+
+stats = StatsCounters()
@@ -0,0 +1,185 @@
+"""Журнал событий заявок команд и почасовые/посуточные сводки по нему.
+
+Обработчики регистрации, модерации и удаления команд до session.commit() вызывают
+team_events.record_on_commit(session, ...): событие попадает в буфер в памяти только после
+COMMIT этой сессии (в режиме unit of work commit() обработчика — лишь flush, и при ошибке
+обработчика всё откатится), при откате отбрасывается. Фоновая задача раз
+в TEAM_EVENTS_FLUSH_INTERVAL секунд (или сразу, когда набралось TEAM_EVENTS_BATCH_SIZE)
+пишет пачку одной транзакцией: строки в team_events и прибавки к team_events_hourly и
+team_events_daily. Кривые регистраций и выгрузки читают только сводки, а не teams,
+и отстают от живых данных не больше чем на интервал сброса.
+
+Заявки, поданные до появления журнала (или добавленные мимо бота), при старте
+дописываются в журнал и сводки backfill() по времени из Team.created_at.
+
+При ошибке записи пачка возвращается в буфер и уходит со следующим сбросом; при
+остановке бота буфер сбрасывается. События, не успевшие записаться до падения
+процесса, теряются — для аналитики это допустимо.
+"""
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.database.db import Team, TeamEvent, TeamEventDaily, TeamEventHourly, TeamEventKind, async_session_maker
+from app.database.upsert import add_to_counters
+
+logger = logging.getLogger(__name__)
+
+TEAM_EVENTS_FLUSH_INTERVAL = float(os.getenv("TEAM_EVENTS_FLUSH_INTERVAL", "2"))  # секунд между сбросами
+TEAM_EVENTS_BATCH_SIZE = int(os.getenv("TEAM_EVENTS_BATCH_SIZE", "500"))  # событий в одной транзакции
+
+_PENDING = "team_events"
+
+
+def rollup_rows(events: list[dict]) -> tuple[list[dict], list[dict]]:
+    """Прибавки к почасовой и посуточной сводкам для пачки событий"""
+    hourly, daily = Counter(), Counter()
+    for item in events:
+        hour = item["created_at"].replace(minute=0, second=0, microsecond=0)
+        hourly[item["tournament_id"], item["kind"], hour] += 1
+        daily[item["tournament_id"], item["kind"], hour.replace(hour=0)] += 1
+    return tuple(
+        [
+            {"tournament_id": tournament_id, "kind": kind, "bucket": bucket, "count": count}
+            for (tournament_id, kind, bucket), count in counts.items()
+        ]
+        for counts in (hourly, daily)
+    )
+
+
+class TeamEventWriter:
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        interval: float = TEAM_EVENTS_FLUSH_INTERVAL,
+        batch_size: int = TEAM_EVENTS_BATCH_SIZE,
+    ):
+        self.session_maker = session_maker
+        self.interval = interval
+        self.batch_size = batch_size
+        self._pending: list[dict] = []
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record_on_commit(self, session, kind: TeamEventKind, team: Team, actor_tg_id: int) -> None:
+        """record() после COMMIT этой сессии (при откате — ничего); вызывать до session.commit().
+        Команда передаётся объектом — у новой id появится только при flush"""
+        session.info.setdefault(_PENDING, []).append((kind, team, actor_tg_id))
+
+    def record(self, kind: TeamEventKind, team_id: int, tournament_id: int, actor_tg_id: int) -> None:
+        """Ставит событие в очередь на запись; изменение команды уже закоммичено"""
+        self._pending.append({
+            "kind": kind,
+            "team_id": team_id,
+            "tournament_id": tournament_id,
+            "actor_tg_id": actor_tg_id,
+            "created_at": datetime.utcnow(),
+        })
+        if self._task is None:
+            self._start()
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def _start(self) -> None:
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop(), name="team-events-writer")
+
+    async def stop(self) -> None:
+        """Останавливает фоновую задачу и записывает всё, что осталось в буфере"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._pending:
+            if not await self.flush():
+                break
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            while self._pending:
+                if not await self.flush() or len(self._pending) < self.batch_size:
+                    break
+
+    async def flush(self) -> bool:
+        """Пишет одну пачку; False — запись не удалась, пачка вернулась в буфер"""
+        async with self._flush_lock:
+            batch = self._pending[:self.batch_size]
+            if not batch:
+                return True
+            del self._pending[:len(batch)]
+            hourly, daily = rollup_rows(batch)
+            try:
+                async with self.session_maker() as session:
+                    await session.execute(insert(TeamEvent), batch)
+                    connection = await session.connection()
+                    await connection.run_sync(add_to_counters, TeamEventHourly.__table__, "count", hourly)
+                    await connection.run_sync(add_to_counters, TeamEventDaily.__table__, "count", daily)
+                    await session.commit()
+            except Exception:
+                self._pending[:0] = batch
+                logger.exception(f"Failed to write {len(batch)} team events, {len(self._pending)} pending")
+                return False
+            logger.debug(f"Wrote {len(batch)} team events")
+            return True
+
+    async def backfill(self, session) -> int:
+        """События REGISTERED для команд с created_at, у которых их ещё нет; повторный запуск ничего не добавит"""
+        registered = select(TeamEvent.id).where(TeamEvent.team_id == Team.id, TeamEvent.kind == TeamEventKind.REGISTERED)
+        rows = await session.execute(
+            select(Team.id, Team.tournament_id, Team.captain_tg_id, Team.created_at)
+            .where(Team.created_at.is_not(None), ~registered.exists())
+        )
+        events = [
+            {
+                "kind": TeamEventKind.REGISTERED,
+                "team_id": team_id,
+                "tournament_id": tournament_id,
+                "actor_tg_id": captain_tg_id,
+                "created_at": created_at,
+            }
+            for team_id, tournament_id, captain_tg_id, created_at in rows
+        ]
+        if not events:
+            return 0
+        for start in range(0, len(events), self.batch_size):
+            await session.execute(insert(TeamEvent), events[start:start + self.batch_size])
+        hourly, daily = rollup_rows(events)
+        connection = await session.connection()
+        await connection.run_sync(add_to_counters, TeamEventHourly.__table__, "count", hourly)
+        await connection.run_sync(add_to_counters, TeamEventDaily.__table__, "count", daily)
+        await session.commit()
+        logger.info(f"Backfilled {len(events)} team registration events from teams.created_at")
+        return len(events)
+
+
+team_events = TeamEventWriter(async_session_maker)
+
+
+@event.listens_for(Session, "after_commit")
+def _record_committed(session: Session) -> None:
+    for kind, team, actor_tg_id in session.info.pop(_PENDING, ()):
+        team_events.record(kind, team.id, team.tournament_id, actor_tg_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,229 @@
+"""Callback data кнопок: короткие коды действий с типизированными аргументами и маршрутизация по коду.
+
+Формат — "<код>[:<аргумент>...]", например "apt:15" вместо "approve_tournament_15". Все действия
+объявлены в этом модуле, поэтому коды не пересекаются (повтор — ошибка при импорте), а префиксы
+вида edit_team_ / edit_team_name_ больше не нужно различать регулярками.
+
+Кнопка собирается через action.pack(...), обработчик регистрируется фильтром action.filter()
+и получает разобранные аргументы в параметре callback_data:
+
+    builder.button(text="✅ Одобрить", callback_data=APPROVE_TEAM.pack(team.id))
+
+    @router.callback_query(APPROVE_TEAM.filter())
+    async def approve_team(call: CallbackQuery, callback_data: APPROVE_TEAM.Args): ...
+
+В ActionRouter callback_data разбирается один раз на апдейт, а кандидаты на обработку берутся
+из словаря код -> обработчики: фильтры остальных действий не вычисляются вовсе.
+
+Кнопки в уже отправленных сообщениях несут старые строки ("approve_team_15") — они
+разбираются по legacy-именам действий и попадают в те же обработчики.
+"""
+from collections import namedtuple
+from typing import Any
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters import Filter
+from aiogram.types import CallbackQuery, TelegramObject
+
+ACTIONS: dict[str, "Action"] = {}
+# Старые callback_data: точные строки кнопок без аргументов и префиксы кнопок с id в конце
+_LEGACY_EXACT: dict[str, "Action"] = {}
+_LEGACY_PREFIX: dict[str, "Action"] = {}
+_NOT_DECODED = object()
+
+
+class Action:
+    def __init__(self, code: str, legacy: str | None = None, **fields: type):
+        if ":" in code:
+            raise ValueError(f"Callback action code must not contain ':': {code}")
+        if code in ACTIONS:
+            raise ValueError(f"Duplicate callback action code: {code}")
+        self.code = code
+        self.fields = fields
+        self.Args = namedtuple(f"{code.capitalize()}Args", fields)
+        ACTIONS[code] = self
+        if legacy is not None:
+            (_LEGACY_PREFIX if fields else _LEGACY_EXACT)[legacy] = self
+
+    def __repr__(self) -> str:
+        return f"Action({self.code!r})"
+
+    def pack(self, *values: Any) -> str:
+        if len(values) != len(self.fields):
+            raise TypeError(f"Action {self.code!r} expects {len(self.fields)} arguments, got {len(values)}")
+        return ":".join((self.code, *map(str, values)))
+
+    def parse(self, values: list[str]) -> tuple:
+        if len(values) != len(self.fields):
+            raise ValueError(f"Action {self.code!r} expects {len(self.fields)} arguments")
+        return self.Args._make(type_(value) for type_, value in zip(self.fields.values(), values))
+
+    def filter(self, **expected: Any) -> "ActionFilter":
+        """Фильтр обработчика; expected — обязательные значения аргументов (например, list_name="tm")"""
+        return ActionFilter(self, expected)
+
+
+def decode(data: str | None) -> tuple[Action, tuple] | None:
+    """callback_data -> (действие, аргументы); None — неизвестная или битая строка"""
+    if not data:
+        return None
+    code, _, rest = data.partition(":")
+    action = ACTIONS.get(code)
+    if action is not None:
+        values = rest.split(":") if rest else []
+    else:
+        action, values = _LEGACY_EXACT.get(data), []
+        if action is None:
+            prefix, _, value = data.rpartition("_")
+            action, values = _LEGACY_PREFIX.get(prefix + "_"), [value]
+            if action is None:
+                return None
+    try:
+        return action, action.parse(values)
+    except ValueError:
+        return None
+
+
+class ActionFilter(Filter):
+    def __init__(self, action: Action, expected: dict[str, Any]):
+        self.action = action
+        self.expected = expected
+
+    async def __call__(self, call: CallbackQuery, callback_action: Any = _NOT_DECODED) -> bool | dict:
+        # ActionRouter передаёт уже разобранные данные; в обычном роутере разбираем сами
+        decoded = decode(call.data) if callback_action is _NOT_DECODED else callback_action
+        if decoded is None or decoded[0] is not self.action:
+            return False
+        args = decoded[1]
+        if any(getattr(args, name) != value for name, value in self.expected.items()):
+            return False
+        return {"callback_data": args}
+
+
+def _handler_action(handler: HandlerObject) -> Action | None:
+    for filter_object in handler.filters or ():
+        if isinstance(filter_object.callback, ActionFilter):
+            return filter_object.callback.action
+    return None
+
+
+class ActionObserver(TelegramEventObserver):
+    """Наблюдатель callback_query: обработчики сгруппированы по коду действия"""
+
+    def __init__(self, router: Router, event_name: str):
+        super().__init__(router=router, event_name=event_name)
+        self._routes: dict[Action | None, list[HandlerObject]] = {}
+
+    def register(self, callback, *filters, flags=None, **kwargs):
+        self._routes.clear()
+        return super().register(callback, *filters, flags=flags, **kwargs)
+
+    def candidates(self, action: Action | None) -> list[HandlerObject]:
+        """Обработчики этого действия и обработчики без фильтра действия — в порядке регистрации"""
+        handlers = self._routes.get(action)
+        if handlers is None:
+            handlers = self._routes[action] = [
+                handler for handler in self.handlers if _handler_action(handler) in (action, None)
+            ]
+        return handlers
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        decoded = decode(event.data)
+        kwargs["callback_action"] = decoded
+        # Дальше — как TelegramEventObserver.trigger, но только по кандидатам
+        for handler in self.candidates(decoded[0] if decoded else None):
+            kwargs["handler"] = handler
+            result, data = await handler.check(event, **kwargs)
+            if result:
+                kwargs.update(data)
+                try:
+                    wrapped_inner = self.outer_middleware.wrap_middlewares(
+                        self._resolve_middlewares(),
+                        handler.call,
+                    )
+                    return await wrapped_inner(event, kwargs)
+                except SkipHandler:
+                    continue
+        return UNHANDLED
+
+
+class ActionRouter(Router):
+    """Router, в котором callback_query маршрутизируются по коду действия"""
+
+    def __init__(self, *, name: str | None = None):
+        super().__init__(name=name)
+        self.callback_query = self.observers["callback_query"] = ActionObserver(
+            router=self, event_name="callback_query"
+        )
+
+
+# Навигация по страницам списков (app/keyboards/pagination.py)
+PAGE = Action("pg", list_name=str, direction=str, cursor=int)
+
+# Админ-панель
+BACK_TO_ADMIN = Action("ba", "back_to_admin")
+STATS = Action("st", "stats")
+MANAGE_TOURNAMENTS = Action("mt", "manage_tournaments")
+BACK_TO_TOURNAMENTS = Action("bt", "back_to_tournaments")
+CREATE_TOURNAMENT = Action("ct", "create_tournament")
+ADMIN_SELECT_GAME = Action("asg", "admin_select_game_", game_id=int)
+ADMIN_SELECT_FORMAT = Action("asf", "admin_select_format_", format_id=int)
+ADMIN_TOURNAMENT = Action("at", "admin_tournament_", tournament_id=int)
+EDIT_TOURNAMENT = Action("et", "edit_tournament_", tournament_id=int)
+DELETE_TOURNAMENT = Action("dt", "delete_tournament_", tournament_id=int)
+CONFIRM_DELETE_TOURNAMENT = Action("cdt", "confirm_delete_", tournament_id=int)
+CANCEL_ACTION = Action("xa", "cancel_action")
+ACTIVATE_TOURNAMENT = Action("on", "activate_tournament_", tournament_id=int)
+DEACTIVATE_TOURNAMENT = Action("off", "deactivate_tournament_", tournament_id=int)
+TOURNAMENT_DASHBOARD = Action("tdb", tournament_id=int)
+TOURNAMENT_REGISTRATIONS_CSV = Action("trc", tournament_id=int)
+TEAM_REQUESTS = Action("tr", "team_requests")
+MODERATE_TEAMS = Action("mts", "moderate_teams")
+MODERATE_TEAM = Action("mtm", "moderate_team_", team_id=int)
+PREVIEW_TEAM = Action("pvt", "preview_team_", team_id=int)
+APPROVE_TEAM = Action("apm", "approve_team_", team_id=int)
+REJECT_TEAM = Action("rjm", "reject_team_", team_id=int)
+NOTIFICATIONS_MENU = Action("nm", "notifications_menu")
+NOTIFY_ALL_USERS = Action("na", "notify_all_users")
+NOTIFY_WINNERS = Action("nw", "notify_winners")
+NOTIFY_LOSERS = Action("nl", "notify_losers")
+NOTIFY_IN_PROGRESS = Action("ni", "notify_inprogress")
+SHOW_TOURNAMENTS = Action("shw", "show_tournaments")
+
+# Супер-админ
+BACK_TO_SUPER_ADMIN = Action("bsa", "back_to_super_admin")
+SWITCH_TO_ADMIN_MENU = Action("sam", "switch_to_admin_menu")
+MANAGE_ADMINS = Action("ma", "manage_admins")
+ADD_ADMIN = Action("aa", "add_admin")
+TOGGLE_ADMIN = Action("tga", "toggle_admin_", user_id=int)
+MODERATE_TOURNAMENTS = Action("mtt", "moderate_tournaments")
+VIEW_PENDING_TOURNAMENT = Action("vpt", "view_pending_tournament_", tournament_id=int)
+APPROVE_TOURNAMENT = Action("apt", "approve_tournament_", tournament_id=int)
+REJECT_TOURNAMENT = Action("rjt", "reject_tournament_", tournament_id=int)
+
+# Пользователь: турниры и регистрация
+BACK_TO_GAMES = Action("bg", "back_to_games")
+USER_SELECT_GAME = Action("ug", "user_select_game_", game_id=int)
+USER_SELECT_FORMAT = Action("uf", "user_select_format_", format_id=int)
+VIEW_TOURNAMENT = Action("vt", "view_tournament_", tournament_id=int)
+USER_VIEW_TOURNAMENT = Action("uvt", "user_view_tournament_", tournament_id=int)
+RULES = Action("rl", "rules_", tournament_id=int)
+REGISTER = Action("rg", "register_", tournament_id=int)
+CANCEL_REGISTRATION = Action("xr", "cancel_registration")
+CHECK_SUBSCRIPTION = Action("cs", "check_subscription")
+
+# Пользователь: свои команды
+BACK_TO_MY_TEAMS = Action("bmt", "back_to_my_teams")
+MY_TEAM = Action("myt", "my_team_", team_id=int)
+EDIT_TEAM = Action("etm", "edit_team_", team_id=int)
+EDIT_TEAM_MENU = Action("etu", "edit_team_menu")
+EDIT_TEAM_NAME = Action("etn", "edit_team_name_", team_id=int)
+EDIT_TEAM_LOGO = Action("etl", "edit_team_logo_", team_id=int)
+EDIT_TEAM_PLAYERS = Action("etp", "edit_team_players_", team_id=int)
+EDIT_PLAYER = Action("ep", "edit_player_", player_id=int)
+DELETE_TEAM = Action("dtm", "delete_team_", team_id=int)
+CONFIRM_DELETE_TEAM = Action("cdm", "confirm_delete_team_", team_id=int)
+CANCEL_DELETE_TEAM = Action("xdm", "cancel_delete_team")
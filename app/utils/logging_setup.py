@@ -0,0 +1,115 @@
+"""Логирование через очередь: в event loop запись только кладётся в queue.Queue,
+форматирование трейсбеков и запись в файл/консоль делает поток QueueListener.
+
+LOG_FORMAT=json включает структурированные строки с полями update_id и handler
+(их проставляет LogContextMiddleware). LOG_SAMPLING прореживает болтливые логгеры:
+"app.middleware:DEBUG=0.05" — оставить 5% записей уровня DEBUG и ниже от app.middleware.
+"""
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # text | json
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "app.middleware:DEBUG=0.05")
+LOG_FILE = "logs/bot.log"
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+
+# Контекст текущего апдейта: {"update_id": ..., "handler": ...}
+log_context: contextvars.ContextVar[dict | None] = contextvars.ContextVar("log_context", default=None)
+
+
+def parse_sampling(value: str) -> list[tuple[str, int, float]]:
+    """"logger:LEVEL=rate,..." -> [(logger, level, rate)]"""
+    rules = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        target, rate = item.rsplit("=", 1)
+        name, _, level = target.partition(":")
+        rules.append((name, logging.getLevelName(level.upper() or "DEBUG"), float(rate)))
+    return rules
+
+
+class ContextFilter(logging.Filter):
+    """Прикрепляет к записи update_id и handler, пока она ещё в потоке event loop"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = log_context.get() or {}
+        record.update_id = context.get("update_id")
+        record.handler = context.get("handler")
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает только долю записей не выше заданного уровня от указанных логгеров"""
+
+    def __init__(self, rules: list[tuple[str, int, float]]):
+        super().__init__()
+        self.rules = rules
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for name, level, rate in self.rules:
+            if record.levelno <= level and (record.name == name or record.name.startswith(name + ".")):
+                return random.random() < rate
+        return True
+
+
+class LoopQueueHandler(QueueHandler):
+    """В отличие от стандартного prepare() не форматирует запись целиком в event loop.
+
+    Сообщение склеивается сразу (аргументы могут измениться или оказаться ORM-объектами),
+    а трейсбек и финальная строка собираются уже в потоке слушателя.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "update_id": getattr(record, "update_id", None),
+            "handler": getattr(record, "handler", None),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(
+    level: str = LOG_LEVEL,
+    fmt: str = LOG_FORMAT,
+    sampling: str = LOG_SAMPLING,
+    log_file: str = LOG_FILE,
+) -> QueueListener:
+    """Настраивает корневой логгер на очередь и запускает поток записи. Вызывающий останавливает listener при выходе."""
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    formatter = JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [
+        RotatingFileHandler(log_file, encoding='utf-8', maxBytes=5*1024*1024, backupCount=3),
+        logging.StreamHandler(),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LoopQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(parse_sampling(sampling)))
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
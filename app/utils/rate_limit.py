@@ -0,0 +1,49 @@
+import time
+
+
+class RateLimiter:
+    """Ограничитель частоты по ключу (GCRA — эквивалент token bucket).
+
+    Для каждого ключа хранится одно число — теоретическое время следующего запроса,
+    поэтому таблица на тысячи пользователей занимает минимум памяти. Записи
+    с полностью восстановленным запасом периодически удаляются.
+    """
+
+    __slots__ = ("interval", "burst_window", "sweep_interval", "_tat", "_next_sweep")
+
+    def __init__(self, rate: float, burst: int = 1, sweep_interval: float = 60.0):
+        """
+        :param rate: сколько событий в секунду разрешено в среднем
+        :param burst: сколько событий подряд разрешено без ожидания
+        :param sweep_interval: как часто чистить неактивные ключи (секунды)
+        """
+        self.interval = 1.0 / rate
+        self.burst_window = self.interval * burst
+        self.sweep_interval = sweep_interval
+        self._tat: dict = {}
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def delay(self, key, now: float | None = None) -> float:
+        """Занимает слот для ключа. Возвращает 0, если можно сразу, иначе — сколько ждать."""
+        if now is None:
+            now = time.monotonic()
+        if now >= self._next_sweep:
+            self.sweep(now)
+        tat = max(self._tat.get(key, now), now) + self.interval
+        wait = tat - now - self.burst_window
+        if wait > 1e-9:  # допуск на погрешность float
+            return wait
+        self._tat[key] = tat
+        return 0.0
+
+    def allow(self, key, now: float | None = None) -> bool:
+        return self.delay(key, now) == 0.0
+
+    def sweep(self, now: float | None = None) -> None:
+        if now is None:
+            now = time.monotonic()
+        self._tat = {key: tat for key, tat in self._tat.items() if tat > now}
+        self._next_sweep = now + self.sweep_interval
+
+    def __len__(self) -> int:
+        return len(self._tat)
@@ -0,0 +1,85 @@
+"""Режим вебхука: приём апдейтов через aiohttp вместо long polling."""
+import asyncio
+import logging
+import os
+import secrets
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "")  # Публичный адрес, например https://bot.example.com
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+# Сколько апдейтов обрабатывается одновременно (и сколько соединений разрешаем Telegram)
+WEBHOOK_MAX_CONCURRENT_UPDATES = int(os.getenv("WEBHOOK_MAX_CONCURRENT_UPDATES", "40"))
+# При "1" Telegram получает ответ сразу, но хендлеры не могут отвечать через ответ вебхука
+WEBHOOK_HANDLE_IN_BACKGROUND = os.getenv("WEBHOOK_HANDLE_IN_BACKGROUND", "0") == "1"
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Обработчик вебхука с ограничением числа одновременно обрабатываемых апдейтов"""
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, max_concurrent_updates: int, **kwargs):
+        super().__init__(dispatcher=dispatcher, bot=bot, **kwargs)
+        self._semaphore = asyncio.Semaphore(max_concurrent_updates)
+
+    async def _handle_request(self, bot: Bot, request: web.Request) -> web.Response:
+        async with self._semaphore:
+            return await super()._handle_request(bot, request)
+
+    async def _background_feed_update(self, bot: Bot, update: dict) -> None:
+        async with self._semaphore:
+            await super()._background_feed_update(bot, update)
+
+
+def create_webhook_app(dp: Dispatcher, bot: Bot, secret_token: str) -> web.Application:
+    """Собирает aiohttp-приложение с обработчиком вебхука"""
+    app = web.Application()
+    BoundedRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        max_concurrent_updates=WEBHOOK_MAX_CONCURRENT_UPDATES,
+        handle_in_background=WEBHOOK_HANDLE_IN_BACKGROUND,
+        secret_token=secret_token,
+    ).register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    secret_token = WEBHOOK_SECRET
+    if not secret_token:
+        # Вебхук регистрируется при каждом запуске, поэтому случайный секрет безопасен
+        secret_token = secrets.token_urlsafe(32)
+        logger.warning("WEBHOOK_SECRET is not set, generated a random secret for this run")
+
+    async def on_startup(bot: Bot) -> None:
+        if not WEBHOOK_BASE_URL:
+            logger.warning("WEBHOOK_BASE_URL is not set, skipping setWebhook")
+            return
+        url = f"{WEBHOOK_BASE_URL.rstrip('/')}{WEBHOOK_PATH}"
+        await bot.set_webhook(
+            url,
+            secret_token=secret_token,
+            max_connections=WEBHOOK_MAX_CONCURRENT_UPDATES,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        logger.info(f"Webhook set to {url}")
+
+    dp.startup.register(on_startup)
+
+    app = create_webhook_app(dp, bot, secret_token)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT)
+    await site.start()
+    logger.info(f"Webhook server listening on {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
@@ -1,70 +1,161 @@
 import sys
 sys.stdout.reconfigure(encoding='utf-8')
+import argparse
 import asyncio
 import os
 import logging
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from dotenv import load_dotenv
-from app.handlers import common, user, admin, super_admin
-from app.database.db import create_db, async_session_maker
-from app.middleware import DatabaseMiddleware, ErrorHandlerMiddleware, SubscriptionMiddleware, UserAutoUpdateMiddleware
-from logging.handlers import RotatingFileHandler
 
 load_dotenv()
 
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+from app.handlers import common, user, admin, super_admin
+from app.database.db import create_db, async_session_maker, engine
+from app.database import query_stats
+from app.database.slow_queries import SLOW_QUERY_MS, SlowQueryLog
+from app.middleware import LogContextMiddleware, MetricsMiddleware, TimedMiddleware, ThrottlingMiddleware, ChatOrderMiddleware, QueryStatsMiddleware, DatabaseMiddleware, ErrorHandlerMiddleware, SubscriptionMiddleware, UserAutoUpdateMiddleware
+from app.webhook import run_webhook
+from app.services.outbound import OutboundScheduler, OutboundMetrics
+from app.services.metrics import METRICS_ENABLED, fsm_sessions_gauge, instrument_engine, start_metrics_server
+from app.services.profiler import HandlerProfiler
+from app.services.catalog import catalog
+from app.services.stats import stats
+from app.services.team_events import team_events
+from app.services.memory import MemoryTracker
+from app.services.loop_monitor import LOOP_LAG_THRESHOLD_MS, LoopLagMonitor
+from app.services.bot_session import create_bot_session
+from app.utils.rate_limit import RateLimiter
+from app.utils.logging_setup import setup_logging
+
 logger = logging.getLogger("ENASGameBot")
 
-async def main() -> None:
-    logger.info("Starting bot initialization...")
-    await create_db()
-    logger.info("Database checked/created.")
 
-    bot = Bot(token=os.getenv("BOT_TOKEN"))
+def timed(middleware, layer: str):
+    """С включёнными метриками middleware пишет своё время в bot_middleware_duration_seconds"""
+    return TimedMiddleware(middleware, layer) if METRICS_ENABLED else middleware
+
+
+def create_dispatcher() -> Dispatcher:
     dp = Dispatcher()
+    dp["profiler"] = HandlerProfiler(dp)  # /profile регистрирует свой middleware только на время сеанса
+    dp["memory"] = MemoryTracker()  # /memory и SIGUSR2
 
     # Middleware
-    dp.update.middleware(DatabaseMiddleware(async_session_maker))
-    dp.update.middleware(ErrorHandlerMiddleware())
-    dp.update.middleware(UserAutoUpdateMiddleware())  # <-- Добавьте сюда
-    dp.message.middleware(SubscriptionMiddleware())
-    dp.callback_query.middleware(SubscriptionMiddleware())
-    dp.callback_query.middleware(UserAutoUpdateMiddleware())
+    log_context_middleware = LogContextMiddleware()
+    dp.update.outer_middleware(log_context_middleware)
+    dp.message.middleware(log_context_middleware)
+    dp.callback_query.middleware(log_context_middleware)
+    if METRICS_ENABLED:
+        instrument_engine(engine)
+        fsm_sessions_gauge(dp.storage)
+        metrics_middleware = MetricsMiddleware()
+        dp.update.outer_middleware(metrics_middleware)
+        dp.message.middleware(metrics_middleware)
+        dp.callback_query.middleware(metrics_middleware)
+    dp.update.outer_middleware(timed(ThrottlingMiddleware(
+        message=RateLimiter(
+            rate=float(os.getenv("THROTTLE_MESSAGE_RATE", "1")),
+            burst=int(os.getenv("THROTTLE_MESSAGE_BURST", "5"))
+        ),
+        callback=RateLimiter(
+            rate=float(os.getenv("THROTTLE_CALLBACK_RATE", "2")),
+            burst=int(os.getenv("THROTTLE_CALLBACK_BURST", "6"))
+        ),
+        upload=RateLimiter(
+            rate=float(os.getenv("THROTTLE_UPLOAD_RATE", "0.5")),
+            burst=int(os.getenv("THROTTLE_UPLOAD_BURST", "3"))
+        )
+    ), "throttling"))
+    dp.update.outer_middleware(timed(ChatOrderMiddleware(
+        max_queue_depth=int(os.getenv("CHAT_QUEUE_MAX_DEPTH", "5"))
+    ), "chat_order"))
+    if query_stats.QUERY_STATS != "off" or SLOW_QUERY_MS:
+        # Учёт запросов по апдейтам (QUERY_STATS=on|strict) и лог медленных запросов (SLOW_QUERY_MS);
+        # если оба выключены, к движку и диспетчеру ничего не подключается
+        if query_stats.QUERY_STATS != "off":
+            query_stats.install(engine)
+        if SLOW_QUERY_MS:
+            SlowQueryLog().install(engine)
+        query_stats_middleware = QueryStatsMiddleware(enforce=query_stats.QUERY_STATS != "off")
+        dp.update.outer_middleware(query_stats_middleware)
+        dp.message.middleware(query_stats_middleware)
+        dp.callback_query.middleware(query_stats_middleware)
+    stats.install(engine)  # счётчики экрана статистики следят за коммитами сессий
+    dp.update.middleware(timed(DatabaseMiddleware(async_session_maker), "database"))
+    dp.update.middleware(timed(ErrorHandlerMiddleware(), "errors"))
+    dp.update.middleware(timed(UserAutoUpdateMiddleware(), "user_auto_update"))  # <-- Добавьте сюда
+    dp.message.middleware(timed(SubscriptionMiddleware(), "subscription"))
+    dp.callback_query.middleware(timed(SubscriptionMiddleware(), "subscription"))
+    dp.callback_query.middleware(timed(UserAutoUpdateMiddleware(), "user_auto_update"))
 
     # Роутеры
-    
+
     dp.include_router(user.router)
     dp.include_router(admin.router)
     dp.include_router(super_admin.router)
     dp.include_router(common.router)
+    return dp
+
 
-    logger.info("Bot started polling.")
-    await dp.start_polling(bot)
-    logger.info("Bot polling finished.")
+async def main(mode: str = "polling") -> None:
+    logger.info("Starting bot initialization...")
+    await create_db()
+    logger.info("Database checked/created.")
+    async with async_session_maker() as session:
+        await catalog.reload(session)
+        await stats.load(session)
+        await team_events.backfill(session)
+
+    bot = Bot(token=os.getenv("BOT_TOKEN"), session=create_bot_session())
+    bot.session.middleware(OutboundScheduler())
+    if METRICS_ENABLED:
+        bot.session.middleware(OutboundMetrics())
+    dp = create_dispatcher()
+    stats.start(async_session_maker)
+    metrics_runner = await start_metrics_server() if METRICS_ENABLED else None
+    dp["memory"].install_signal_handler()
+    loop_monitor = LoopLagMonitor() if LOOP_LAG_THRESHOLD_MS > 0 else None
+    if loop_monitor:
+        loop_monitor.start()
+
+    try:
+        if mode == "webhook":
+            logger.info("Bot started in webhook mode.")
+            await run_webhook(dp, bot)
+            return
+
+        logger.info("Bot started polling.")
+        await dp.start_polling(bot)
+        logger.info("Bot polling finished.")
+    finally:
+        if loop_monitor:
+            await loop_monitor.stop()
+        await stats.stop()
+        await team_events.stop()
+        if metrics_runner:
+            await metrics_runner.cleanup()
 
 if __name__ == "__main__":
-    # Создаём папку logs, если её нет
-    os.makedirs("logs", exist_ok=True)
-
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
-        handlers=[
-            RotatingFileHandler(
-                'logs/bot.log',  # <-- путь к файлу логов в папке logs
-                encoding='utf-8',
-                maxBytes=5*1024*1024,
-                backupCount=3
-            ),
-            logging.StreamHandler()
-        ]
+    parser = argparse.ArgumentParser(description="ENASGame bot")
+    parser.add_argument(
+        "--mode",
+        choices=("polling", "webhook"),
+        default=os.getenv("BOT_MODE", "polling"),
+        help="Способ получения апдейтов: long polling или вебхук (aiohttp)"
     )
+    args = parser.parse_args()
+
+    # Логи пишет отдельный поток (папка logs создаётся при настройке)
+    log_listener = setup_logging()
     logger = logging.getLogger("ENASGameBot")
     try:
         logger.info("Bot is starting...")
-        asyncio.run(main())
+        asyncio.run(main(args.mode))
     except KeyboardInterrupt:
         print("Бот остановлен")
         sys.exit(0)
     except Exception as e:
-        logger.exception("Fatal error in main loop")
\ No newline at end of file
+        logger.exception("Fatal error in main loop")
+    finally:
+        log_listener.stop()
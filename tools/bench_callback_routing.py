@@ -0,0 +1,143 @@
+"""Бенчмарк выбора обработчика для callback_query: сколько обработчиков проверяется и сколько
+времени уходит на фильтры до найденного, без вызова самого обработчика и middleware.
+
+Роутеры и фильтры берутся из настоящего run.create_dispatcher(). Для ActionRouter кандидаты
+выбираются по коду действия (app/utils/callbacks.py), для обычного Router — перебором всех
+обработчиков, как в aiogram. Набор callback_data — старые строки кнопок, поэтому тот же запуск
+на дереве до перехода на коды показывает прежнюю стоимость; на текущем дереве дополнительно
+замеряются короткие коды.
+
+    python -m tools.bench_callback_routing --repeat 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# По одной кнопке на обработчик: строки, которые клавиатуры отправляли до коротких кодов
+LEGACY_SAMPLES = [
+    "stats", "back_to_admin", "manage_tournaments", "create_tournament", "admin_select_game_1",
+    "admin_select_format_3", "edit_tournament_15", "delete_tournament_15", "back_to_tournaments",
+    "team_requests", "moderate_teams", "moderate_team_42", "activate_tournament_15",
+    "deactivate_tournament_15", "preview_team_42", "notifications_menu", "notify_all_users",
+    "notify_winners", "notify_losers", "notify_inprogress", "manage_admins", "toggle_admin_7",
+    "switch_to_admin_menu", "add_admin", "back_to_super_admin", "moderate_tournaments",
+    "view_pending_tournament_15", "approve_tournament_15", "reject_tournament_15", "view_tournament_15",
+    "user_select_game_1", "register_15", "check_subscription", "user_select_format_3",
+    "user_view_tournament_15", "my_team_42", "back_to_games", "approve_team_42", "reject_team_42",
+    "delete_team_42", "confirm_delete_team_42", "cancel_delete_team", "back_to_my_teams",
+    "edit_team_42", "edit_team_name_42", "edit_team_logo_42", "edit_team_players_42",
+    "edit_player_99", "edit_team_menu",
+]
+
+
+def samples() -> dict[str, list[str]]:
+    """Наборы callback_data: старые строки и, если в дереве есть кодек, короткие коды"""
+    result = {"legacy": LEGACY_SAMPLES}
+    try:
+        from app.utils import callbacks
+    except ImportError:
+        return result
+    packed = []
+    for data in LEGACY_SAMPLES:
+        action, args = callbacks.decode(data)
+        packed.append(action.pack(*args))
+    result["compact"] = packed
+    return result
+
+
+async def select_handler(routers, event, kwargs) -> tuple[object | None, int]:
+    """Первый подходящий обработчик и число проверенных обработчиков — как при propagate_event"""
+    try:
+        from app.utils.callbacks import ActionObserver, decode
+    except ImportError:
+        ActionObserver = decode = None
+
+    checked = 0
+    for router in routers:
+        observer = router.observers["callback_query"]
+        if not await observer.check_root_filters(event, **kwargs):
+            continue
+        data = dict(kwargs)
+        if ActionObserver is not None and isinstance(observer, ActionObserver):
+            decoded = decode(event.data)
+            data["callback_action"] = decoded
+            handlers = observer.candidates(decoded[0] if decoded else None)
+        else:
+            handlers = observer.handlers
+        for handler in handlers:
+            checked += 1
+            result, _ = await handler.check(event, **data)
+            if result:
+                return handler, checked
+    return None, checked
+
+
+async def run(args) -> dict:
+    from aiogram import Bot
+    from aiogram.types import CallbackQuery, User
+
+    import run as bot_run
+
+    dp = bot_run.create_dispatcher()
+    routers = list(dp.chain_tail)
+    bot = Bot(token=os.environ["BOT_TOKEN"])
+    user = User(id=1000, is_bot=False, first_name="Bench")
+    kwargs = {"bot": bot, "event_from_user": user, "raw_state": None}
+
+    report = {}
+    for name, datas in samples().items():
+        timings, checked_counts, unhandled = [], [], []
+        for data in datas:
+            event = CallbackQuery(id="1", from_user=user, chat_instance="1", data=data).as_(bot)
+            handler, checked = await select_handler(routers, event, kwargs)
+            if handler is None:
+                unhandled.append(data)
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                await select_handler(routers, event, kwargs)
+            timings.append((time.perf_counter() - started) / args.repeat * 1_000_000)
+            checked_counts.append(checked)
+        report[name] = {
+            "callbacks": len(datas),
+            "mean_us": round(statistics.fmean(timings), 2),
+            "p95_us": round(sorted(timings)[int(len(timings) * 0.95)], 2),
+            "max_us": round(max(timings), 2),
+            "handlers_checked_mean": round(statistics.fmean(checked_counts), 1),
+            "handlers_checked_max": max(checked_counts),
+            "unhandled": unhandled,
+        }
+    await bot.session.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Callback handler selection benchmark")
+    parser.add_argument("--repeat", type=int, default=1000, help="повторов выбора на одну строку callback_data")
+    parser.add_argument("--output", help="записать результаты в JSON-файл")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_callbacks_")
+    output = os.path.abspath(args.output) if args.output else None
+    os.environ.update({
+        "DB_URL": f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}",
+        "BOT_TOKEN": "123456:BENCHMARK",
+        "TEAM_APPROVED_CHANNEL_ID": "-1001000000000",
+        "SUPER_ADMINS": "1",
+    })
+    sys.path.insert(0, os.getcwd())
+    os.chdir(workdir)
+
+    text = json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
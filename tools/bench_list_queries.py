@@ -0,0 +1,158 @@
+"""Бенчмарк списков для клавиатур: загрузка ORM-сущностей против запросов только нужных колонок.
+
+На базе, заполненной tools/seed_data.py, каждый список из обработчиков выполняется двумя способами:
+как было (select(Tournament) / select(Team) — полные объекты в identity map) и как сейчас
+(запросы app.database.crud.*_list_query — кортежи из нужных колонок). Для каждого варианта — время на вызов
+и пик памяти Python-аллокаций (tracemalloc) за один вызов.
+
+    python -m tools.bench_list_queries --scale 0.5
+    python -m tools.bench_list_queries --db seed.db --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import crud
+from app.database.db import Base, Team, TeamStatus, Tournament, TournamentStatus
+from tools import seed_data
+
+
+def list_cases(admin_id: int, captain_tg_id: int, format_id: int) -> dict:
+    """Имя списка -> (как было, как сейчас)"""
+    async def scalars(session, query):
+        return list(await session.scalars(query))
+
+    async def rows(session, query):
+        return (await session.execute(query)).all()
+
+    return {
+        "manage_tournaments (super admin)": (
+            lambda s: scalars(s, select(Tournament)),
+            lambda s: rows(s, crud.tournament_list_query()),
+        ),
+        "manage_tournaments (admin)": (
+            lambda s: scalars(s, select(Tournament).where(
+                Tournament.status == TournamentStatus.APPROVED, Tournament.created_by == admin_id
+            )),
+            lambda s: rows(s, crud.tournament_list_query(created_by=admin_id)),
+        ),
+        "moderate_teams (super admin)": (
+            lambda s: scalars(s, select(Team).where(Team.status == TeamStatus.PENDING)),
+            lambda s: rows(s, crud.pending_team_list_query()),
+        ),
+        "my_teams (super admin)": (
+            lambda s: scalars(s, select(Team).where(Team.status == TeamStatus.APPROVED)),
+            lambda s: rows(s, crud.approved_team_list_query()),
+        ),
+        "my_teams (captain)": (
+            lambda s: scalars(s, select(Team).where(
+                Team.status == TeamStatus.APPROVED, Team.captain_tg_id == captain_tg_id
+            )),
+            lambda s: rows(s, crud.approved_team_list_query(captain_tg_id=captain_tg_id)),
+        ),
+        "tournaments_by_format": (
+            lambda s: scalars(s, select(Tournament).where(
+                Tournament.format_id == format_id, Tournament.is_active == True,
+                Tournament.status == TournamentStatus.APPROVED
+            )),
+            lambda s: rows(s, select(Tournament.id, Tournament.name).where(
+                Tournament.format_id == format_id, Tournament.is_active == True,
+                Tournament.status == TournamentStatus.APPROVED
+            )),
+        ),
+    }
+
+
+async def measure(session_maker, load, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        async with session_maker() as session:
+            started = time.perf_counter()
+            result = await load(session)
+            timings.append((time.perf_counter() - started) * 1000)
+    # Память — отдельным вызовом: tracemalloc сам замедляет аллокации
+    async with session_maker() as session:
+        tracemalloc.start()
+        result = await load(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        identity_map = len(session.identity_map)
+    return {
+        "rows": len(result),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p95_ms": round(sorted(timings)[int(len(timings) * 0.95)], 3),
+        "peak_kib": round(peak / 1024, 1),
+        "identity_map": identity_map,
+    }
+
+
+async def run(args) -> dict:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{args.db}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        has_data = (await conn.scalar(select(func.count()).select_from(Team))) > 0
+    if not has_data:
+        scaled = lambda default: int(default * args.scale)
+        await seed_data.seed(
+            engine,
+            users=scaled(seed_data.DEFAULT_USERS), tournaments=scaled(seed_data.DEFAULT_TOURNAMENTS),
+            teams=scaled(seed_data.DEFAULT_TEAMS), players=scaled(seed_data.DEFAULT_PLAYERS), seed=args.seed,
+        )
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as session:
+        # Самые «тяжёлые» админ, капитан и формат — худший случай для каждого списка
+        admin_id = await session.scalar(
+            select(Tournament.created_by).group_by(Tournament.created_by).order_by(func.count().desc()).limit(1)
+        )
+        captain_tg_id = await session.scalar(
+            select(Team.captain_tg_id).where(Team.status == TeamStatus.APPROVED)
+            .group_by(Team.captain_tg_id).order_by(func.count().desc()).limit(1)
+        )
+        format_id = await session.scalar(
+            select(Tournament.format_id).group_by(Tournament.format_id).order_by(func.count().desc()).limit(1)
+        )
+
+    results = {}
+    for name, (entities, columns) in list_cases(admin_id, captain_tg_id, format_id).items():
+        before = await measure(session_maker, entities, args.repeat)
+        after = await measure(session_maker, columns, args.repeat)
+        results[name] = {
+            "entities": before,
+            "columns": after,
+            "speedup": round(before["mean_ms"] / after["mean_ms"], 2) if after["mean_ms"] else None,
+            "memory_ratio": round(before["peak_kib"] / after["peak_kib"], 2) if after["peak_kib"] else None,
+        }
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Entity vs column-only list query benchmark")
+    parser.add_argument("--db", help="SQLite с данными; без него база создаётся во временной папке")
+    parser.add_argument("--scale", type=float, default=1.0, help="объём данных для tools/seed_data.py")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="записать результаты в JSON-файл")
+    args = parser.parse_args()
+    if not args.db:
+        args.db = os.path.join(tempfile.mkdtemp(prefix="bench_lists_"), "bench.db")
+
+    results = asyncio.run(run(args))
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Сколько SQL-запросов стоит одно сообщение до обработчика: middleware плюс фильтры ролей.
+
+Сообщения идут через настоящий dispatcher (run.create_dispatcher()) и фейковый Bot API;
+запросы считаются событием движка SQLAlchemy. Для каждого сценария — запросы на сообщение
+от обычного пользователя, админа и супер-админа; "unmatched" — текст, который не подходит
+ни одному обработчику и доходит до catch_all.
+
+    python -m tools.bench_message_filters
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+
+from tools.bench_registration_day import ADMIN_ID_BASE, HOST, TOKEN, Simulation, seed_catalog
+from tools.fake_bot_api import FakeBotAPI
+
+SUPER_ADMIN_ID = 1
+USER_ID = 500_000
+
+# Сценарий -> текст сообщения
+MESSAGES = {
+    "unmatched": "привет",
+    "unknown_command": "/unknown",
+    "admin_command": "/team_win 1",
+    "super_admin_command": "/profile",
+    "menu_button": "👥 Мои команды",
+}
+
+
+async def run(args) -> dict:
+    from aiogram import Bot
+    from aiogram.client.telegram import TelegramAPIServer
+    from sqlalchemy import event
+
+    import run as bot_run
+    from app.database.db import create_db, engine
+    from app.services.bot_session import create_bot_session
+
+    fake = FakeBotAPI(latency=0)
+    base_url = await fake.start(HOST, args.port)
+    bot = Bot(token=TOKEN, session=create_bot_session(api=TelegramAPIServer.from_base(base_url)))
+    dp = bot_run.create_dispatcher()
+    await create_db()
+    await seed_catalog(engine, 1, 1)
+    sim = Simulation(dp, bot, fake, random.Random(0), think=0)
+
+    senders = {"user": USER_ID, "admin": ADMIN_ID_BASE, "super_admin": SUPER_ADMIN_ID}
+    for user_id in (USER_ID, SUPER_ADMIN_ID):
+        await sim.feed("start", sim.message(user_id, "/start"))
+
+    queries = 0
+
+    def count(*_):
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    report = {}
+    for scenario, text in MESSAGES.items():
+        report[scenario] = {}
+        for role, user_id in senders.items():
+            queries = 0
+            for _ in range(args.repeat):
+                await sim.feed(scenario, sim.message(user_id, text))
+            report[scenario][role] = round(queries / args.repeat, 2)
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+    await bot.session.close()
+    await fake.stop()
+    await engine.dispose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQL queries per message benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=18083)
+    parser.add_argument("--output", help="записать результаты в JSON-файл")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_messages_")
+    output = os.path.abspath(args.output) if args.output else None
+    os.environ.update({
+        "DB_URL": f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}",
+        "BOT_TOKEN": TOKEN,
+        "TEAM_APPROVED_CHANNEL_ID": "-1001000000000",
+        "SUPER_ADMINS": str(SUPER_ADMIN_ID),
+    })
+    for kind in ("MESSAGE", "CALLBACK", "UPLOAD"):
+        os.environ[f"THROTTLE_{kind}_RATE"] = "1000"
+        os.environ[f"THROTTLE_{kind}_BURST"] = "1000"
+    sys.path.insert(0, os.getcwd())
+    os.chdir(workdir)
+
+    text = json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""Нагрузочный бенчмарк «день регистрации».
+
+Гоняет настоящий Dispatcher из run.py (все middleware и роутеры) на тысячах синтетических
+пользователей: полная регистрация команды (RegisterTeam), просмотр турниров и модерация
+заявок админами. Bot API — tools/fake_bot_api.py, база — временная SQLite с каталогом игр
+и турниров, при --background-scale дозаполненная tools/seed_data.py. Итог печатается JSON-ом, чтобы прогоны можно было сравнивать.
+
+    python -m tools.bench_registration_day --users 2000 --concurrency 200 --api-latency-ms 30
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from tools.fake_bot_api import FakeBotAPI
+
+TOKEN = "123456:BENCHMARK"
+HOST = "127.0.0.1"
+USER_ID_BASE = 10_000_000
+ADMIN_ID_BASE = 900_000
+GAMES = ["Mobile Legends", "PUBG Mobile", "Standoff 2", "Free Fire"]
+FORMATS = [("2x2", 2, 2), ("5x5", 5, 6)]
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+    pick = lambda q: round(values[min(len(values) - 1, int(len(values) * q))], 3)
+    return {"count": len(values), "p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": round(values[-1], 3)}
+
+
+class ErrorCounter(logging.Handler):
+    """Считает записи уровня ERROR и выше: ErrorHandlerMiddleware глотает исключения и только логирует их"""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+class Simulation:
+    def __init__(self, dp, bot, fake: FakeBotAPI, rng: random.Random, think: float):
+        self.dp = dp
+        self.bot = bot
+        self.fake = fake
+        self.rng = rng
+        self.think = think
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.failed = 0
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+
+    def _user(self, user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}", "username": f"u{user_id}"}
+
+    def _message(self, user_id: int, text: str | None = None, photo: bool = False) -> dict:
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self._user(user_id),
+        }
+        if photo:
+            file_id = f"logo{user_id}"
+            message["photo"] = [{"file_id": file_id, "file_unique_id": file_id, "width": 512, "height": 512, "file_size": 40_000}]
+        else:
+            message["text"] = text
+        return message
+
+    def message(self, user_id: int, text: str | None = None, photo: bool = False) -> dict:
+        return {"update_id": next(self._update_ids), "message": self._message(user_id, text, photo)}
+
+    def callback(self, user_id: int, data: str) -> dict:
+        return {
+            "update_id": next(self._update_ids),
+            "callback_query": {
+                "id": str(next(self._update_ids)),
+                "from": self._user(user_id),
+                "chat_instance": str(user_id),
+                "data": data,
+                "message": self._message(user_id, "…"),
+            },
+        }
+
+    async def feed(self, label: str, raw: dict) -> None:
+        from aiogram.types import Update
+
+        update = Update.model_validate(raw, context={"bot": self.bot})
+        started = time.perf_counter()
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception:
+            self.failed += 1
+        self.latencies[label].append((time.perf_counter() - started) * 1000)
+        if self.think:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.think))
+
+    # --- Сценарии ---
+
+    async def open_tournament(self, user_id: int, tournament: dict) -> None:
+        from app.utils import callbacks
+
+        await self.feed("start", self.message(user_id, "/start"))
+        await self.feed("active_tournaments", self.message(user_id, "🔍 Активные турниры"))
+        await self.feed("select_game", self.callback(user_id, callbacks.USER_SELECT_GAME.pack(tournament['game_id'])))
+        await self.feed("select_format", self.callback(user_id, callbacks.USER_SELECT_FORMAT.pack(tournament['format_id'])))
+        await self.feed("view_tournament", self.callback(user_id, callbacks.USER_VIEW_TOURNAMENT.pack(tournament['id'])))
+
+    async def registration(self, n: int, tournament: dict) -> None:
+        from app.utils import callbacks
+
+        user_id = USER_ID_BASE + n
+        await self.open_tournament(user_id, tournament)
+        await self.feed("register", self.callback(user_id, callbacks.REGISTER.pack(tournament['id'])))
+        await self.feed("team_name", self.message(user_id, f"Team {n:06d}"))
+        await self.feed("team_logo", self.message(user_id, photo=True))
+        await self.feed("player_count", self.message(user_id, str(tournament["players"])))
+        for k in range(tournament["players"]):
+            await self.feed("player_info", self.message(user_id, f"p{n}n{k} | {n:07d}{k}"))
+        if self.rng.random() < 0.3:
+            await self.feed("add_substitutes", self.message(user_id, "да"))
+            for k in range(2):
+                await self.feed("substitute_info", self.message(user_id, f"s{n}n{k} | {n:07d}s{k}"))
+        else:
+            await self.feed("add_substitutes", self.message(user_id, "нет"))
+
+    async def browsing(self, n: int, tournament: dict) -> None:
+        from app.utils import callbacks
+
+        user_id = USER_ID_BASE + n
+        await self.open_tournament(user_id, tournament)
+        await self.feed("back_to_games", self.callback(user_id, callbacks.BACK_TO_GAMES.pack()))
+        await self.feed("my_teams", self.message(user_id, "👥 Мои команды"))
+        await self.feed("help", self.message(user_id, "ℹ️ Помощь"))
+
+    def _pending_team_ids(self, admin_id: int) -> list[int]:
+        """Достаёт id заявок из последней клавиатуры, которую бот показал админу"""
+        from app.utils import callbacks
+
+        for call in reversed(self.fake.calls):
+            if call.method == "editMessageText" and call.params.get("chat_id") == str(admin_id):
+                markup = json.loads(call.params.get("reply_markup", "{}"))
+                decoded = (
+                    callbacks.decode(button.get("callback_data"))
+                    for row in markup.get("inline_keyboard", [])
+                    for button in row
+                )
+                return [args.team_id for action, args in filter(None, decoded) if action is callbacks.MODERATE_TEAM]
+        return []
+
+    async def moderation(self, admin_id: int, registration_done: asyncio.Event, approve_share: float) -> None:
+        from app.utils import callbacks
+
+        while True:
+            finished = registration_done.is_set()
+            await self.feed("admin_panel", self.message(admin_id, "Админ-панель"))
+            await self.feed("moderate_teams", self.callback(admin_id, callbacks.MODERATE_TEAMS.pack()))
+            team_ids = self._pending_team_ids(admin_id)
+            if not team_ids:
+                if finished:
+                    return
+                await asyncio.sleep(0.2)
+                continue
+            for team_id in team_ids[:10]:
+                await self.feed("moderate_team", self.callback(admin_id, callbacks.MODERATE_TEAM.pack(team_id)))
+                if self.rng.random() < approve_share:
+                    await self.feed("approve_team", self.callback(admin_id, callbacks.APPROVE_TEAM.pack(team_id)))
+                else:
+                    await self.feed("reject_team", self.callback(admin_id, callbacks.REJECT_TEAM.pack(team_id)))
+
+
+async def seed_catalog(engine, tournaments: int, admins: int) -> list[dict]:
+    """Каталог игр, форматов, одобренных турниров и админов-модераторов"""
+    from sqlalchemy import insert
+    from app.database.db import Game, GameFormat, Tournament, TournamentStatus, User, UserRole
+
+    formats, rows = [], []
+    for game_id, name in enumerate(GAMES, start=1):
+        for format_name, min_players, max_players in FORMATS:
+            formats.append({
+                "id": len(formats) + 1, "game_id": game_id, "format_name": format_name,
+                "min_players_per_team": min_players, "max_players_per_team": max_players,
+            })
+    for i in range(tournaments):
+        fmt = formats[i % len(formats)]
+        rows.append({
+            "id": i + 1, "game_id": fmt["game_id"], "format_id": fmt["id"], "name": f"Qualifier {i + 1}",
+            "logo_path": "", "start_date": datetime.utcnow() + timedelta(days=7), "description": "Отборочный турнир",
+            "regulations_path": "", "is_active": True, "status": TournamentStatus.APPROVED,
+            "created_by": i % admins + 1,
+            # Часть турниров требует подписку на канал — проверяется через getChatMember
+            "required_channels": "@enas_news" if i % 3 == 0 else "",
+        })
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [
+            {"id": i + 1, "telegram_id": ADMIN_ID_BASE + i, "full_name": f"Admin {i}", "username": f"admin{i}", "role": UserRole.ADMIN}
+            for i in range(admins)
+        ])
+        await conn.execute(insert(Game), [{"id": i, "name": name} for i, name in enumerate(GAMES, start=1)])
+        await conn.execute(insert(GameFormat), formats)
+        await conn.execute(insert(Tournament), rows)
+    return [
+        {"id": row["id"], "game_id": row["game_id"], "format_id": row["format_id"],
+         "players": formats[row["format_id"] - 1]["min_players_per_team"]}
+        for row in rows
+    ]
+
+
+async def run_benchmark(args) -> dict:
+    # Приложение читает настройки при импорте, поэтому импортируем его только после настройки окружения
+    from aiogram import Bot
+    from aiogram.client.telegram import TelegramAPIServer
+    from sqlalchemy import func, select
+
+    import run
+    from app.database import query_stats
+    from app.database.db import Team, create_db, engine
+    from app.services.bot_session import create_bot_session
+    from app.services.outbound import OutboundScheduler
+
+    rng = random.Random(args.seed)
+    fake = FakeBotAPI(latency=args.api_latency_ms / 1000, seed=args.seed)
+    base_url = await fake.start(HOST, args.port)
+    bot = Bot(token=TOKEN, session=create_bot_session(api=TelegramAPIServer.from_base(base_url)))
+    if args.outbound_scheduler:
+        bot.session.middleware(OutboundScheduler())
+    dp = run.create_dispatcher()
+
+    await create_db()
+    tournaments = await seed_catalog(engine, args.tournaments, args.admins)
+    background = None
+    if args.background_scale:
+        # Фоновые боевые объёмы: запросы бенчмарка идут по нагруженным таблицам
+        from tools import seed_data
+        background = await seed_data.seed(
+            engine,
+            users=int(seed_data.DEFAULT_USERS * args.background_scale),
+            tournaments=int(seed_data.DEFAULT_TOURNAMENTS * args.background_scale),
+            teams=int(seed_data.DEFAULT_TEAMS * args.background_scale),
+            players=int(seed_data.DEFAULT_PLAYERS * args.background_scale),
+            seed=args.seed,
+        )
+
+    query_stats.handler_totals.clear()
+    errors = ErrorCounter()
+    logging.getLogger().addHandler(errors)
+
+    sim = Simulation(dp, bot, fake, rng, think=args.think_ms / 1000)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    registration_done = asyncio.Event()
+    fake.reset()
+
+    async def user(n: int) -> None:
+        async with semaphore:
+            tournament = rng.choice(tournaments)
+            if rng.random() < args.registration_share:
+                await sim.registration(n, tournament)
+            else:
+                await sim.browsing(n, tournament)
+
+    async def users() -> None:
+        await asyncio.gather(*(user(n) for n in range(args.users)))
+        registration_done.set()
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        users(),
+        *(sim.moderation(ADMIN_ID_BASE + i, registration_done, args.approve_share) for i in range(args.admins)),
+    )
+    elapsed = time.perf_counter() - started
+
+    logging.getLogger().removeHandler(errors)
+    async with engine.connect() as conn:
+        teams = dict((status.value, count) for status, count in await conn.execute(
+            select(Team.status, func.count()).group_by(Team.status)
+        ))
+    await bot.session.close()
+    await fake.stop()
+    await engine.dispose()
+
+    all_latencies = [value for values in sim.latencies.values() for value in values]
+    updates = len(all_latencies)
+    queries = sum(totals[1] for totals in query_stats.handler_totals.values())
+    return {
+        "config": vars(args),
+        "background": background,
+        "updates": updates,
+        "duration_s": round(elapsed, 3),
+        "updates_per_s": round(updates / elapsed, 1),
+        "latency": percentiles(all_latencies),
+        "latency_by_step": {label: percentiles(values) for label, values in sorted(sim.latencies.items())},
+        "sql_queries_per_update": round(queries / updates, 2),
+        "sql_by_handler": {
+            handler: {
+                "updates": count,
+                "queries_per_update": round(handler_queries / count, 2),
+                "db_ms_per_update": round(db_time * 1000 / count, 3),
+            }
+            for handler, (count, handler_queries, db_time) in sorted(query_stats.handler_totals.items())
+        },
+        "api_calls_per_update": round(len(fake.calls) / updates, 2),
+        "api_calls_by_method": dict(fake.calls_by_method().most_common()),
+        "errors": errors.count + sim.failed,
+        "teams": teams,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Registration day load benchmark")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200, help="сколько пользователей действуют одновременно")
+    parser.add_argument("--tournaments", type=int, default=20)
+    parser.add_argument("--admins", type=int, default=3)
+    parser.add_argument("--registration-share", type=float, default=0.6, help="доля пользователей, регистрирующих команду")
+    parser.add_argument("--approve-share", type=float, default=0.8)
+    parser.add_argument("--background-scale", type=float, default=0,
+                        help="дозаполнить базу tools/seed_data.py (1 — 100k пользователей, 50k команд)")
+    parser.add_argument("--think-ms", type=float, default=0, help="средняя пауза пользователя между действиями")
+    parser.add_argument("--api-latency-ms", type=float, default=0)
+    parser.add_argument("--outbound-scheduler", action="store_true", help="включить лимиты Telegram на исходящие")
+    parser.add_argument("--throttling", action="store_true", help="не ослаблять анти-флуд для синтетических пользователей")
+    parser.add_argument("--port", type=int, default=18082)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="куда сохранить JSON-отчёт")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_registration_")
+    db_path = os.path.join(workdir, "bench.db")
+    output = os.path.abspath(args.output) if args.output else None
+    os.environ.update({
+        "DB_URL": f"sqlite+aiosqlite:///{db_path}",
+        "BOT_TOKEN": TOKEN,
+        "TEAM_APPROVED_CHANNEL_ID": "-1001000000000",
+        "SUPER_ADMINS": "1",
+        # Запросы считает QueryStatsMiddleware; strict можно оставить, чтобы ловить нарушения бюджета
+        "QUERY_STATS": "strict" if os.getenv("QUERY_STATS") == "strict" else "on",
+    })
+    if not args.throttling:
+        for kind in ("MESSAGE", "CALLBACK", "UPLOAD"):
+            os.environ[f"THROTTLE_{kind}_RATE"] = "1000"
+            os.environ[f"THROTTLE_{kind}_BURST"] = "1000"
+    # Логотипы команд сохраняются в static/ относительно текущей папки
+    sys.path.insert(0, os.getcwd())
+    os.chdir(workdir)
+    logging.basicConfig(level=logging.WARNING)
+
+    report = json.dumps(asyncio.run(run_benchmark(args)), indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
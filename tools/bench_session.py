@@ -0,0 +1,84 @@
+"""Микробенчмарк накладных расходов на исходящий запрос: стандартная AiohttpSession против create_bot_session().
+
+Запросы идут в локальный фейковый Bot API (tools/fake_bot_api.py), поэтому измеряется только работа клиента
+(сериализация, пул соединений, разбор ответа).
+
+    python -m tools.bench_session --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from app.services.bot_session import create_bot_session
+from tools.fake_bot_api import FakeBotAPI
+
+TOKEN = "123456:BENCHMARK"
+HOST = "127.0.0.1"
+
+
+def build_markup():
+    builder = InlineKeyboardBuilder()
+    for i in range(10):
+        builder.button(text=f"Турнир {i} 🏆", callback_data=f"view_tournament_{i}")
+    builder.adjust(1)
+    return builder.as_markup()
+
+
+async def run_variant(session, requests: int, concurrency: int) -> dict:
+    bot = Bot(token=TOKEN, session=session)
+    markup = build_markup()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await bot.send_message(1000 + i % 100, "🏅 Турнир\n📝 Описание", reply_markup=markup)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await one(0)  # прогрев: соединение и DNS
+    latencies.clear()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    await bot.session.close()
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "rps": round(requests / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)], 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Outbound request overhead benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=18081)
+    parser.add_argument("--latency-ms", type=float, default=0, help="задержка ответа фейкового Bot API")
+    args = parser.parse_args()
+
+    fake_api = FakeBotAPI(latency=args.latency_ms / 1000)
+    api = TelegramAPIServer.from_base(await fake_api.start(HOST, args.port))
+    try:
+        results = {
+            "default": await run_variant(AiohttpSession(api=api), args.requests, args.concurrency),
+            "tuned": await run_variant(create_bot_session(api=api), args.requests, args.concurrency),
+        }
+    finally:
+        await fake_api.stop()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
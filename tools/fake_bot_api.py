@@ -0,0 +1,289 @@
+"""Локальная замена Telegram Bot API на aiohttp для интеграционных тестов и бенчмарков.
+
+Бот направляется сюда через BOT_API_BASE_URL (см. app/services/bot_session.py).
+Сервер записывает каждый вызов, умеет добавлять задержку, ошибки и retry_after,
+отдаёт апдейты через getUpdates и файлы через /file/bot<token>/<path>.
+
+    python -m tools.fake_bot_api --port 8081 --latency-ms 40 --retry-after-rate 0.01
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+# Минимальный валидный JPEG (1x1) — отдаётся при скачивании любых файлов
+FAKE_FILE_BYTES = bytes.fromhex(
+    "ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909080a0c140d0c0b0b0c1912"
+    "130f141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30313434341f27393d38323c2e333432ffc0000b0800"
+    "01000101011100ffc4001f0000010501010101010100000000000000000102030405060708090a0bffc400b5100002"
+    "010303020403050504040000017d01020300041105122131410613516107227114328191a1082342b1c11552d1f024"
+    "33627282090a161718191a25262728292a3435363738393a434445464748494a535455565758595a63646566676869"
+    "6a737475767778797a838485868788898a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4"
+    "c5c6c7c8c9cad2d3d4d5d6d7d8d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8f9faffda0008010100003f00fbd3"
+    "ffd9"
+)
+
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+
+
+@dataclass
+class RecordedCall:
+    method: str
+    params: dict
+    status: int
+    at: float = field(default_factory=time.monotonic)
+
+
+class FakeBotAPI:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after_rate: float = 0.0,
+        retry_after: int = 1,
+        chat_member_status: str = "member",
+        seed: int | None = None,
+    ):
+        """
+        :param latency: задержка каждого ответа, секунды
+        :param jitter: случайная добавка к задержке, секунды
+        :param error_rate: доля запросов, на которые отвечаем 500
+        :param retry_after_rate: доля запросов, на которые отвечаем 429 с retry_after
+        :param retry_after: значение retry_after в секундах
+        :param chat_member_status: статус, который возвращает getChatMember
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after_rate = retry_after_rate
+        self.retry_after = retry_after
+        self.chat_member_status = chat_member_status
+        self.random = random.Random(seed)
+        self.calls: list[RecordedCall] = []
+        # Ответы, которые вернутся на ближайшие вызовы метода: method -> [(status, payload)]
+        self.scripted_failures: dict[str, list[tuple[int, dict]]] = {}
+        self.updates: asyncio.Queue = asyncio.Queue()
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._runner: web.AppRunner | None = None
+        self.handlers = {
+            "getMe": lambda p: BOT_USER,
+            "sendMessage": self._message_result,
+            "sendPhoto": self._photo_result,
+            "sendDocument": self._document_result,
+            "copyMessage": lambda p: {"message_id": next(self._message_ids)},
+            "editMessageText": self._edit_result,
+            "editMessageReplyMarkup": self._edit_result,
+            "editMessageCaption": self._edit_result,
+            "getChatMember": self._chat_member_result,
+            "getChatAdministrators": lambda p: [{"status": "creator", "user": BOT_USER, "is_anonymous": False}],
+            "getFile": self._file_result,
+            "setWebhook": lambda p: True,
+            "deleteWebhook": lambda p: True,
+        }
+
+    # --- Управление из тестов ---
+
+    def feed_update(self, update: dict) -> dict:
+        """Ставит апдейт в очередь getUpdates, проставляя update_id, если его нет"""
+        update.setdefault("update_id", next(self._update_ids))
+        self.updates.put_nowait(update)
+        return update
+
+    def fail_next(self, method: str, status: int = 500, description: str = "Internal Server Error",
+                  retry_after: int | None = None) -> None:
+        """Следующий вызов method завершится ошибкой"""
+        payload = {"ok": False, "error_code": status, "description": description}
+        if retry_after is not None:
+            payload["parameters"] = {"retry_after": retry_after}
+        self.scripted_failures.setdefault(method, []).append((status, payload))
+
+    def calls_by_method(self) -> Counter:
+        return Counter(call.method for call in self.calls)
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.scripted_failures.clear()
+
+    # --- Результаты методов ---
+
+    def _chat(self, params: dict) -> dict:
+        chat_id = params.get("chat_id", 0)
+        try:
+            chat_id = int(chat_id)
+        except ValueError:  # @username канала
+            return {"id": -1000000000000, "type": "channel", "username": chat_id.lstrip("@")}
+        return {"id": chat_id, "type": "private" if chat_id > 0 else "supergroup"}
+
+    def _message_result(self, params: dict, **extra) -> dict:
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": self._chat(params),
+            "from": BOT_USER,
+            **extra,
+        }
+        if "text" in params:
+            message["text"] = params["text"]
+        if "caption" in params:
+            message["caption"] = params["caption"]
+        if "reply_markup" in params:
+            markup = params["reply_markup"]
+            markup = json.loads(markup) if isinstance(markup, str) else markup
+            # Как и настоящий API, в сообщении возвращаем только inline-клавиатуру
+            if "inline_keyboard" in markup:
+                message["reply_markup"] = markup
+        return message
+
+    def _photo_result(self, params: dict) -> dict:
+        file_id = f"photo{next(self._message_ids)}"
+        size = {"file_id": file_id, "file_unique_id": file_id, "width": 1, "height": 1}
+        return self._message_result(params, photo=[size])
+
+    def _document_result(self, params: dict) -> dict:
+        file_id = f"doc{next(self._message_ids)}"
+        return self._message_result(params, document={"file_id": file_id, "file_unique_id": file_id})
+
+    def _edit_result(self, params: dict):
+        if "inline_message_id" in params:
+            return True
+        return self._message_result(params)
+
+    def _chat_member_result(self, params: dict) -> dict:
+        user = {"id": int(params.get("user_id", 0)), "is_bot": False, "first_name": "User"}
+        member = {"status": self.chat_member_status, "user": user}
+        if self.chat_member_status == "kicked":
+            member["until_date"] = 0
+        return member
+
+    def _file_result(self, params: dict) -> dict:
+        file_id = params.get("file_id", "file")
+        return {
+            "file_id": file_id,
+            "file_unique_id": file_id,
+            "file_size": len(FAKE_FILE_BYTES),
+            "file_path": f"files/{file_id}.jpg",
+        }
+
+    # --- HTTP ---
+
+    async def _read_params(self, request: web.Request) -> dict:
+        params = dict(request.query)
+        if request.can_read_body:
+            if request.content_type == "application/json":
+                params.update(await request.json())
+            else:
+                for key, value in (await request.post()).items():
+                    # Загружаемые файлы записываем только по имени
+                    params[key] = value if isinstance(value, str) else f"<file {value.filename}>"
+        return params
+
+    async def _get_updates(self, params: dict) -> list:
+        timeout = float(params.get("timeout", 0))
+        updates = []
+        try:
+            updates.append(await asyncio.wait_for(self.updates.get(), timeout=timeout or 0.01))
+        except asyncio.TimeoutError:
+            return updates
+        while not self.updates.empty() and len(updates) < 100:
+            updates.append(self.updates.get_nowait())
+        return updates
+
+    async def handle_method(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._read_params(request)
+
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay and method != "getUpdates":
+            await asyncio.sleep(delay)
+
+        status, payload = 200, None
+        if self.scripted_failures.get(method):
+            status, payload = self.scripted_failures[method].pop(0)
+        elif method != "getUpdates":
+            roll = self.random.random()
+            if roll < self.retry_after_rate:
+                status = 429
+                payload = {
+                    "ok": False, "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.retry_after}",
+                    "parameters": {"retry_after": self.retry_after},
+                }
+            elif roll < self.retry_after_rate + self.error_rate:
+                status, payload = 500, {"ok": False, "error_code": 500, "description": "Internal Server Error"}
+
+        if payload is None:
+            if method == "getUpdates":
+                result = await self._get_updates(params)
+            else:
+                result = self.handlers.get(method, lambda p: True)(params)
+            payload = {"ok": True, "result": result}
+
+        self.calls.append(RecordedCall(method=method, params=params, status=status))
+        return web.json_response(payload, status=status)
+
+    async def handle_file(self, request: web.Request) -> web.Response:
+        self.calls.append(RecordedCall(method="downloadFile", params={"path": request.match_info["path"]}, status=200))
+        return web.Response(body=FAKE_FILE_BYTES, content_type="image/jpeg")
+
+    def create_app(self) -> web.Application:
+        app = web.Application(client_max_size=50 * 1024 * 1024)
+        app.router.add_route("*", "/bot{token}/{method}", self.handle_method)
+        app.router.add_get("/file/bot{token}/{path:.+}", self.handle_file)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8081) -> str:
+        """Запускает сервер и возвращает базовый URL для BOT_API_BASE_URL"""
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Telegram Bot API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--retry-after-rate", type=float, default=0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    api = FakeBotAPI(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        retry_after_rate=args.retry_after_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    base_url = await api.start(args.host, args.port)
+    print(f"Fake Bot API on {base_url} (set BOT_API_BASE_URL={base_url})")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(dict(api.calls_by_method()))
+    finally:
+        await api.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
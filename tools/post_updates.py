@@ -0,0 +1,78 @@
+"""Локальный стенд для режима вебхука: отправляет записанные апдейты POST-запросами.
+
+Пример:
+    python -m tools.post_updates tools/updates/sample_updates.jsonl \
+        --url http://127.0.0.1:8080/webhook --secret "$WEBHOOK_SECRET" --concurrency 10
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import aiohttp
+
+
+def load_updates(path: str) -> list[dict]:
+    """Читает апдейты из .jsonl (по одному на строку) или .json (список)"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def webhook_reply_method(body: bytes) -> str | None:
+    """Достаёт имя метода из multipart-ответа вебхука, если хендлер ответил через него"""
+    marker = b'name="method"\r\n\r\n'
+    start = body.find(marker)
+    if start == -1:
+        return None
+    start += len(marker)
+    return body[start:body.find(b"\r\n", start)].decode()
+
+
+async def post_update(http: aiohttp.ClientSession, url: str, secret: str, update: dict) -> dict:
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret else {}
+    started = time.perf_counter()
+    async with http.post(url, json=update, headers=headers) as resp:
+        body = await resp.read()
+    return {
+        "update_id": update.get("update_id"),
+        "status": resp.status,
+        "reply_method": webhook_reply_method(body),
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="POST recorded updates to the bot webhook")
+    parser.add_argument("updates", help="Файл с апдейтами (.jsonl или .json)")
+    parser.add_argument("--url", default="http://127.0.0.1:8080/webhook")
+    parser.add_argument("--secret", default="")
+    parser.add_argument("--concurrency", type=int, default=1, help="Сколько запросов держать одновременно")
+    parser.add_argument("--repeat", type=int, default=1, help="Сколько раз прогнать файл")
+    args = parser.parse_args()
+
+    updates = load_updates(args.updates) * args.repeat
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with aiohttp.ClientSession() as http:
+        async def send(update: dict) -> dict:
+            async with semaphore:
+                result = await post_update(http, args.url, args.secret, update)
+            print(json.dumps(result, ensure_ascii=False))
+            return result
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(send(u) for u in updates))
+        elapsed = time.perf_counter() - started
+
+    ok = sum(1 for r in results if r["status"] == 200)
+    replied = sum(1 for r in results if r["reply_method"])
+    print(
+        f"Sent {len(results)} updates in {elapsed:.2f}s: "
+        f"{ok} OK, {len(results) - ok} failed, {replied} answered via webhook response"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
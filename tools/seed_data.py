@@ -0,0 +1,231 @@
+"""Генератор синтетических данных для нагрузочного тестирования.
+
+Заполняет схему из app/database/db.py объёмами, близкими к боевым (по умолчанию
+100k пользователей, 5k турниров, 50k команд, 300k игроков), с распределениями
+статусов как в проде. Строки вставляются пачками через Core insert (executemany),
+минуя crud. Результат детерминирован по --seed, поэтому прогоны бенчмарков сравнимы.
+
+    python -m tools.seed_data seed.db --reset
+    python -m tools.seed_data seed.db --scale 0.1 --seed 7
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database.db import (
+    Base, Game, GameFormat, Player, ProgressStatus, Team, TeamStatus, Tournament, TournamentStatus, User, UserRole
+)
+
+DEFAULT_USERS = 100_000
+DEFAULT_TOURNAMENTS = 5_000
+DEFAULT_TEAMS = 50_000
+DEFAULT_PLAYERS = 300_000
+TELEGRAM_ID_BASE = 1_000_000_000
+
+CATALOG = {
+    "Mobile Legends": [("5x5", 5, 5)],
+    "PUBG Mobile": [("1x1", 1, 1), ("2x2", 2, 2), ("4x4", 4, 4)],
+    "Standoff 2": [("2x2", 2, 2), ("5x5", 5, 5)],
+    "Free Fire": [("4x4", 4, 4)],
+}
+
+# Распределения статусов, как в проде
+USER_ROLES = {UserRole.USER: 0.998, UserRole.ADMIN: 0.0018, UserRole.SUPER_ADMIN: 0.0002}
+TOURNAMENT_STATUSES = {TournamentStatus.APPROVED: 0.8, TournamentStatus.PENDING: 0.15, TournamentStatus.REJECTED: 0.05}
+TEAM_STATUSES = {TeamStatus.APPROVED: 0.6, TeamStatus.PENDING: 0.25, TeamStatus.REJECTED: 0.15}
+PROGRESS_STATUSES = {ProgressStatus.IN_PROGRESS: 0.7, ProgressStatus.WINNER: 0.1, ProgressStatus.LOSER: 0.2}
+REQUIRED_CHANNELS_SHARE = 0.2
+
+
+def _sample(rng: random.Random, distribution: dict, k: int) -> list:
+    return rng.choices(list(distribution), weights=list(distribution.values()), k=k)
+
+
+async def _next_id(conn, model) -> int:
+    return (await conn.scalar(select(func.max(model.id))) or 0) + 1
+
+
+async def _insert(conn, model, rows: list[dict], batch: int) -> None:
+    for start in range(0, len(rows), batch):
+        await conn.execute(insert(model), rows[start:start + batch])
+
+
+async def _ensure_catalog(conn) -> list[dict]:
+    """Игры и форматы: используем существующие, иначе создаём стандартный каталог"""
+    formats = (await conn.execute(
+        select(GameFormat.id, GameFormat.game_id, GameFormat.min_players_per_team, GameFormat.max_players_per_team)
+    )).mappings().all()
+    if formats:
+        return [dict(fmt) for fmt in formats]
+
+    games, rows = [], []
+    for game_id, (name, game_formats) in enumerate(CATALOG.items(), start=1):
+        games.append({"id": game_id, "name": name})
+        for format_name, min_players, max_players in game_formats:
+            rows.append({
+                "id": len(rows) + 1, "game_id": game_id, "format_name": format_name,
+                "min_players_per_team": min_players, "max_players_per_team": max_players,
+            })
+    await conn.execute(insert(Game), games)
+    await conn.execute(insert(GameFormat), rows)
+    return rows
+
+
+async def seed(
+    engine,
+    users: int = DEFAULT_USERS,
+    tournaments: int = DEFAULT_TOURNAMENTS,
+    teams: int = DEFAULT_TEAMS,
+    players: int = DEFAULT_PLAYERS,
+    seed: int = 42,
+    batch: int = 10_000,
+) -> dict:
+    """Дописывает синтетические данные в базу (id продолжают существующие). Возвращает сводку."""
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1)
+    started = time.perf_counter()
+
+    async with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            await conn.execute(text("PRAGMA synchronous=OFF"))
+        formats = await _ensure_catalog(conn)
+        user_id = await _next_id(conn, User)
+        tournament_id = await _next_id(conn, Tournament)
+        team_id = await _next_id(conn, Team)
+        player_id = await _next_id(conn, Player)
+        telegram_base = TELEGRAM_ID_BASE + user_id
+
+        # Пользователи
+        user_rows = [
+            {
+                "id": user_id + i,
+                "telegram_id": telegram_base + i,
+                "full_name": f"Player {telegram_base + i}",
+                "username": f"user{telegram_base + i}" if rng.random() < 0.8 else None,
+                "registered_at": now - timedelta(seconds=rng.randrange(365 * 86400)),
+                "role": role,
+            }
+            for i, role in enumerate(_sample(rng, USER_ROLES, users))
+        ]
+        admin_ids = [row["id"] for row in user_rows if row["role"] != UserRole.USER] or [user_id]
+        await _insert(conn, User, user_rows, batch)
+
+        # Турниры
+        tournament_rows, tournament_formats = [], []
+        for i, status in enumerate(_sample(rng, TOURNAMENT_STATUSES, tournaments)):
+            fmt = rng.choice(formats)
+            start_date = now + timedelta(days=rng.uniform(-60, 60))
+            tournament_rows.append({
+                "id": tournament_id + i,
+                "game_id": fmt["game_id"],
+                "format_id": fmt["id"],
+                "name": f"Tournament {tournament_id + i}",
+                "logo_path": "",
+                "start_date": start_date,
+                "description": "Синтетический турнир",
+                "regulations_path": "",
+                # Активны в основном одобренные и ещё не начавшиеся
+                "is_active": status == TournamentStatus.APPROVED and (start_date > now or rng.random() < 0.1),
+                "status": status,
+                "created_by": rng.choice(admin_ids),
+                "required_channels": "@enas_news" if rng.random() < REQUIRED_CHANNELS_SHARE else "",
+            })
+            tournament_formats.append(fmt)
+        await _insert(conn, Tournament, tournament_rows, batch)
+
+        # Команды: в одобренные турниры
+        approved = [
+            (row, fmt) for row, fmt in zip(tournament_rows, tournament_formats)
+            if row["status"] == TournamentStatus.APPROVED
+        ] or list(zip(tournament_rows, tournament_formats))
+        team_rows, team_formats = [], []
+        for i, status in enumerate(_sample(rng, TEAM_STATUSES, teams)):
+            tournament, fmt = rng.choice(approved)
+            tid = tournament["id"]
+            team_rows.append({
+                "id": team_id + i,
+                "tournament_id": tid,
+                "captain_tg_id": telegram_base + rng.randrange(users),
+                "team_name": f"Squad {team_id + i}",
+                "logo_path": "",
+                "status": status,
+                "progress_status": _sample(rng, PROGRESS_STATUSES, 1)[0]
+                if status == TeamStatus.APPROVED else ProgressStatus.IN_PROGRESS,
+                # Заявки подаются в последние две недели перед стартом турнира
+                "created_at": tournament["start_date"] - timedelta(seconds=rng.randrange(14 * 86400)),
+            })
+            team_formats.append(fmt)
+        await _insert(conn, Team, team_rows, batch)
+
+        # Игроки: ровно players штук, поровну на команды; сверх максимума формата — замены
+        sizes = [players // teams] * teams if teams else []
+        for i in rng.sample(range(teams), players % teams if teams else 0):
+            sizes[i] += 1
+        player_rows = []
+        for team, fmt, size in zip(team_rows, team_formats, sizes):
+            for k in range(size):
+                player_rows.append({
+                    "id": player_id,
+                    "team_id": team["id"],
+                    "nickname": f"nick{team['id']}_{k}",
+                    "game_id": f"{team['id']:07d}{k:02d}",
+                    "captain_id": team["captain_tg_id"],
+                    "is_substitute": k >= fmt["max_players_per_team"],
+                })
+                player_id += 1
+            if len(player_rows) >= batch:
+                await _insert(conn, Player, player_rows, batch)
+                player_rows = []
+        await _insert(conn, Player, player_rows, batch)
+
+    return {
+        "users": users,
+        "tournaments": tournaments,
+        "teams": teams,
+        "players": players,
+        "seed": seed,
+        "elapsed_s": round(time.perf_counter() - started, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic data generator")
+    parser.add_argument("db", help="путь к файлу SQLite")
+    parser.add_argument("--scale", type=float, default=1.0, help="множитель объёмов по умолчанию")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--tournaments", type=int)
+    parser.add_argument("--teams", type=int)
+    parser.add_argument("--players", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--reset", action="store_true", help="пересоздать таблицы перед заполнением")
+    args = parser.parse_args()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{args.db}")
+    async with engine.begin() as conn:
+        if args.reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    scaled = lambda value, default: value if value is not None else int(default * args.scale)
+    summary = await seed(
+        engine,
+        users=scaled(args.users, DEFAULT_USERS),
+        tournaments=scaled(args.tournaments, DEFAULT_TOURNAMENTS),
+        teams=scaled(args.teams, DEFAULT_TEAMS),
+        players=scaled(args.players, DEFAULT_PLAYERS),
+        seed=args.seed,
+        batch=args.batch,
+    )
+    await engine.dispose()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())